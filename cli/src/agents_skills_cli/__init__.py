@@ -5,8 +5,6 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-import httpx
-
 
 __all__ = ["__version__"]
 
@@ -28,6 +26,8 @@ def _load_version() -> str:
             pass
 
     try:
+        import httpx  # noqa: PLC0415
+
         resp = httpx.get(
             "https://raw.githubusercontent.com/rapid-recovery-agency-inc/agents-skills/refs/heads/main/cli/version.json",
             timeout=5.0,
@@ -42,4 +42,14 @@ def _load_version() -> str:
     return _FALLBACK_VERSION
 
 
-__version__: str = _load_version()
+def __getattr__(name: str) -> str:
+    """Resolve ``__version__`` on first access.
+
+    Loading the version may hit the network, so it is deferred until something
+    actually asks for it (shell completion never does).
+    """
+    if name == "__version__":
+        version = _load_version()
+        globals()["__version__"] = version
+        return version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
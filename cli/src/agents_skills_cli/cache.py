@@ -0,0 +1,57 @@
+"""Local on-disk cache shared by CLI commands.
+
+This module only depends on the standard library so it can be imported from
+latency-sensitive paths such as shell completion.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import tempfile
+from typing import Any
+from pathlib import Path
+
+
+CACHE_DIR_ENV = "AGENTS_SKILLS_CACHE_DIR"
+
+
+def get_cache_dir() -> Path:
+    """Return the cache directory, honouring overrides and XDG conventions.
+
+    Resolution order: ``$AGENTS_SKILLS_CACHE_DIR``, then
+    ``$XDG_CACHE_HOME/agents-skills``, then ``~/.cache/agents-skills``.
+    """
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache) if xdg_cache else Path.home() / ".cache"
+    return base / "agents-skills"
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` so readers never observe a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def read_json(path: Path) -> Any | None:
+    """Read a cached JSON document, returning None if missing or unreadable."""
+    try:
+        return json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: Path, payload: Any) -> None:
+    """Atomically write a compact JSON document into the cache."""
+    data = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+    atomic_write_bytes(path, data.encode("utf-8"))
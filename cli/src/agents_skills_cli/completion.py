@@ -0,0 +1,135 @@
+"""Shell completion callbacks backed by a precomputed index in the local cache.
+
+Completion callbacks run on every keypress, so this module only imports the
+standard library. The index is rewritten whenever a remote registry is loaded
+and is refreshed by a detached background process once it goes stale.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import subprocess
+from typing import Any
+
+from .cache import read_json, write_json, get_cache_dir
+
+
+INDEX_FILE = "completion-index.json"
+INDEX_VERSION = 1
+INDEX_TTL_SECONDS = 24 * 60 * 60
+REFRESH_MARKER_FILE = "completion-index.refresh"
+REFRESH_BACKOFF_SECONDS = 60
+HELP_MAX_CHARS = 60
+
+
+def _short_help(description: str) -> str:
+    first_sentence = description.split(". ", 1)[0].strip()
+    if len(first_sentence) > HELP_MAX_CHARS:
+        return first_sentence[: HELP_MAX_CHARS - 3].rstrip() + "..."
+    return first_sentence
+
+
+def build_completion_index(registry: dict[str, Any]) -> dict[str, Any]:
+    """Build the compact completion index from a validated registry."""
+    skills = registry.get("skills", [])
+    return {
+        "version": INDEX_VERSION,
+        "generated_at": time.time(),
+        "skills": sorted(
+            [skill["id"], _short_help(skill.get("description", ""))] for skill in skills
+        ),
+        "tags": sorted({tag for skill in skills for tag in skill.get("tags", [])}),
+    }
+
+
+def write_completion_index(registry: dict[str, Any]) -> None:
+    """Persist the completion index. Failures never break the calling command."""
+    try:
+        write_json(get_cache_dir() / INDEX_FILE, build_completion_index(registry))
+    except OSError:
+        pass
+
+
+def _spawn_refresh() -> None:
+    """Start a detached process that reloads the registry and rewrites the index.
+
+    A marker file throttles spawns so a burst of keypresses on a stale index
+    launches at most one refresh per backoff window.
+    """
+    marker = get_cache_dir() / REFRESH_MARKER_FILE
+    try:
+        if time.time() - marker.stat().st_mtime < REFRESH_BACKOFF_SECONDS:
+            return
+    except OSError:
+        pass
+
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+        subprocess.Popen(
+            [sys.executable, "-m", "agents_skills_cli.completion"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def load_completion_index() -> dict[str, Any]:
+    """Return the cached index, scheduling a background refresh when stale."""
+    index = read_json(get_cache_dir() / INDEX_FILE)
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        _spawn_refresh()
+        return {"skills": [], "tags": []}
+
+    if time.time() - index.get("generated_at", 0) > INDEX_TTL_SECONDS:
+        _spawn_refresh()
+    return index
+
+
+def complete_skill_id(incomplete: str) -> list[tuple[str, str]]:
+    """Complete skill ids, unique short names, and the ``all`` keyword."""
+    index = load_completion_index()
+    candidates: dict[str, str] = {"all": "Every skill in the registry"}
+
+    short_names: dict[str, list[str]] = {}
+    for skill_id, help_text in index.get("skills", []):
+        candidates[skill_id] = help_text
+        short_names.setdefault(skill_id.split("/")[-1], []).append(help_text)
+
+    for short_name, helps in short_names.items():
+        if len(helps) == 1:
+            candidates.setdefault(short_name, helps[0])
+
+    return [
+        (value, help_text)
+        for value, help_text in sorted(candidates.items())
+        if value.startswith(incomplete)
+    ]
+
+
+def complete_tag(incomplete: str) -> list[str]:
+    """Complete ``--tag`` values from the tags used in the registry."""
+    return [
+        tag
+        for tag in load_completion_index().get("tags", [])
+        if tag.startswith(incomplete)
+    ]
+
+
+def refresh_completion_index() -> None:
+    """Load the remote registry in the foreground and rewrite the index."""
+    from .core import CliError, load_registry, resolve_paths  # noqa: PLC0415
+
+    try:
+        load_registry(resolve_paths(registry=None, use_remote=True))
+    except CliError:
+        pass
+
+
+if __name__ == "__main__":
+    refresh_completion_index()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 import json
 import shutil
 import subprocess
@@ -8,8 +9,6 @@ from typing import Any
 from pathlib import Path
 from dataclasses import dataclass
 
-from jsonschema import Draft202012Validator
-
 
 class RegistrySource(Enum):
     LOCAL = "local"
@@ -55,6 +54,8 @@ class RegistryContext:
     tag_vocab_path: Path | None
     project_root: Path
     source: RegistrySource
+    # Set for --registry: that file is used as given, never a sibling index
+    explicit_registry: bool = False
 
 
 def resolve_paths(
@@ -74,6 +75,7 @@ def resolve_paths(
             tag_vocab_path=tag_vocab_path,
             project_root=root,
             source=RegistrySource.LOCAL,
+            explicit_registry=True,
         )
 
     if use_remote:
@@ -106,49 +108,207 @@ def load_json(path: Path) -> Any:
         raise CliError(f"Invalid JSON in {path}: {exc}") from exc
 
 
-def load_registry(ctx: RegistryContext) -> dict[str, Any]:
+REGISTRY_INDEX_FILE = "registry.index.json"
+SHARD_PATH_PATTERN = r"^shards/[a-z0-9-]+/[a-z0-9-]+\.json$"
+
+
+def _load_schema(ctx: RegistryContext) -> dict[str, Any]:
     if ctx.source == RegistrySource.REMOTE:
         from . import http_client  # noqa: PLC0415
 
-        registry = http_client.fetch_registry()
         schema = http_client.fetch_schema()
-        tag_vocabulary = http_client.fetch_tags_vocab()
     else:
-        registry = load_json(ctx.registry_path)
         schema = load_json(ctx.schema_path)
-        tag_vocabulary = load_json(ctx.tag_vocab_path)
 
-    if not isinstance(registry, dict):
-        path_str = str(ctx.registry_path) if ctx.registry_path else "remote"
-        raise CliError(f"registry.json must be a JSON object: {path_str}")
     if not isinstance(schema, dict):
         path_str = str(ctx.schema_path) if ctx.schema_path else "remote"
         raise CliError(f"registry.schema.json must be a JSON object: {path_str}")
+    return schema
+
+
+def _load_tag_vocabulary(ctx: RegistryContext) -> list[str]:
+    if ctx.source == RegistrySource.REMOTE:
+        from . import http_client  # noqa: PLC0415
+
+        tag_vocabulary = http_client.fetch_tags_vocab()
+    else:
+        tag_vocabulary = load_json(ctx.tag_vocab_path)
+
     if not isinstance(tag_vocabulary, list) or not all(
         isinstance(tag, str) for tag in tag_vocabulary
     ):
         path_str = str(ctx.tag_vocab_path) if ctx.tag_vocab_path else "remote"
         raise CliError(f"tags.vocab.json must be a JSON array of strings: {path_str}")
+    return tag_vocabulary
+
+
+def _validate_schema(
+    document: dict[str, Any], schema: dict[str, Any], label: str
+) -> None:
+    from jsonschema import Draft202012Validator  # noqa: PLC0415
 
     validator = Draft202012Validator(schema)
-    errors = sorted(validator.iter_errors(registry), key=lambda e: list(e.path))
+    errors = sorted(validator.iter_errors(document), key=lambda e: list(e.path))
     if errors:
         formatted = "; ".join(
             f"{'/'.join(str(p) for p in err.path) or '<root>'}: {err.message}"
             for err in errors[:5]
         )
-        raise CliError(f"registry.json failed schema validation: {formatted}")
+        raise CliError(f"{label} failed schema validation: {formatted}")
+
+
+INDEX_FIELDS = ("id", "name", "description", "tags")
+
+
+def _index_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """Derive the index schema: each skill's summary fields plus a ``shard``."""
+    skills = schema.get("properties", {}).get("skills", {})
+    items = skills.get("items", {})
+    fields = items.get("properties", {})
+    return {
+        **schema,
+        "properties": {
+            **schema.get("properties", {}),
+            "skills": {
+                **skills,
+                "items": {
+                    **items,
+                    "required": ["id", "name", "description", "shard"],
+                    "properties": {
+                        **{key: fields[key] for key in INDEX_FIELDS if key in fields},
+                        "shard": {"type": "string", "pattern": SHARD_PATH_PATTERN},
+                    },
+                },
+            },
+        },
+    }
+
 
-    _validate_language_and_tags(registry, set(tag_vocabulary))
+def load_registry(ctx: RegistryContext) -> dict[str, Any]:
+    if ctx.source == RegistrySource.REMOTE:
+        from . import http_client  # noqa: PLC0415
+
+        registry = http_client.fetch_registry()
+    else:
+        registry = load_json(ctx.registry_path)
+
+    if not isinstance(registry, dict):
+        path_str = str(ctx.registry_path) if ctx.registry_path else "remote"
+        raise CliError(f"registry.json must be a JSON object: {path_str}")
+
+    _validate_schema(registry, _load_schema(ctx), "registry.json")
+    _validate_language_and_tags(registry, set(_load_tag_vocabulary(ctx)))
+
+    if ctx.source == RegistrySource.REMOTE:
+        from .completion import write_completion_index  # noqa: PLC0415
+
+        write_completion_index(registry)
     return registry
 
 
-def _validate_language_and_tags(
-    registry: dict[str, Any], allowed_tags: set[str]
-) -> None:
+def load_registry_index(ctx: RegistryContext) -> dict[str, Any]:
+    """Load the lightweight registry index used by plain ``list`` and lookup.
+
+    A sharded registry publishes ``registry.index.json`` next to
+    ``registry.json``: the id, name, tags, a short description and a ``shard``
+    path for each skill, validated against those fields of
+    ``registry.schema.json``. Without an index, or when ``--registry`` names a
+    file explicitly, the monolithic registry is loaded instead.
+    """
+    if ctx.source == RegistrySource.REMOTE:
+        from . import http_client  # noqa: PLC0415
+
+        index = http_client.fetch_registry_index()
+        path_str = "remote"
+    elif ctx.explicit_registry:
+        index = None
+    else:
+        index_path = ctx.registry_path.parent / REGISTRY_INDEX_FILE
+        index = load_json(index_path) if index_path.exists() else None
+        path_str = str(index_path)
+
+    if index is None:
+        return load_registry(ctx)
+
+    if not isinstance(index, dict):
+        raise CliError(f"{REGISTRY_INDEX_FILE} must be a JSON object: {path_str}")
+
+    _validate_schema(index, _index_schema(_load_schema(ctx)), REGISTRY_INDEX_FILE)
+    _validate_tags(index, set(_load_tag_vocabulary(ctx)))
+
+    if ctx.source == RegistrySource.REMOTE:
+        from .completion import write_completion_index  # noqa: PLC0415
+
+        write_completion_index(index)
+    return index
+
+
+def _load_shard(ctx: RegistryContext, shard_path: str) -> Any:
+    """Return a shard's parsed JSON, or None if the registry does not have it."""
+    if ctx.source == RegistrySource.REMOTE:
+        from . import http_client  # noqa: PLC0415
+
+        return http_client.fetch_registry_shard(shard_path)
+
+    path = ctx.registry_path.parent / shard_path
+    return load_json(path) if path.exists() else None
+
+
+def _validate_shard(
+    ctx: RegistryContext, shard: Any, shard_path: str, skill_id: str
+) -> dict[str, Any]:
+    if not isinstance(shard, dict):
+        raise CliError(f"Shard {shard_path} must be a JSON object")
+    _validate_schema(shard, _load_schema(ctx), f"Shard {shard_path}")
+    if [skill["id"] for skill in shard["skills"]] != [skill_id]:
+        raise CliError(f"Shard {shard_path} does not describe skill '{skill_id}'")
+    _validate_language_and_tags(shard, set(_load_tag_vocabulary(ctx)))
+    return shard
+
+
+def load_skill_registry(ctx: RegistryContext, skill_id: str) -> dict[str, Any]:
+    """Return a registry holding only the skill named by id or short name.
+
+    Each shard of a sharded registry is itself a one-skill registry, so a full
+    ``<category>/<name>`` id is answered by fetching its shard alone. Short
+    names are resolved through :func:`load_registry_index` first. Registries
+    without shards, and ``--registry`` files, use the monolithic registry.
+    """
+    if not ctx.explicit_registry:
+        shard_path = f"shards/{skill_id}.json"
+        if re.match(SHARD_PATH_PATTERN, shard_path):
+            shard = _load_shard(ctx, shard_path)
+            if shard is not None:
+                return _validate_shard(ctx, shard, shard_path, skill_id)
+
+    index = load_registry_index(ctx)
+    entry = get_skill(index, skill_id)
+    shard_path = entry.get("shard")
+    if shard_path is None:
+        return {**index, "skills": [entry]}
+
+    shard = _load_shard(ctx, shard_path)
+    if shard is None:
+        raise CliError(f"Missing registry shard {shard_path} for '{entry['id']}'")
+    return _validate_shard(ctx, shard, shard_path, entry["id"])
+
+
+def _validate_tags(registry: dict[str, Any], allowed_tags: set[str]) -> None:
     if not allowed_tags:
         raise CliError("tags.vocab.json must define at least one tag")
 
+    for skill in registry.get("skills", []):
+        tags = skill.get("tags", [])
+        unknown = [tag for tag in tags if tag not in allowed_tags]
+        if unknown:
+            raise CliError(
+                f"Skill '{skill.get('id')}' has tags outside tag_vocabulary: {', '.join(unknown)}"
+            )
+
+
+def _validate_language_and_tags(
+    registry: dict[str, Any], allowed_tags: set[str]
+) -> None:
     for skill in registry.get("skills", []):
         lang = skill.get("primary_language")
         if lang not in PRIMARY_LANGUAGES:
@@ -157,12 +317,7 @@ def _validate_language_and_tags(
                 f"Allowed: {', '.join(sorted(PRIMARY_LANGUAGES))}"
             )
 
-        tags = skill.get("tags", [])
-        unknown = [tag for tag in tags if tag not in allowed_tags]
-        if unknown:
-            raise CliError(
-                f"Skill '{skill.get('id')}' has tags outside tag_vocabulary: {', '.join(unknown)}"
-            )
+    _validate_tags(registry, allowed_tags)
 
 
 def ensure_git_installed() -> None:
@@ -222,6 +377,20 @@ def ensure_submodule(
     return [a for a in actions if a]
 
 
+def parse_github_repo(repo_url: str) -> tuple[str, str]:
+    """Return ``(owner, repo)`` for a GitHub HTTPS or SSH repository URL."""
+    # URL format: https://github.com/owner/repo or git@github.com:owner/repo
+    if "github.com" not in repo_url:
+        raise CliError(f"Unsupported repo URL: {repo_url}")
+    if repo_url.startswith("git@"):
+        # SSH format: git@github.com:owner/repo.git
+        parts = repo_url.rsplit(":", maxsplit=1)[-1].replace(".git", "").split("/")
+    else:
+        # HTTPS format: https://github.com/owner/repo
+        parts = repo_url.rstrip("/").split("/")[-2:]
+    return parts[0], parts[1]
+
+
 def fetch_skill_directory(
     repo_url: str,
     source_path: str,
@@ -232,6 +401,9 @@ def fetch_skill_directory(
 ) -> list[str]:
     """Fetch a skill directory from GitHub using API.
 
+    The blob SHA of every written file is recorded in the project lock so
+    ``status`` can later detect local edits and upstream changes.
+
     Args:
         repo_url: GitHub repository URL (e.g., https://github.com/owner/repo)
         source_path: Path in the repo (e.g., skills/generic/create-agents-files)
@@ -244,20 +416,10 @@ def fetch_skill_directory(
         List of installed file paths
 
     """
-    from .http_client import fetch_file_content, fetch_directory_tree  # noqa: PLC0415
+    from .lockfile import FileHasher, record_install, git_blob_sha_file  # noqa: PLC0415
+    from .http_client import download_file, fetch_directory_tree  # noqa: PLC0415
 
-    # Parse owner/repo from URL
-    # URL format: https://github.com/owner/repo or git@github.com:owner/repo
-    if "github.com" in repo_url:
-        if repo_url.startswith("git@"):
-            # SSH format: git@github.com:owner/repo.git
-            parts = repo_url.rsplit(":", maxsplit=1)[-1].replace(".git", "").split("/")
-        else:
-            # HTTPS format: https://github.com/owner/repo
-            parts = repo_url.rstrip("/").split("/")[-2:]
-        owner, repo = parts[0], parts[1]
-    else:
-        raise CliError(f"Unsupported repo URL: {repo_url}")
+    owner, repo = parse_github_repo(repo_url)
 
     # Get list of all files in the directory tree
     files = fetch_directory_tree(owner, repo, source_path, ref)
@@ -278,7 +440,9 @@ def fetch_skill_directory(
     # Create target directory
     full_target.mkdir(parents=True, exist_ok=True)
 
+    hasher = FileHasher()
     installed: list[str] = []
+    installed_shas: dict[str, str] = {}
     for file_info in files:
         # Calculate relative path within the skill directory
         rel_path = file_info["path"]
@@ -291,11 +455,28 @@ def fetch_skill_directory(
         # Create parent directories
         local_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Download and write file
-        content = fetch_file_content(file_info["download_url"])
-        local_file.write_bytes(content)
+        # Download and write file (large files resume on interruption)
+        download_file(
+            file_info["download_url"],
+            local_file,
+            size=file_info.get("size"),
+            key=file_info.get("sha"),
+        )
         installed.append(str(local_file))
 
+        sha = git_blob_sha_file(local_file, local_file.stat().st_size)
+        installed_shas[rel_path] = sha
+        hasher.remember(local_file, sha)
+
+    hasher.save()
+    record_install(
+        project_root,
+        target_path,
+        repo_url=repo_url,
+        source_path=base_path,
+        ref=ref,
+        files=installed_shas,
+    )
     return installed
 
 
@@ -1,19 +1,50 @@
 from __future__ import annotations
 
+import re
+import gzip
 import json
+import time
+import shutil
+import hashlib
+import tempfile
 from typing import Any
+from pathlib import Path
 from contextlib import contextmanager
 
 import httpx
 
 from . import __version__
+from .cache import read_json, write_json, get_cache_dir
+from .lockfile import git_blob_sha_file
+
+
+try:  # Optional: enables the smaller .zst registry artifacts
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the installed extras
+    zstandard = None
 
 
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com/rapid-recovery-agency-inc/agents-skills/refs/heads/main/cli"
 
 DEFAULT_TIMEOUT = httpx.Timeout(10.0, read=30.0)
 
+PARTIAL_CONTENT = 206
+NOT_MODIFIED = 304
 NOT_FOUND = 404
+RANGE_NOT_SATISFIABLE = 416
+
+# Pre-compressed registry artifacts, in order of preference. A variant that
+# failed (any non-2xx response or an undecodable body) is re-probed once this many
+# seconds have passed.
+ARTIFACT_ENCODINGS = ("zst", "gz", "identity")
+ARTIFACT_REPROBE_SECONDS = 24 * 60 * 60
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Files at least this large are downloaded through a resumable partial file.
+RESUMABLE_THRESHOLD = 1024 * 1024
+RESUME_MAX_STALLED_ATTEMPTS = 5
+_CONTENT_RANGE_START = re.compile(r"bytes\s+(\d+)-")
 
 
 @contextmanager
@@ -56,6 +87,187 @@ def fetch_json(url: str, timeout: httpx.Timeout | None = None) -> dict[str, Any]
         return response.json()
 
 
+def fetch_json_revalidated(
+    url: str, cache_name: str, timeout: httpx.Timeout | None = None
+) -> Any:
+    """Fetch JSON, revalidating a cached copy with ``If-None-Match``.
+
+    Responses carrying an ``ETag`` are stored under ``<cache>/http/``. A later
+    ``304 Not Modified`` answer is served from that copy, which also keeps
+    GitHub API calls from counting against the rate limit.
+
+    Raises:
+        httpx.HTTPStatusError: On HTTP errors
+        httpx.ConnectError: On connection failures
+        httpx.TimeoutException: On timeout
+
+    """
+    cache_path = get_cache_dir() / "http" / cache_name
+    cached = read_json(cache_path)
+    headers = {}
+    if isinstance(cached, dict) and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    with get_http_client(timeout) as client:
+        response = client.get(url, headers=headers)
+        if response.status_code == NOT_MODIFIED and headers:
+            return cached["body"]
+        response.raise_for_status()
+        body = response.json()
+
+    etag = response.headers.get("ETag")
+    if etag:
+        try:
+            write_json(cache_path, {"etag": etag, "body": body})
+        except OSError:
+            pass
+    return body
+
+
+def _artifact_encodings(meta: dict[str, Any]) -> list[str]:
+    missing = _fresh_missing(meta)
+    return [
+        enc
+        for enc in ARTIFACT_ENCODINGS
+        if (enc != "zst" or zstandard is not None)
+        and (enc == "identity" or enc not in missing)
+    ]
+
+
+def _fresh_missing(meta: dict[str, Any]) -> dict[str, float]:
+    """Variants that failed within the last ``ARTIFACT_REPROBE_SECONDS``."""
+    missing = meta.get("missing")
+    if not isinstance(missing, dict):
+        return {}
+    now = time.time()
+    return {
+        enc: failed_at
+        for enc, failed_at in missing.items()
+        if isinstance(failed_at, (int, float))
+        and now - failed_at <= ARTIFACT_REPROBE_SECONDS
+    }
+
+
+def _stream_to_file(response: httpx.Response, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.name}.", delete=False
+    ) as handle:
+        try:
+            for chunk in response.iter_bytes():
+                handle.write(chunk)
+        except BaseException:
+            handle.close()
+            Path(handle.name).unlink(missing_ok=True)
+            raise
+    Path(handle.name).replace(path)
+
+
+def _read_artifact(path: Path) -> bytes:
+    """Read a cached artifact, decompressing it based on its magic bytes.
+
+    Raises:
+        OSError: If the file is unreadable or not a valid compressed stream
+
+    """
+    with path.open("rb") as handle:
+        magic = handle.read(4)
+        handle.seek(0)
+        if magic.startswith(_GZIP_MAGIC):
+            try:
+                with gzip.GzipFile(fileobj=handle) as stream:
+                    return stream.read()
+            except EOFError as exc:
+                raise OSError(f"Truncated gzip artifact: {path}") from exc
+        if magic == _ZSTD_MAGIC:
+            if zstandard is None:
+                raise OSError("zstandard is not installed")
+            try:
+                with zstandard.ZstdDecompressor().stream_reader(handle) as stream:
+                    return stream.read()
+            except zstandard.ZstdError as exc:
+                raise OSError(f"Invalid zstd artifact: {path}: {exc}") from exc
+        return handle.read()
+
+
+def fetch_registry_artifact(name: str, compressed: bool = True) -> Any:
+    """Fetch a registry JSON artifact, preferring pre-compressed variants.
+
+    Tries ``<name>.zst`` (when zstandard is installed), then ``<name>.gz``, then
+    the plain file, falling through on any non-2xx response or an undecodable
+    body, so only a failure of the plain file is raised. Pass
+    ``compressed=False`` for small artifacts that are only published plain. The
+    body is stored under ``<cache>/registry/`` in the form it was
+    downloaded and decompressed from there; the variant and ``ETag`` that
+    worked are remembered so later runs revalidate with a single conditional
+    request, and variants that failed are not probed again until
+    ``ARTIFACT_REPROBE_SECONDS`` have passed.
+
+    Raises:
+        httpx.HTTPStatusError: On HTTP errors for the plain file
+        httpx.ConnectError: On connection failures
+        httpx.TimeoutException: On timeout
+        json.JSONDecodeError: If the plain file is not valid JSON
+
+    """
+    cache_dir = get_cache_dir() / "registry"
+    meta_path = cache_dir / f"{name}.meta.json"
+    meta = read_json(meta_path)
+    if not isinstance(meta, dict):
+        meta = {}
+
+    encodings = _artifact_encodings(meta) if compressed else ["identity"]
+    missing = _fresh_missing(meta)
+    with get_http_client() as client:
+        for encoding in encodings:
+            suffix = "" if encoding == "identity" else f".{encoding}"
+            body_path = cache_dir / f"{name}{suffix}"
+            headers = {}
+            if meta.get("encoding") == encoding and meta.get("etag"):
+                if body_path.exists():
+                    headers["If-None-Match"] = meta["etag"]
+
+            url = f"{GITHUB_RAW_BASE}/{name}{suffix}"
+            with client.stream("GET", url, headers=headers) as response:
+                status = response.status_code
+                # Mirrors may refuse compressed variants with any status
+                if (
+                    encoding != "identity"
+                    and status != NOT_MODIFIED
+                    and not response.is_success
+                ):
+                    missing[encoding] = time.time()
+                    continue
+                if status != NOT_MODIFIED:
+                    response.raise_for_status()
+                    _stream_to_file(response, body_path)
+                etag = response.headers.get("ETag")
+
+            try:
+                data = json.loads(_read_artifact(body_path))
+            except (OSError, ValueError):
+                if encoding == "identity":
+                    raise
+                missing[encoding] = time.time()
+                continue
+
+            missing.pop(encoding, None)
+            try:
+                write_json(
+                    meta_path,
+                    {
+                        "encoding": encoding,
+                        "etag": etag,
+                        "missing": missing,
+                    },
+                )
+            except OSError:
+                pass
+            return data
+
+    raise AssertionError("unreachable: the plain artifact either loads or raises")
+
+
 def fetch_registry() -> dict[str, Any]:
     """Fetch the registry.json from GitHub.
 
@@ -69,7 +281,7 @@ def fetch_registry() -> dict[str, Any]:
     from .core import CliError  # noqa: PLC0415
 
     try:
-        return fetch_json(f"{GITHUB_RAW_BASE}/registry.json")
+        return fetch_registry_artifact("registry.json")
     except httpx.HTTPStatusError as exc:
         raise CliError(
             f"Failed to fetch registry (HTTP {exc.response.status_code})"
@@ -87,7 +299,7 @@ def fetch_schema() -> dict[str, Any]:
     from .core import CliError  # noqa: PLC0415
 
     try:
-        return fetch_json(f"{GITHUB_RAW_BASE}/registry.schema.json")
+        return fetch_registry_artifact("registry.schema.json")
     except httpx.HTTPStatusError as exc:
         raise CliError(
             f"Failed to fetch schema (HTTP {exc.response.status_code})"
@@ -105,7 +317,7 @@ def fetch_tags_vocab() -> list[str]:
     from .core import CliError  # noqa: PLC0415
 
     try:
-        return fetch_json(f"{GITHUB_RAW_BASE}/tags.vocab.json")
+        return fetch_registry_artifact("tags.vocab.json")
     except httpx.HTTPStatusError as exc:
         raise CliError(
             f"Failed to fetch tags vocab (HTTP {exc.response.status_code})"
@@ -118,6 +330,62 @@ def fetch_tags_vocab() -> list[str]:
         raise CliError(f"Invalid JSON in tags vocab: {exc}") from exc
 
 
+def fetch_registry_index() -> dict[str, Any] | None:
+    """Fetch registry.index.json from GitHub.
+
+    Returns:
+        The parsed index, or None if the registry is not sharded
+
+    Raises:
+        CliError: On any other fetch failure
+
+    """
+    from .core import CliError  # noqa: PLC0415
+
+    try:
+        return fetch_registry_artifact("registry.index.json")
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == NOT_FOUND:
+            return None
+        raise CliError(
+            f"Failed to fetch registry index (HTTP {exc.response.status_code})"
+        ) from exc
+    except httpx.ConnectError as exc:
+        raise CliError("Cannot connect to GitHub (check network)") from exc
+    except httpx.TimeoutException as exc:
+        raise CliError("Request timed out") from exc
+    except json.JSONDecodeError as exc:
+        raise CliError(f"Invalid JSON in registry index: {exc}") from exc
+
+
+def fetch_registry_shard(path: str) -> dict[str, Any] | None:
+    """Fetch one single-skill registry shard from GitHub.
+
+    Returns:
+        The parsed shard, or None if the registry does not publish it
+
+    Raises:
+        CliError: On any other fetch failure
+
+    """
+    from .core import CliError  # noqa: PLC0415
+
+    try:
+        return fetch_registry_artifact(path, compressed=False)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == NOT_FOUND:
+            return None
+        raise CliError(
+            f"Failed to fetch registry shard {path} (HTTP {exc.response.status_code})"
+        ) from exc
+    except httpx.ConnectError as exc:
+        raise CliError("Cannot connect to GitHub (check network)") from exc
+    except httpx.TimeoutException as exc:
+        raise CliError("Request timed out") from exc
+    except json.JSONDecodeError as exc:
+        raise CliError(f"Invalid JSON in registry shard {path}: {exc}") from exc
+
+
 def fetch_version() -> str | None:
     """Fetch the version.json from GitHub.
 
@@ -200,6 +468,111 @@ def fetch_file_content(url: str) -> bytes:
             raise CliError("Request timed out") from exc
 
 
+def download_file(
+    url: str, dest: Path, size: int | None = None, key: str | None = None
+) -> None:
+    """Download a file to ``dest``.
+
+    Files of at least ``RESUMABLE_THRESHOLD`` bytes are streamed into a partial
+    file under ``<cache>/partial/`` and resumed with HTTP ``Range`` requests
+    after timeouts or dropped connections, so a slow link only costs the bytes
+    it failed to deliver. The partial file survives across runs, so re-running
+    an interrupted ``add`` also resumes. A resumed file is only moved into
+    place once its size and, when ``key`` is given, its git blob SHA match.
+
+    Args:
+        url: The raw file URL (e.g., from download_url)
+        dest: Local destination path
+        size: Expected size in bytes, if known
+        key: The file's git blob SHA, if known; names the partial file and
+            is checked against the finished download. Defaults to a hash
+            of the URL (no content check)
+
+    Raises:
+        CliError: On any fetch failure, if the transfer keeps stalling, or
+            if the downloaded content does not match ``key``
+
+    """
+    if size is None or size < RESUMABLE_THRESHOLD:
+        dest.write_bytes(fetch_file_content(url))
+        return
+
+    partial_key = key or hashlib.sha256(url.encode("utf-8")).hexdigest()
+    partial = get_cache_dir() / "partial" / f"{partial_key}.part"
+    partial.parent.mkdir(parents=True, exist_ok=True)
+
+    from .core import CliError  # noqa: PLC0415
+
+    with get_http_client() as client:
+        _download_resumable(client, url, partial, size)
+    if key and git_blob_sha_file(partial, size) != key:
+        partial.unlink()
+        raise CliError(f"Checksum mismatch for {url}: expected blob {key}")
+    # The cache and the project may be on different filesystems
+    shutil.move(partial, dest)
+
+
+def _content_range_start(response: httpx.Response) -> int | None:
+    match = _CONTENT_RANGE_START.match(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def _download_resumable(
+    client: httpx.Client, url: str, partial: Path, size: int
+) -> None:
+    from .core import CliError  # noqa: PLC0415
+
+    stalled = 0
+    while True:
+        offset = partial.stat().st_size if partial.exists() else 0
+        if offset == size:
+            return
+        if offset > size:
+            partial.unlink()
+            offset = 0
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == RANGE_NOT_SATISFIABLE:
+                    # Stale partial from a different upstream version
+                    partial.unlink(missing_ok=True)
+                    continue
+                response.raise_for_status()
+                if (
+                    response.status_code == PARTIAL_CONTENT
+                    and _content_range_start(response) != offset
+                ):
+                    # Not the bytes we asked for: start over without a Range
+                    partial.unlink(missing_ok=True)
+                    continue
+                # A server that ignores Range sends the whole file again
+                mode = "ab" if response.status_code == PARTIAL_CONTENT else "wb"
+                with partial.open(mode) as handle:
+                    for chunk in response.iter_bytes():
+                        handle.write(chunk)
+        except httpx.HTTPStatusError as exc:
+            raise CliError(
+                f"Failed to fetch file (HTTP {exc.response.status_code})"
+            ) from exc
+        except httpx.TransportError as exc:
+            received = partial.stat().st_size if partial.exists() else 0
+            stalled = 0 if received > offset else stalled + 1
+            if stalled >= RESUME_MAX_STALLED_ATTEMPTS:
+                raise CliError(
+                    f"Download kept failing at {received}/{size} bytes: {exc}"
+                ) from exc
+            if stalled:
+                time.sleep(min(0.5 * 2**stalled, 8.0))
+            continue
+
+        received = partial.stat().st_size
+        if received != size:
+            partial.unlink()
+            raise CliError(f"Size mismatch for {url}: got {received}, expected {size}")
+        return
+
+
 def fetch_directory_tree(
     owner: str, repo: str, path: str, ref: str
 ) -> list[dict[str, Any]]:
@@ -233,8 +606,45 @@ def fetch_directory_tree(
                         "path": entry["path"],
                         "name": entry["name"],
                         "download_url": entry.get("download_url"),
+                        "sha": entry.get("sha"),
+                        "size": entry.get("size"),
                     }
                 )
 
     _fetch_recursive(path)
     return all_files
+
+
+def fetch_repo_tree(owner: str, repo: str, ref: str) -> dict[str, Any]:
+    """Fetch the full recursive git tree for a ref in a single request.
+
+    Args:
+        owner: GitHub repository owner
+        repo: GitHub repository name
+        ref: Git ref (branch, tag, or commit SHA)
+
+    Returns:
+        The GitHub tree payload; ``tree`` holds blob entries with ``path``,
+        ``sha`` and ``size``, and ``truncated`` is set for very large repos
+
+    Raises:
+        CliError: On any fetch failure
+
+    """
+    from .core import CliError  # noqa: PLC0415
+
+    url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{ref}?recursive=1"
+    cache_name = f"tree-{owner}-{repo}-{ref.replace('/', '_')}.json"
+
+    try:
+        return fetch_json_revalidated(url, cache_name)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == NOT_FOUND:
+            raise CliError(f"Ref not found: {owner}/{repo}@{ref}") from exc
+        raise CliError(
+            f"Failed to fetch repository tree (HTTP {exc.response.status_code})"
+        ) from exc
+    except httpx.ConnectError as exc:
+        raise CliError("Cannot connect to GitHub (check network)") from exc
+    except httpx.TimeoutException as exc:
+        raise CliError("Request timed out") from exc
@@ -0,0 +1,149 @@
+"""Install lock and local file hashing.
+
+The lock (``agents-skills.lock.json`` in the project root) records, for every
+installed skill directory, the upstream git blob SHA of each file at install
+time. It is meant to be committed alongside the installed skills.
+
+Local hashes use the git blob format so they compare directly with GitHub
+listings. A per-user hash cache keyed by path, size and mtime lets warm runs
+skip reading files that have not changed.
+"""
+
+from __future__ import annotations
+
+import os
+import hashlib
+from typing import Any
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import read_json, write_json, get_cache_dir
+
+
+LOCK_FILE = "agents-skills.lock.json"
+LOCK_VERSION = 1
+HASH_CACHE_FILE = "file-hashes.json"
+IGNORED_DIR_NAMES = {".git", "__pycache__"}
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Return the git blob SHA-1 for ``data`` (what GitHub reports as ``sha``)."""
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def git_blob_sha_file(path: Path, size: int) -> str:
+    """Return the git blob SHA-1 of a file without loading it all at once."""
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(b"blob %d\0" % size)
+    with path.open("rb") as handle:
+        while chunk := handle.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_lock(project_root: Path) -> dict[str, Any]:
+    """Return the project's lock, or an empty one if missing or unreadable."""
+    lock = read_json(project_root / LOCK_FILE)
+    if not isinstance(lock, dict) or lock.get("version") != LOCK_VERSION:
+        return {"version": LOCK_VERSION, "installs": {}}
+    lock.setdefault("installs", {})
+    return lock
+
+
+def record_install(
+    project_root: Path,
+    target_path: Path,
+    *,
+    repo_url: str,
+    source_path: str,
+    ref: str,
+    files: dict[str, str],
+) -> None:
+    """Record the upstream blob SHAs of a freshly installed skill directory."""
+    lock = read_lock(project_root)
+    lock["installs"][target_path.as_posix()] = {
+        "repo": repo_url,
+        "source_path": source_path,
+        "ref": ref,
+        "files": dict(sorted(files.items())),
+    }
+    write_json(project_root / LOCK_FILE, lock)
+
+
+class FileHasher:
+    """Hash local files in parallel with an mtime+size fast path.
+
+    Cached digests are reused when a file's size and ``st_mtime_ns`` are
+    unchanged; only new or touched files are read. Call :meth:`save` to
+    persist newly computed digests for the next run.
+    """
+
+    def __init__(self, cache_path: Path | None = None) -> None:
+        self.cache_path = cache_path or get_cache_dir() / HASH_CACHE_FILE
+        cached = read_json(self.cache_path)
+        self._cache: dict[str, list[Any]] = cached if isinstance(cached, dict) else {}
+        self._dirty = False
+        self.hashed = 0
+        self.reused = 0
+
+    def remember(self, path: Path, sha: str) -> None:
+        """Seed the cache with a digest already known for ``path``."""
+        stat = path.stat()
+        self._cache[os.path.abspath(path)] = [stat.st_size, stat.st_mtime_ns, sha]
+        self._dirty = True
+
+    def hash_files(self, paths: list[Path]) -> dict[Path, str]:
+        """Return ``{path: blob sha}`` for every readable path."""
+        results: dict[Path, str] = {}
+        pending: list[tuple[Path, str, os.stat_result]] = []
+        for path in paths:
+            key = os.path.abspath(path)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            cached = self._cache.get(key)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                results[path] = cached[2]
+                self.reused += 1
+            else:
+                pending.append((path, key, stat))
+
+        if pending:
+            workers = min(32, (os.cpu_count() or 1) + 4, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = pool.map(
+                    lambda item: git_blob_sha_file(item[0], item[2].st_size), pending
+                )
+                for (path, key, stat), sha in zip(pending, digests, strict=True):
+                    results[path] = sha
+                    self._cache[key] = [stat.st_size, stat.st_mtime_ns, sha]
+            self.hashed += len(pending)
+            self._dirty = True
+        return results
+
+    def save(self) -> None:
+        """Persist the hash cache if anything changed. Never raises."""
+        if not self._dirty:
+            return
+        try:
+            write_json(self.cache_path, self._cache)
+            self._dirty = False
+        except OSError:
+            pass
+
+
+def list_local_files(root: Path) -> dict[str, Path]:
+    """Return ``{posix relative path: path}`` for every file under ``root``."""
+    files: dict[str, Path] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIR_NAMES]
+        base = Path(dirpath)
+        for filename in filenames:
+            path = base / filename
+            files[path.relative_to(root).as_posix()] = path
+    return files
@@ -5,17 +5,18 @@ from pathlib import Path
 
 import typer
 
-from . import __version__
 from .core import (
     CliError,
-    get_skill,
     get_ide_dir,
     filter_skills,
     load_registry,
     resolve_paths,
+    load_registry_index,
+    load_skill_registry,
     ensure_git_installed,
     fetch_skill_directory,
 )
+from .completion import complete_tag, complete_skill_id
 
 
 app = typer.Typer(
@@ -34,6 +35,8 @@ def main_callback(
     ),
 ) -> None:
     if version:
+        from . import __version__  # noqa: PLC0415
+
         typer.echo(f"agents-skills {__version__}")
         raise typer.Exit()
 
@@ -62,7 +65,10 @@ def list_skills(
         None, "--registry", help="Path to registry.json"
     ),
     tag: list[str] | None = typer.Option(
-        None, "--tag", help="Filter by tag (repeatable)"
+        None,
+        "--tag",
+        help="Filter by tag (repeatable)",
+        autocompletion=complete_tag,
     ),
     as_json: bool = typer.Option(False, "--json", help="Output JSON"),
     remote: bool = typer.Option(True, "--remote/--local"),
@@ -71,7 +77,10 @@ def list_skills(
     """List skills from the registry."""
     try:
         ctx = resolve_paths(registry=registry, use_remote=remote)
-        data = load_registry(ctx)
+        # The index only carries summaries; search, --json and -v need the
+        # full manifests from registry.json
+        full = bool(query) or as_json or verbose
+        data = load_registry(ctx) if full else load_registry_index(ctx)
         skills = filter_skills(data, queries=query or [], tags=tag or [])
 
         if as_json:
@@ -112,14 +121,16 @@ def _add_impl(
 ) -> None:
     ensure_git_installed()
     ctx = resolve_paths(registry=registry, use_remote=use_remote)
-    data = load_registry(ctx)
-
-    source = data["source"]
 
     if skill_id == "all":
+        data = load_registry(ctx)
         skills = data["skills"]
     else:
-        skills = [get_skill(data, skill_id)]
+        # Sharded registries only fetch and validate the requested skill
+        data = load_skill_registry(ctx, skill_id)
+        skills = data["skills"]
+
+    source = data["source"]
 
     ide_dir = get_ide_dir(ide_choice)
 
@@ -186,7 +197,9 @@ def _add_impl(
 
 @app.command("add")
 def add_skill(
-    skill_id: str = typer.Argument(help="Skill id from registry, or 'all'"),
+    skill_id: str = typer.Argument(
+        help="Skill id from registry, or 'all'", autocompletion=complete_skill_id
+    ),
     registry: str | None = typer.Option(
         None, "--registry", help="Path to registry.json"
     ),
@@ -222,9 +235,74 @@ def add_skill(
         raise typer.Exit(code=1) from None
 
 
+_STATUS_MARKERS = {
+    "outdated": ("O", typer.colors.YELLOW),
+    "modified": ("M", typer.colors.RED),
+    "missing": ("!", typer.colors.RED),
+    "extra": ("?", typer.colors.BLUE),
+}
+
+
+@app.command("status")
+def status(
+    registry: str | None = typer.Option(
+        None, "--registry", help="Path to registry.json"
+    ),
+    offline: bool = typer.Option(
+        False, "--offline", help="Compare against the lock only (no network)"
+    ),
+    as_json: bool = typer.Option(False, "--json", help="Output JSON"),
+    remote: bool = typer.Option(True, "--remote/--local"),
+) -> None:
+    """Show installed skills that are outdated or locally modified."""
+    from .status import DRIFT_KINDS, compute_status  # noqa: PLC0415
+
+    try:
+        ctx = resolve_paths(registry=registry, use_remote=remote)
+        data = None if offline else load_registry(ctx)
+        reports = compute_status(ctx.project_root, data, offline=offline)
+
+        if as_json:
+            _print_json({"count": len(reports), "skills": reports})
+            return
+
+        if not reports:
+            typer.echo("No installed skills found.")
+            return
+
+        for report in reports:
+            counts = [
+                f"{len(report[kind])} {kind}" for kind in DRIFT_KINDS if report[kind]
+            ]
+            summary = ", ".join(counts) if counts else "up to date"
+            typer.echo(
+                typer.style(report["path"], fg=typer.colors.BLUE) + f": {summary}"
+            )
+            for kind in DRIFT_KINDS:
+                marker, color = _STATUS_MARKERS[kind]
+                for rel in report[kind]:
+                    typer.echo("  " + typer.style(marker, fg=color) + f" {rel}")
+    except CliError as exc:
+        typer.secho(str(exc), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1) from None
+
+
+@app.command("outdated", hidden=True)
+def outdated_alias(
+    registry: str | None = typer.Option(None, "--registry"),
+    offline: bool = typer.Option(False, "--offline"),
+    as_json: bool = typer.Option(False, "--json"),
+    remote: bool = typer.Option(True, "--remote/--local"),
+) -> None:
+    """Alias for status."""
+    status(registry=registry, offline=offline, as_json=as_json, remote=remote)
+
+
 @app.command("install", hidden=True)
 def install_alias(
-    skill_id: str = typer.Argument(help="Skill id from registry, or 'all'"),
+    skill_id: str = typer.Argument(
+        help="Skill id from registry, or 'all'", autocompletion=complete_skill_id
+    ),
     registry: str | None = typer.Option(None, "--registry"),
     target_root: str | None = typer.Option(None, "--target-root"),
     dry_run: bool = typer.Option(False, "--dry-run"),
@@ -0,0 +1,179 @@
+"""Drift detection between installed skills and their upstream sources.
+
+Each installed skill directory is compared against two baselines:
+
+- the lock, which records what was installed (local edits show up as
+  ``modified``, deleted files as ``missing``);
+- the upstream tree, fetched once per repo/ref, which shows files that
+  changed or appeared since install as ``outdated``.
+
+Skills installed before the lock existed fall back to the upstream tree as
+their only baseline, so any difference is reported as ``modified``.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+from pathlib import Path
+
+from .core import CliError, IDE_DIR_MAP, parse_github_repo
+from .lockfile import read_lock, FileHasher, list_local_files
+
+
+DRIFT_KINDS = ("outdated", "modified", "missing", "extra")
+
+
+def _discover_installs(
+    project_root: Path, registry: dict[str, Any] | None
+) -> dict[str, dict[str, Any]]:
+    """Return install records keyed by skill directory relative to the root."""
+    installs: dict[str, dict[str, Any]] = {
+        key: dict(entry) for key, entry in read_lock(project_root)["installs"].items()
+    }
+    if registry is None:
+        return installs
+
+    source = registry["source"]
+    for ide_dir in sorted(set(IDE_DIR_MAP.values())):
+        for skill in registry.get("skills", []):
+            key = f"{ide_dir}/{skill['install']['target_path']}"
+            if key not in installs and (project_root / key).is_dir():
+                installs[key] = {
+                    "repo": source["repo"],
+                    "source_path": skill["source_path"],
+                    "ref": source["default_ref"],
+                    "files": None,
+                }
+    return installs
+
+
+def _fetch_upstream(
+    installs: dict[str, dict[str, Any]],
+) -> dict[str, dict[str, str]]:
+    """Return upstream ``{relative path: sha}`` per install key.
+
+    One recursive tree listing is fetched per distinct repo/ref. If GitHub
+    truncates the listing, the affected skills are listed individually.
+    """
+    from .http_client import fetch_repo_tree, fetch_directory_tree  # noqa: PLC0415
+
+    trees: dict[tuple[str, str], dict[str, str] | None] = {}
+    upstream: dict[str, dict[str, str]] = {}
+    for key, entry in installs.items():
+        owner, repo = parse_github_repo(entry["repo"])
+        tree_key = (entry["repo"], entry["ref"])
+        if tree_key not in trees:
+            payload = fetch_repo_tree(owner, repo, entry["ref"])
+            trees[tree_key] = (
+                None
+                if payload.get("truncated")
+                else {
+                    item["path"]: item["sha"]
+                    for item in payload.get("tree", [])
+                    if item.get("type") == "blob"
+                }
+            )
+
+        prefix = entry["source_path"].rstrip("/") + "/"
+        blobs = trees[tree_key]
+        if blobs is None:
+            blobs = {
+                item["path"]: item["sha"]
+                for item in fetch_directory_tree(
+                    owner, repo, entry["source_path"], entry["ref"]
+                )
+            }
+        upstream[key] = {
+            path[len(prefix) :]: sha
+            for path, sha in blobs.items()
+            if path.startswith(prefix)
+        }
+    return upstream
+
+
+def _classify(
+    local: dict[str, str],
+    baseline: dict[str, str],
+    upstream: dict[str, str] | None,
+) -> dict[str, list[str]]:
+    drift: dict[str, list[str]] = {kind: [] for kind in DRIFT_KINDS}
+    for rel in sorted(set(local) | set(baseline) | set(upstream or {})):
+        here = local.get(rel)
+        base = baseline.get(rel)
+        up = upstream.get(rel) if upstream is not None else None
+
+        if here is None:
+            if base is not None and (upstream is None or up is not None):
+                drift["missing"].append(rel)
+            elif base is None and up is not None:
+                drift["outdated"].append(rel)
+            continue
+
+        if base is None and up is None:
+            drift["extra"].append(rel)
+        elif base is not None and here != base:
+            drift["modified"].append(rel)
+        elif base is None and here != up:
+            drift["modified"].append(rel)
+        elif upstream is not None and here != up:
+            drift["outdated"].append(rel)
+    return drift
+
+
+def compute_status(
+    project_root: Path,
+    registry: dict[str, Any] | None,
+    offline: bool = False,
+) -> list[dict[str, Any]]:
+    """Report drift for every installed skill under the project root.
+
+    Args:
+        project_root: Project root holding the IDE skills directories
+        registry: Loaded registry used to find installs missing from the lock,
+            or None to rely on the lock alone
+        offline: If True, skip the upstream tree and report local drift only
+
+    Returns:
+        One report per installed skill directory, sorted by path, each with
+        ``outdated``, ``modified``, ``missing`` and ``extra`` file lists
+
+    """
+    installs = _discover_installs(project_root, registry)
+    if offline:
+        unlocked = sorted(k for k, v in installs.items() if v["files"] is None)
+        if unlocked:
+            raise CliError(
+                f"No lock entry for {', '.join(unlocked)}. "
+                "Run 'agents-skills add' or drop --offline."
+            )
+        upstream: dict[str, dict[str, str]] = {}
+    else:
+        upstream = _fetch_upstream(installs)
+
+    local_paths = {key: list_local_files(project_root / key) for key in installs}
+    hasher = FileHasher()
+    digests = hasher.hash_files(
+        [path for files in local_paths.values() for path in files.values()]
+    )
+    hasher.save()
+
+    reports: list[dict[str, Any]] = []
+    for key in sorted(installs):
+        entry = installs[key]
+        local = {
+            rel: digests[path]
+            for rel, path in local_paths[key].items()
+            if path in digests
+        }
+        remote = upstream.get(key)
+        baseline = entry["files"] if entry["files"] is not None else remote or {}
+        reports.append(
+            {
+                "path": key,
+                "source_path": entry["source_path"],
+                "ref": entry["ref"],
+                "locked": entry["files"] is not None,
+                **_classify(local, baseline, remote),
+            }
+        )
+    return reports
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections.abc import Iterator
+
+import pytest
+
+from agents_skills_cli.cache import CACHE_DIR_ENV
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the CLI cache at a per-test directory."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv(CACHE_DIR_ENV, str(path))
+    return path
+
+
+class FileServer(ThreadingHTTPServer):
+    """Serves ``files`` by path, honouring ``Range``, with injectable faults.
+
+    ``drop_after``: close the connection after this many body bytes, for the
+    next ``drops`` responses. ``bad_range_start``: the start reported in
+    ``Content-Range`` instead of the real one, for the next response.
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.files: dict[str, bytes] = {}
+        self.statuses: dict[str, int] = {}
+        self.requests: list[dict[str, Any]] = []
+        self.drop_after: int | None = None
+        self.drops = 0
+        self.bad_range_start: int | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Root URL of the running server."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FileServer
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802
+        server = self.server
+        server.requests.append({"path": self.path, "range": self.headers.get("Range")})
+        if self.path in server.statuses:
+            self.send_response(server.statuses[self.path])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = server.files.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start = 0
+        requested = self.headers.get("Range")
+        if requested:
+            start = int(requested.removeprefix("bytes=").split("-")[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            reported = start
+            if server.bad_range_start is not None:
+                reported, server.bad_range_start = server.bad_range_start, None
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {reported}-{len(data) - 1}/{len(data)}"
+            )
+        else:
+            self.send_response(200)
+        body = data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if server.drops and server.drop_after is not None:
+            server.drops -= 1
+            self.wfile.write(body[: server.drop_after])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def file_server() -> Iterator[FileServer]:
+    server = FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import errno
+from pathlib import Path
+
+import pytest
+
+from agents_skills_cli import http_client
+from agents_skills_cli.core import CliError
+from agents_skills_cli.lockfile import git_blob_sha
+
+
+SIZE = 3 * 1024 * 1024 + 17
+
+
+@pytest.fixture
+def payload() -> bytes:
+    return os.urandom(SIZE)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(http_client.time, "sleep", lambda _: None)
+
+
+def test_resumes_after_dropped_connections(file_server, payload, tmp_path):
+    file_server.files["/big.bin"] = payload
+    file_server.drop_after = 700 * 1024
+    file_server.drops = 3
+    dest = tmp_path / "out" / "big.bin"
+    dest.parent.mkdir()
+
+    http_client.download_file(
+        f"{file_server.base_url}/big.bin", dest, size=SIZE, key=git_blob_sha(payload)
+    )
+
+    assert dest.read_bytes() == payload
+    ranges = [r["range"] for r in file_server.requests]
+    assert ranges == [
+        None,
+        f"bytes={700 * 1024}-",
+        f"bytes={1400 * 1024}-",
+        f"bytes={2100 * 1024}-",
+    ]
+
+
+def test_resumes_partial_left_by_an_earlier_run(
+    file_server, payload, cache_dir, tmp_path
+):
+    key = git_blob_sha(payload)
+    partial = cache_dir / "partial" / f"{key}.part"
+    partial.parent.mkdir(parents=True)
+    partial.write_bytes(payload[:1000])
+    file_server.files["/big.bin"] = payload
+    dest = tmp_path / "big.bin"
+
+    http_client.download_file(
+        f"{file_server.base_url}/big.bin", dest, size=SIZE, key=key
+    )
+
+    assert dest.read_bytes() == payload
+    assert [r["range"] for r in file_server.requests] == ["bytes=1000-"]
+    assert not partial.exists()
+
+
+def test_rejects_resumed_file_with_wrong_blob_sha(
+    file_server, payload, cache_dir, tmp_path
+):
+    key = git_blob_sha(payload)
+    partial = cache_dir / "partial" / f"{key}.part"
+    partial.parent.mkdir(parents=True)
+    # Same length as the real prefix, different bytes
+    partial.write_bytes(b"\0" * 1000)
+    file_server.files["/big.bin"] = payload
+    dest = tmp_path / "big.bin"
+
+    with pytest.raises(CliError, match="Checksum mismatch"):
+        http_client.download_file(
+            f"{file_server.base_url}/big.bin", dest, size=SIZE, key=key
+        )
+    assert not dest.exists()
+    assert not partial.exists()
+
+
+def test_restarts_when_content_range_does_not_match_offset(
+    file_server, payload, cache_dir, tmp_path
+):
+    key = git_blob_sha(payload)
+    partial = cache_dir / "partial" / f"{key}.part"
+    partial.parent.mkdir(parents=True)
+    partial.write_bytes(payload[:1000])
+    file_server.files["/big.bin"] = payload
+    file_server.bad_range_start = 0
+    dest = tmp_path / "big.bin"
+
+    http_client.download_file(
+        f"{file_server.base_url}/big.bin", dest, size=SIZE, key=key
+    )
+
+    assert dest.read_bytes() == payload
+    assert [r["range"] for r in file_server.requests] == ["bytes=1000-", None]
+
+
+def test_moves_partial_across_filesystems(
+    file_server, payload, cache_dir, tmp_path, monkeypatch
+):
+    real_rename = os.rename
+
+    def cross_device_rename(src, dst, *args, **kwargs):
+        if Path(src).parent == cache_dir / "partial":
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        return real_rename(src, dst, *args, **kwargs)
+
+    monkeypatch.setattr(os, "rename", cross_device_rename)
+    monkeypatch.setattr(os, "replace", cross_device_rename)
+    file_server.files["/big.bin"] = payload
+    dest = tmp_path / "big.bin"
+
+    http_client.download_file(
+        f"{file_server.base_url}/big.bin", dest, size=SIZE, key=git_blob_sha(payload)
+    )
+
+    assert dest.read_bytes() == payload
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+
+from agents_skills_cli import http_client
+
+
+DATA = {"skills": [{"name": "demo"}]}
+
+
+@pytest.fixture
+def server(file_server, monkeypatch):
+    monkeypatch.setattr(http_client, "GITHUB_RAW_BASE", file_server.base_url)
+    raw = json.dumps(DATA).encode()
+    file_server.files["/registry.json"] = raw
+    file_server.files["/registry.json.gz"] = gzip.compress(raw)
+    return file_server
+
+
+def paths(server):
+    return [r["path"] for r in server.requests]
+
+
+@pytest.mark.parametrize("status", [403, 410, 500, 503])
+def test_error_on_zst_falls_back_to_gz(server, status):
+    server.statuses["/registry.json.zst"] = status
+
+    assert http_client.fetch_registry_artifact("registry.json") == DATA
+    assert paths(server)[-1] == "/registry.json.gz"
+
+
+def test_mirror_refusing_compressed_variants_serves_plain(server):
+    server.statuses["/registry.json.zst"] = 403
+    server.statuses["/registry.json.gz"] = 403
+
+    assert http_client.fetch_registry_artifact("registry.json") == DATA
+    assert paths(server)[-1] == "/registry.json"
+
+
+def test_undecodable_variants_fall_back_to_identity(server):
+    server.files["/registry.json.zst"] = b"\x28\xb5\x2f\xfd not zstd"
+    server.files["/registry.json.gz"] = b"\x1f\x8b not gzip"
+
+    assert http_client.fetch_registry_artifact("registry.json") == DATA
+    assert paths(server) == [
+        "/registry.json.zst",
+        "/registry.json.gz",
+        "/registry.json",
+    ]
+
+
+def test_failed_variants_are_not_reprobed_on_every_call(server, monkeypatch):
+    server.statuses["/registry.json.zst"] = 502
+    http_client.fetch_registry_artifact("registry.json")
+    server.requests.clear()
+
+    assert http_client.fetch_registry_artifact("registry.json") == DATA
+    assert paths(server) == ["/registry.json.gz"]
+
+    # Once the failure is old enough, the preferred variant is tried again
+    now = http_client.time.time()
+    monkeypatch.setattr(
+        http_client.time,
+        "time",
+        lambda: now + http_client.ARTIFACT_REPROBE_SECONDS + 1,
+    )
+    server.requests.clear()
+    http_client.fetch_registry_artifact("registry.json")
+    assert paths(server)[0] == "/registry.json.zst"
+
+
+def test_server_error_on_identity_raises(server):
+    server.statuses["/registry.json"] = 500
+
+    with pytest.raises(http_client.httpx.HTTPStatusError):
+        http_client.fetch_registry_artifact("registry.json", compressed=False)
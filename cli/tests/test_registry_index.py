@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from agents_skills_cli import main, http_client
+from agents_skills_cli.main import app
+
+
+CLI_DIR = Path(__file__).parent.parent
+REGISTRY = json.loads((CLI_DIR / "registry.json").read_text(encoding="utf-8"))
+FILES = (
+    "registry.json",
+    "registry.index.json",
+    "registry.schema.json",
+    "tags.vocab.json",
+)
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def registry_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    for name in FILES:
+        shutil.copy(CLI_DIR / name, tmp_path / name)
+    shutil.copytree(CLI_DIR / "shards", tmp_path / "shards")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def fetched(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record the source path of every skill ``add`` would fetch."""
+    calls: list[str] = []
+
+    def fake_fetch(**kwargs):
+        calls.append(kwargs["source_path"])
+        return [f"Would fetch {kwargs['source_path']}"]
+
+    monkeypatch.setattr(main, "ensure_git_installed", lambda: None)
+    monkeypatch.setattr(main, "fetch_skill_directory", fake_fetch)
+    return calls
+
+
+def list_local(*args: str):
+    return runner.invoke(app, ["list", "--local", *args])
+
+
+def add(*args: str):
+    return runner.invoke(app, ["add", *args, "--dry-run", "--yes"])
+
+
+def edit_index(registry_dir: Path, edit) -> None:
+    path = registry_dir / "registry.index.json"
+    index = json.loads(path.read_text(encoding="utf-8"))
+    edit(index)
+    path.write_text(json.dumps(index), encoding="utf-8")
+
+
+def test_index_is_smaller_than_registry_json():
+    index = (CLI_DIR / "registry.index.json").stat().st_size
+    assert index < (CLI_DIR / "registry.json").stat().st_size
+
+
+def test_plain_list_reads_only_the_index(registry_dir):
+    (registry_dir / "registry.json").unlink()
+
+    result = list_local()
+
+    assert result.exit_code == 0, result.output
+    assert result.output.split() == sorted(s["name"] for s in REGISTRY["skills"])
+
+
+def test_json_output_matches_registry_json(registry_dir):
+    result = list_local("--json")
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == {
+        "count": len(REGISTRY["skills"]),
+        "skills": REGISTRY["skills"],
+    }
+
+
+def test_search_matches_full_description(registry_dir):
+    # "benchmark" is only in the full description, not the index summary
+    result = list_local("benchmark")
+
+    assert result.exit_code == 0, result.output
+    assert result.output.split() == ["skill-creator"]
+
+
+def test_verbose_prints_full_description(registry_dir):
+    result = list_local("-v", "skill-creator")
+
+    description = next(
+        s["description"] for s in REGISTRY["skills"] if s["name"] == "skill-creator"
+    )
+    assert result.exit_code == 0, result.output
+    assert description in result.output
+
+
+def test_explicit_registry_is_not_replaced_by_sibling_index(registry_dir):
+    def rename(index):
+        index["skills"][0]["id"] = "generic/only-in-index"
+
+    edit_index(registry_dir, rename)
+
+    result = runner.invoke(
+        app, ["list", "--registry", str(registry_dir / "registry.json")]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "only-in-index" not in result.output
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        lambda index: index["skills"][0].pop("description"),
+        lambda index: index["skills"][0].pop("shard"),
+        lambda index: index["skills"][0].update(shard="../registry.json"),
+        lambda index: index["skills"][0].update(source_path="skills/x/y"),
+    ],
+)
+def test_invalid_index_fails_schema_validation(registry_dir, edit):
+    edit_index(registry_dir, edit)
+
+    result = list_local()
+
+    assert result.exit_code == 1
+    assert "registry.index.json failed schema validation" in result.output
+
+
+def test_add_full_id_reads_only_its_shard(registry_dir, fetched):
+    (registry_dir / "registry.json").unlink()
+    (registry_dir / "registry.index.json").unlink()
+
+    result = add("generic/skill-creator", "--local")
+
+    assert result.exit_code == 0, result.output
+    assert fetched == ["skills/generic/skill-creator"]
+
+
+def test_add_short_name_resolves_through_the_index(registry_dir, fetched):
+    (registry_dir / "registry.json").unlink()
+
+    result = add("skill-creator", "--local")
+
+    assert result.exit_code == 0, result.output
+    assert fetched == ["skills/generic/skill-creator"]
+
+
+def test_add_without_shards_uses_registry_json(registry_dir, fetched):
+    shutil.rmtree(registry_dir / "shards")
+    (registry_dir / "registry.index.json").unlink()
+
+    result = add("generic/skill-creator", "--local")
+
+    assert result.exit_code == 0, result.output
+    assert fetched == ["skills/generic/skill-creator"]
+
+
+def test_add_rejects_shard_for_another_skill(registry_dir, fetched):
+    shard = registry_dir / "shards" / "generic" / "skill-creator.json"
+    shutil.copy(shard.with_name("create-agents-files.json"), shard)
+
+    result = add("generic/skill-creator", "--local")
+
+    assert result.exit_code == 1
+    assert "does not describe skill 'generic/skill-creator'" in result.output
+    assert fetched == []
+
+
+def test_remote_add_fetches_one_registry_document(file_server, monkeypatch, fetched):
+    monkeypatch.setattr(http_client, "GITHUB_RAW_BASE", file_server.base_url)
+    for path in [
+        *FILES,
+        *(str(p.relative_to(CLI_DIR)) for p in CLI_DIR.rglob("shards/**/*.json")),
+    ]:
+        file_server.files[f"/{path}"] = (CLI_DIR / path).read_bytes()
+
+    result = add("generic/skill-creator")
+
+    assert result.exit_code == 0, result.output
+    registry_documents = {
+        r["path"]
+        for r in file_server.requests
+        if r["path"].startswith(("/registry.json", "/registry.index", "/shards/"))
+    }
+    assert registry_documents == {"/shards/generic/skill-creator.json"}
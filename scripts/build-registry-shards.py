@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Build the sharded registry layout from cli/registry.json.
+
+Writes cli/registry.index.json (id, name, tags, short description and shard
+pointer per skill) and one single-skill registry per skill under
+cli/shards/<category>/<name>.json. The CLI lists from the index and fetches a
+single shard for `add <skill>`, while registry.json stays the source of truth
+for search, `list --json`/`-v`, `add all` and older CLI versions.
+"""
+
+import json
+from pathlib import Path
+
+INDEX_FIELDS = ("id", "name", "tags")
+SHORT_DESCRIPTION_CHARS = 160
+
+
+def short_description(description: str) -> str:
+    first_sentence = description.split(". ", 1)[0].strip().rstrip(".") + "."
+    if len(first_sentence) > SHORT_DESCRIPTION_CHARS:
+        return first_sentence[: SHORT_DESCRIPTION_CHARS - 3].rstrip() + "..."
+    return first_sentence
+
+
+def dump(payload: object) -> str:
+    return json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+
+
+def main() -> None:
+    cli_dir = Path(__file__).parent.parent / "cli"
+    registry_file = cli_dir / "registry.json"
+    shards_dir = cli_dir / "shards"
+
+    if not registry_file.exists():
+        raise FileNotFoundError(f"registry.json not found at {registry_file}")
+    registry = json.loads(registry_file.read_text(encoding="utf-8"))
+    header = {
+        "schema_version": registry["schema_version"],
+        "source": registry["source"],
+    }
+
+    entries = []
+    written = set()
+    for skill in registry["skills"]:
+        category, name = skill["id"].split("/")
+        shard = f"shards/{category}/{name}.json"
+        entry = {field: skill[field] for field in INDEX_FIELDS if field in skill}
+        entry["description"] = short_description(skill["description"])
+        entry["shard"] = shard
+        entries.append(entry)
+
+        # Each shard is a valid one-skill registry, so `add <category>/<name>`
+        # needs nothing else
+        shard_file = cli_dir / shard
+        shard_file.parent.mkdir(parents=True, exist_ok=True)
+        shard_file.write_text(dump({**header, "skills": [skill]}), encoding="utf-8")
+        written.add(shard_file)
+
+    for stale in shards_dir.rglob("*.json"):
+        if stale not in written:
+            stale.unlink()
+            print(f"Removed stale shard {stale.relative_to(cli_dir)}")
+
+    index = {**header, "skills": entries}
+    (cli_dir / "registry.index.json").write_text(dump(index), encoding="utf-8")
+    print(f"Wrote registry.index.json and {len(written)} shard(s)")
+
+
+if __name__ == "__main__":
+    main()
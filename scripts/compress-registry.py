@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Generate pre-compressed registry artifacts next to the JSON sources.
+
+Writes ``<name>.gz`` (and ``<name>.zst`` when the ``zstandard`` package is
+installed) for each registry JSON file in cli/. The CLI downloads these in
+preference to the plain JSON. Output is deterministic, so re-running on
+unchanged inputs leaves the working tree clean. Without zstandard, a
+``<name>.zst`` whose source has changed is deleted rather than left stale.
+"""
+
+import gzip
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARTIFACTS = (
+    "registry.json",
+    "registry.index.json",
+    "registry.schema.json",
+    "tags.vocab.json",
+)
+ZSTD_LEVEL = 19
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def main() -> None:
+    cli_dir = Path(__file__).parent.parent / "cli"
+
+    if zstandard is None:
+        print("zstandard not installed; skipping .zst artifacts (pip install zstandard)")
+
+    for name in ARTIFACTS:
+        source = cli_dir / name
+        if not source.exists():
+            raise FileNotFoundError(f"{name} not found at {source}")
+        raw = source.read_bytes()
+
+        outputs = {source.with_name(f"{name}.gz"): gzip.compress(raw, compresslevel=9, mtime=0)}
+        if zstandard is not None:
+            compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+            outputs[source.with_name(f"{name}.zst")] = compressor.compress(raw)
+
+        changed = False
+        for path, data in outputs.items():
+            if write_if_changed(path, data):
+                changed = True
+                print(f"Updated {path.name} ({len(raw)} -> {len(data)} bytes)")
+
+        stale = source.with_name(f"{name}.zst")
+        if zstandard is None and changed and stale.exists():
+            # The .gz changed, so the source did: the .zst no longer matches it
+            stale.unlink()
+            print(f"Removed stale {stale.name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark the trigger eval harness without a live claude binary.
+
+Drives run_eval_async with a SimulatedExecutor (or, with --replay, transcripts
+recorded by `run_eval --record`) in a throwaway project root and reports:
+
+- harness overhead: wall time per run with all stream delays removed, i.e. the
+  cost of command files, decoding, detection and scheduling alone;
+- scheduler efficiency: busy run-seconds / (workers x wall time) at the given
+  time scale, and wall time against the ideal makespan
+  max(total run time / workers, longest run);
+- detection latency: time from delivery of a run's last chunk to the run being
+  stopped (p50/p90/p99).
+
+Usage:
+    python -m scripts.bench_eval --queries 200 --runs-per-query 3 --num-workers 50 --speed 20
+    python -m scripts.bench_eval --replay recordings/ --eval-set evals.json --description "..." --speed 0
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from scripts.executors import ReplayExecutor, SimulatedExecutor
+from scripts.run_eval import run_eval_async
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def synthetic_eval_set(num_queries: int, seed: int) -> tuple[list[dict], dict[str, float]]:
+    """Queries with mostly clear-cut and some borderline true trigger rates."""
+    rng = random.Random(seed)
+    eval_set = []
+    rates = {}
+    for i in range(num_queries):
+        should_trigger = i % 2 == 0
+        if rng.random() < 0.2:
+            rate = rng.uniform(0.3, 0.7)
+        else:
+            rate = rng.uniform(0.85, 1.0) if should_trigger else rng.uniform(0.0, 0.15)
+        query = f"synthetic query {i}"
+        eval_set.append({"query": query, "should_trigger": should_trigger})
+        rates[query] = rate
+    return eval_set, rates
+
+
+def run_case(executor, eval_set: list[dict], description: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as project_root:
+        (Path(project_root) / ".claude").mkdir()
+        start = time.monotonic()
+        output = asyncio.run(run_eval_async(
+            eval_set=eval_set,
+            skill_name="bench",
+            description=description,
+            num_workers=args.num_workers,
+            timeout=args.timeout,
+            project_root=Path(project_root),
+            runs_per_query=args.runs_per_query,
+            trigger_threshold=0.5,
+            adaptive=args.adaptive,
+            executor=executor,
+            adaptive_workers=args.adaptive_workers,
+            max_workers=args.max_workers,
+        ))
+        wall = time.monotonic() - start
+
+    stats = executor.stats
+    telemetry = output["telemetry"]
+    busy = [s["closed"] - s["started"] for s in stats]
+    detection = [s["closed"] - s["last_chunk"] for s in stats if s["last_chunk"] is not None]
+    ideal = max(sum(busy) / telemetry["num_workers"], max(busy, default=0.0))
+    return {
+        "runs": len(stats),
+        "passed": output["summary"]["passed"],
+        "wall_s": round(wall, 4),
+        "runs_per_s": round(len(stats) / wall, 1) if wall else None,
+        "per_run_ms": round(wall / max(1, len(stats)) * 1000, 3),
+        "ideal_makespan_s": round(ideal, 4),
+        "makespan_overhead_s": round(wall - ideal, 4),
+        "scheduler_efficiency": round(sum(busy) / (telemetry["num_workers"] * wall), 4) if wall else None,
+        "failures": output["failures"],
+        "concurrency": {k: telemetry["concurrency"][k] for k in ("mode", "initial", "final", "min", "max")},
+        "detection_ms": {
+            "p50": round(percentile(detection, 50) * 1000, 3),
+            "p90": round(percentile(detection, 90) * 1000, 3),
+            "p99": round(percentile(detection, 99) * 1000, 3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trigger eval harness offline")
+    parser.add_argument("--queries", type=int, default=200, help="Synthetic queries (ignored with --replay)")
+    parser.add_argument("--runs-per-query", type=int, default=3, help="Runs per query")
+    parser.add_argument("--num-workers", type=int, default=50, help="Concurrent runs")
+    parser.add_argument("--median-latency", type=float, default=8.0, help="Median simulated run latency in seconds")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Log-normal sigma of simulated latencies")
+    parser.add_argument("--speed", type=float, default=20.0, help="Time compression for the timed case (0 = no delays)")
+    parser.add_argument("--timeout", type=int, default=60, help="Per-run timeout in (uncompressed) seconds")
+    parser.add_argument("--adaptive", action="store_true", help="Benchmark adaptive sampling")
+    parser.add_argument("--adaptive-workers", action="store_true", help="Benchmark AIMD concurrency starting from --num-workers")
+    parser.add_argument("--max-workers", type=int, default=None, help="Upper bound for --adaptive-workers")
+    parser.add_argument("--capacity", type=int, default=None, help="Simulated API capacity: runs beyond this many in flight are throttled")
+    parser.add_argument("--replay", default=None, help="Directory of transcripts recorded with run_eval --record")
+    parser.add_argument("--eval-set", default=None, help="Eval set matching the recordings (with --replay)")
+    parser.add_argument("--description", default=None, help="Description the recordings were made with (with --replay)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    if args.replay:
+        if not args.eval_set or args.description is None:
+            parser.error("--replay needs --eval-set and --description")
+        eval_set = json.loads(Path(args.eval_set).read_text())
+        description = args.description
+
+        def make(speed):
+            return ReplayExecutor(Path(args.replay), speed=speed)
+    else:
+        eval_set, rates = synthetic_eval_set(args.queries, args.seed)
+        description = "Synthetic benchmark skill"
+
+        def make(speed):
+            return SimulatedExecutor(rates, args.median_latency, args.sigma, speed=speed, seed=args.seed, capacity=args.capacity)
+
+    results = {"overhead": run_case(make(0), eval_set, description, args)}
+    if args.speed > 0:
+        results["timed"] = run_case(make(args.speed), eval_set, description, args)
+
+    overhead = results["overhead"]
+    print(f"Harness overhead: {overhead['per_run_ms']} ms/run, {overhead['runs_per_s']} runs/s with no stream delays", file=sys.stderr)
+    if "timed" in results:
+        timed = results["timed"]
+        print(
+            f"Timed (x{args.speed}): {timed['wall_s']}s wall vs {timed['ideal_makespan_s']}s ideal, "
+            f"efficiency {timed['scheduler_efficiency']:.1%}, detection p50/p90/p99 "
+            f"{timed['detection_ms']['p50']}/{timed['detection_ms']['p90']}/{timed['detection_ms']['p99']} ms",
+            file=sys.stderr,
+        )
+        concurrency = timed["concurrency"]
+        print(
+            f"Concurrency ({concurrency['mode']}): {concurrency['initial']} -> {concurrency['final']} "
+            f"(range {concurrency['min']}-{concurrency['max']}), failures {timed['failures']}",
+            file=sys.stderr,
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Simulate adaptive trigger sampling to quantify the runs it saves.
+
+Draws synthetic queries whose true trigger probabilities resemble real eval
+sets (mostly clear-cut, some borderline), then replays the same random run
+outcomes through fixed sampling (always runs_per_query runs) and through the
+adaptive stopping rule used by `run_eval --adaptive`. Reports runs spent and how
+often the adaptive pass/fail outcome differs from the fixed one.
+
+Usage:
+    python -m scripts.bench_sampling --queries 5000 --runs-per-query 3 5 10 --confidence 0.9
+"""
+
+import argparse
+import json
+import random
+import sys
+
+from scripts.sampling import first_wave_size, is_settled, outcome
+
+
+def draw_trigger_probability(rng: random.Random, borderline: float) -> float:
+    """Sample a query's true trigger probability."""
+    if rng.random() < borderline:
+        return rng.uniform(0.3, 0.7)
+    return rng.choice([rng.uniform(0.0, 0.1), rng.uniform(0.9, 1.0)])
+
+
+def simulate_query(
+    draws: list[bool],
+    runs_per_query: int,
+    trigger_threshold: float,
+    confidence: float | None,
+) -> tuple[int, bool]:
+    """Return (runs spent, outcome) for one query under adaptive sampling.
+
+    Mirrors run_eval's scheduling: a first wave, then one run at a time.
+    """
+    runs = first_wave_size(runs_per_query, trigger_threshold, confidence)
+    while not is_settled(sum(draws[:runs]), runs, runs_per_query, trigger_threshold, confidence):
+        runs += 1
+    return runs, outcome(sum(draws[:runs]), runs, trigger_threshold)
+
+
+def run_benchmark(
+    num_queries: int,
+    runs_per_query: int,
+    trigger_threshold: float,
+    confidence: float | None,
+    borderline: float,
+    seed: int,
+) -> dict:
+    rng = random.Random(seed)
+    spent = 0
+    disagreements = 0
+    for _ in range(num_queries):
+        p = draw_trigger_probability(rng, borderline)
+        draws = [rng.random() < p for _ in range(runs_per_query)]
+        runs, adaptive_outcome = simulate_query(draws, runs_per_query, trigger_threshold, confidence)
+        spent += runs
+        if adaptive_outcome != outcome(sum(draws), runs_per_query, trigger_threshold):
+            disagreements += 1
+
+    budget = num_queries * runs_per_query
+    return {
+        "runs_per_query": runs_per_query,
+        "trigger_threshold": trigger_threshold,
+        "confidence": confidence,
+        "fixed_runs": budget,
+        "adaptive_runs": spent,
+        "savings": round(1 - spent / budget, 4),
+        "mean_runs_per_query": round(spent / num_queries, 3),
+        "outcome_disagreement_rate": round(disagreements / num_queries, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate adaptive trigger sampling savings")
+    parser.add_argument("--queries", type=int, default=5000, help="Synthetic queries per configuration")
+    parser.add_argument("--runs-per-query", type=int, nargs="+", default=[3, 5, 10], help="Run caps to compare")
+    parser.add_argument("--trigger-threshold", type=float, default=0.5, help="Trigger rate threshold")
+    parser.add_argument("--confidence", type=float, default=None, help="Wilson interval confidence (omit for certainty-only stopping)")
+    parser.add_argument("--borderline", type=float, default=0.2, help="Fraction of queries with a true trigger rate near the threshold")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rows = [
+        run_benchmark(args.queries, n, args.trigger_threshold, args.confidence, args.borderline, args.seed)
+        for n in args.runs_per_query
+    ]
+    for row in rows:
+        print(
+            f"runs_per_query={row['runs_per_query']:>3}: {row['adaptive_runs']}/{row['fixed_runs']} runs "
+            f"({row['savings']:.1%} saved, {row['mean_runs_per_query']} per query), "
+            f"outcome differs from fixed in {row['outcome_disagreement_rate']:.2%}",
+            file=sys.stderr,
+        )
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
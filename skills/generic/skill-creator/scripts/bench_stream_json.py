@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Micro-benchmark stream-json line decoding strategies.
+
+Compares, over the same bytes fed in fixed-size chunks:
+
+- legacy: str buffer + repeated buffer.split("\\n", 1) + json.loads on every line
+  (what run_single_query did before scripts/stream_json.py);
+- decoder: JsonlDecoder + json.loads on every line;
+- filtered: JsonlDecoder + detect_trigger's type pre-filter.
+
+Pass recorded `claude -p --output-format stream-json` transcripts with --stream;
+without them a synthetic multi-megabyte stream shaped like a long agentic turn
+(large init message, many text deltas, bulky tool results, one of them
+spanning hundreds of reads) is generated.
+
+Usage:
+    python -m scripts.bench_stream_json --stream run1.jsonl run2.jsonl --repeat 5
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from scripts.run_eval import RUN_EVENT_PATTERN
+from scripts.stream_json import JsonlDecoder, parse_event
+
+
+def synthetic_stream(target_bytes: int, seed: int) -> bytes:
+    """Build a stream-json transcript of roughly target_bytes."""
+    rng = random.Random(seed)
+    words = ["the", "skill", "query", "file", "data", "report", "table", "value", "python", "result"]
+
+    def text(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    events = [{"type": "system", "subtype": "init", "tools": [{"name": f"tool_{i}", "description": text(40)} for i in range(60)]}]
+    # One very large tool result (e.g. a big file read) spanning many reads
+    events.append({"type": "user", "message": {"content": [{"type": "tool_result", "content": text(target_bytes // 24)}]}})
+    size = target_bytes // 4
+    while size < target_bytes:
+        events.append({"type": "stream_event", "event": {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}})
+        for _ in range(rng.randint(50, 200)):
+            events.append({"type": "stream_event", "event": {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text(rng.randint(1, 8))}}})
+        events.append({"type": "stream_event", "event": {"type": "content_block_stop", "index": 0}})
+        events.append({"type": "assistant", "message": {"content": [{"type": "tool_use", "name": "Bash", "input": {"command": text(10)}}]}})
+        events.append({"type": "user", "message": {"content": [{"type": "tool_result", "content": text(rng.randint(2000, 20000))}]}})
+        size = sum(len(json.dumps(e)) for e in events[-3:]) + size + 150 * 40
+    events.append({"type": "result", "subtype": "success", "result": text(20)})
+    return b"".join(json.dumps(e, separators=(",", ":")).encode() + b"\n" for e in events)
+
+
+def legacy(data: bytes, chunk_size: int) -> int:
+    parsed = 0
+    buffer = ""
+    for pos in range(0, len(data), chunk_size):
+        buffer += data[pos:pos + chunk_size].decode("utf-8", errors="replace")
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            parsed += 1
+    return parsed
+
+
+def decoder(data: bytes, chunk_size: int, filtered: bool) -> int:
+    parsed = 0
+    pattern = RUN_EVENT_PATTERN if filtered else None
+    jsonl = JsonlDecoder()
+    for pos in range(0, len(data), chunk_size):
+        for line in jsonl.feed(data[pos:pos + chunk_size]):
+            if parse_event(line, pattern) is not None:
+                parsed += 1
+    return parsed
+
+
+def measure(fn, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    parsed = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parsed = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stream-json decoding strategies")
+    parser.add_argument("--stream", nargs="*", default=[], help="Recorded stream-json transcripts (default: synthetic)")
+    parser.add_argument("--size-mb", type=float, default=8.0, help="Synthetic stream size in MiB")
+    parser.add_argument("--chunk-size", type=int, default=8192, help="Bytes per simulated stdout read")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per strategy (best time is reported)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic stream")
+    args = parser.parse_args()
+
+    if args.stream:
+        streams = {path: Path(path).read_bytes() for path in args.stream}
+    else:
+        streams = {"synthetic": synthetic_stream(int(args.size_mb * 1024 * 1024), args.seed)}
+
+    rows = []
+    for name, data in streams.items():
+        strategies = {
+            "legacy": lambda: legacy(data, args.chunk_size),
+            "decoder": lambda: decoder(data, args.chunk_size, filtered=False),
+            "filtered": lambda: decoder(data, args.chunk_size, filtered=True),
+        }
+        for strategy, fn in strategies.items():
+            seconds, parsed = measure(fn, args.repeat)
+            row = {
+                "stream": name,
+                "strategy": strategy,
+                "bytes": len(data),
+                "seconds": round(seconds, 4),
+                "mb_per_s": round(len(data) / 1024 / 1024 / seconds, 1),
+                "events_parsed": parsed,
+            }
+            rows.append(row)
+            print(
+                f"{name} [{strategy:>8}]: {row['seconds']:.4f}s, {row['mb_per_s']} MiB/s, "
+                f"{parsed} events parsed",
+                file=sys.stderr,
+            )
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
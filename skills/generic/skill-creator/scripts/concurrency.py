@@ -0,0 +1,170 @@
+"""Concurrency limit for trigger runs, optionally adapted with AIMD.
+
+A fixed `--num-workers` is either too high (API throttling, timeouts) or too
+low (idle machine). ConcurrencyController gates how many runs are in flight
+and, when adaptive, tunes that limit from run outcomes the way TCP congestion
+control does:
+
+- every healthy run while the limit is the bottleneck raises it: by one per
+  run until the first failure (slow start), then by about one per round of
+  `limit` runs (additive increase);
+- a failed run (timeout, error, non-zero exit, throttling) cuts it by
+  `decrease` (multiplicative decrease), at most once per round: failures
+  from runs started before the last cut are ignored;
+- while recent decision latency (a fast EWMA) runs well above its long-run
+  level (a slow EWMA), the limit is held instead of raised.
+
+Waiting runs get a slot in priority order, FIFO among equal priorities
+(see scripts/scheduling.py). Failed runs are reported separately from
+genuine "did not trigger" results; see run_failure().
+"""
+
+import asyncio
+import heapq
+import itertools
+import re
+
+# Text in an error result that points at throttling rather than a broken run
+THROTTLE_RE = re.compile(rb"rate.?limit|overloaded|\b429\b|\b529\b|too many requests", re.IGNORECASE)
+
+FAILURE_KINDS = ("timeout", "error", "throttled")
+
+
+def run_failure(run: dict) -> str | None:
+    """Classify a finished run record: a failure kind, or None for a valid outcome."""
+    reason = run.get("exit_reason")
+    if reason in FAILURE_KINDS:
+        return reason
+    if reason == "eof" and run.get("returncode") not in (None, 0):
+        return "error"
+    return None
+
+
+def result_failure(event: dict, raw: bytes | memoryview) -> str | None:
+    """Failure kind of an error `result` event ("throttled" or "error"), else None."""
+    if event.get("type") != "result" or not event.get("is_error"):
+        return None
+    return "throttled" if THROTTLE_RE.search(raw) else "error"
+
+
+class ConcurrencyController:
+    """Async limiter on in-flight runs; with adaptive=True the limit follows AIMD."""
+
+    def __init__(
+        self,
+        initial: int,
+        max_limit: int | None = None,
+        min_limit: int = 1,
+        adaptive: bool = False,
+        decrease: float = 0.5,
+        latency_factor: float = 2.0,
+    ):
+        self.adaptive = adaptive
+        self.min_limit = min_limit
+        self.max_limit = max(initial, max_limit or initial)
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.limit = float(initial)
+        self.initial = initial
+        self.active = 0
+        self.slow_start = True
+        self.latency_fast: float | None = None
+        self.latency_slow: float | None = None
+        self._last_decrease = float("-inf")
+        # (priority, arrival, future) heap of runs waiting for a slot
+        self._waiters: list[tuple[float, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._origin = asyncio.get_running_loop().time()
+        self.trajectory: list[dict] = [{"t": 0.0, "limit": initial, "reason": "initial"}]
+
+    @property
+    def slots(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self, priority: float = 0.0) -> None:
+        """Wait for a slot; lower priority values are served first."""
+        if self.active < self.slots and not self._waiters:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._arrivals), waiter)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we were cancelled: hand it on
+                self.active -= 1
+                self._wake()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self, run: dict) -> None:
+        """Free a slot and, if adaptive, adjust the limit from the run's outcome."""
+        # Was the limit the bottleneck while this run held its slot?
+        saturated = bool(self._waiters) or self.active >= self.slots
+        self.active -= 1
+        if self.adaptive:
+            self._observe(run, saturated)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.active < self.slots:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                self.active += 1
+
+    def _set(self, limit: float, reason: str) -> None:
+        before = self.slots
+        self.limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+        if self.slots != before:
+            t = asyncio.get_running_loop().time() - self._origin
+            self.trajectory.append({"t": round(t, 3), "limit": self.slots, "reason": reason})
+
+    def _observe(self, run: dict, saturated: bool) -> None:
+        if run.get("exit_reason") == "cancelled" or "started_at" not in run:
+            return
+        failure = run_failure(run)
+        if failure:
+            if run["started_at"] > self._last_decrease:
+                self._last_decrease = asyncio.get_running_loop().time()
+                self.slow_start = False
+                self._set(self.limit * self.decrease, f"decrease:{failure}")
+            return
+
+        latency = run.get("decision_s")
+        if latency is not None:
+            if self.latency_fast is None:
+                self.latency_fast = self.latency_slow = latency
+            self.latency_fast = 0.7 * self.latency_fast + 0.3 * latency
+            self.latency_slow = 0.95 * self.latency_slow + 0.05 * latency
+            if self.latency_fast > self.latency_factor * self.latency_slow:
+                return
+        if saturated:
+            step = 1.0 if self.slow_start else 1.0 / self.limit
+            self._set(self.limit + step, "increase")
+
+    def mean_limit(self) -> float:
+        """Time-weighted average limit since the controller was created."""
+        now = asyncio.get_running_loop().time() - self._origin
+        if now <= 0:
+            return float(self.slots)
+        total = 0.0
+        for point, following in zip(self.trajectory, self.trajectory[1:] + [{"t": now}]):
+            total += point["limit"] * (following["t"] - point["t"])
+        return total / now
+
+    def summary(self) -> dict:
+        limits = [point["limit"] for point in self.trajectory]
+        return {
+            "mode": "aimd" if self.adaptive else "fixed",
+            "initial": self.initial,
+            "final": self.slots,
+            "min": min(limits),
+            "max": max(limits),
+            "max_limit": self.max_limit,
+            "trajectory": self.trajectory,
+        }
@@ -0,0 +1,143 @@
+"""Persistent on-disk cache of trigger eval runs.
+
+Each `claude -p` run is stored under a hash of (skill name, description, query,
+model, run index, executor version, isolation mode), so re-evaluating an unchanged description
+-- on a later run_loop iteration, or after restarting the loop -- reuses
+earlier results instead of launching new subprocesses. Results live in a single
+SQLite file and are written as each run completes, so an interrupted batch
+keeps its progress.
+
+The executor version is the `claude --version` output for real runs, so a CLI
+upgrade (which may also change the default model) starts from fresh results.
+Runs in a per-worker sandbox and runs in the shared project directory (which
+also sees the project's other skills) are keyed apart.
+Runs older than CACHE_TTL_SECONDS are ignored and pruned as well, since the
+behaviour behind an unchanged version and model can still drift. Set
+SKILL_CREATOR_NO_CACHE=1 (or pass --no-cache) to bypass the caches entirely.
+
+The same file keeps per-query run statistics (see scripts/scheduling.py),
+which are independent of the description and order the next batch's runs.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+CACHE_FILE = "trigger-results.sqlite3"
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+NO_CACHE_ENV = "SKILL_CREATOR_NO_CACHE"
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "skill-creator"
+
+
+def cache_disabled() -> bool:
+    """Whether SKILL_CREATOR_NO_CACHE asks to bypass every on-disk cache."""
+    return os.environ.get(NO_CACHE_ENV, "").strip().lower() not in ("", "0", "false", "no")
+
+
+def resolve_cache_dir(cache_dir: str | None, no_cache: bool, default: Path | None = None) -> Path | None:
+    """The cache directory a command-line tool should use, or None when caching is off."""
+    if no_cache or cache_disabled():
+        return None
+    return Path(cache_dir) if cache_dir else default or default_cache_dir()
+
+
+def run_key(
+    skill_name: str,
+    description: str,
+    query: str,
+    model: str | None,
+    run_idx: int,
+    version: str | None = None,
+    isolated: bool = True,
+) -> str:
+    """Hash the inputs that determine a single trigger run."""
+    payload = json.dumps([skill_name, description, query, model, run_idx, version, isolated], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def query_key(query: str, model: str | None) -> str:
+    """Hash the inputs that determine how long a query's runs take."""
+    payload = json.dumps([query, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TriggerCache:
+    """SQLite-backed map from run key to whether the skill triggered."""
+
+    def __init__(self, cache_dir: Path, ttl_s: float = CACHE_TTL_SECONDS):
+        self.ttl_s = ttl_s
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.path = cache_dir / CACHE_FILE
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "key TEXT PRIMARY KEY, triggered INTEGER NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_stats ("
+            "key TEXT PRIMARY KEY, duration_s REAL, trigger_rate REAL, runs INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM runs WHERE created_at < ?", (self._cutoff(),))
+        self._conn.commit()
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_s
+
+    def get_many(self, keys: list[str]) -> dict[str, bool]:
+        """Return cached results for whichever of `keys` are present and unexpired."""
+        found: dict[str, bool] = {}
+        cutoff = self._cutoff()
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, triggered FROM runs WHERE key IN ({placeholders}) AND created_at >= ?",
+                [*chunk, cutoff],
+            )
+            found.update((key, bool(triggered)) for key, triggered in rows)
+        return found
+
+    def put(self, key: str, triggered: bool) -> None:
+        """Store one completed run."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO runs (key, triggered, created_at) VALUES (?, ?, ?)",
+            (key, int(triggered), time.time()),
+        )
+        self._conn.commit()
+
+    def get_stats(self, keys: list[str]) -> dict[str, dict]:
+        """Return stored query statistics for whichever of `keys` are present."""
+        found: dict[str, dict] = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, duration_s, trigger_rate, runs FROM query_stats WHERE key IN ({placeholders})", chunk
+            )
+            found.update(
+                (key, {"duration_s": duration_s, "trigger_rate": trigger_rate, "runs": runs})
+                for key, duration_s, trigger_rate, runs in rows
+            )
+        return found
+
+    def put_stats(self, stats: dict[str, dict]) -> None:
+        """Store query statistics, replacing earlier ones for the same keys."""
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO query_stats (key, duration_s, trigger_rate, runs, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(key, s["duration_s"], s["trigger_rate"], s["runs"], now) for key, s in stats.items()],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,402 @@
+"""Pluggable backends that produce the stream-json output of one trigger run.
+
+run_single_query_async reads a run's output through an Executor instead of
+spawning `claude -p` itself, so the harness can be exercised without a live
+binary or network:
+
+- ClaudeExecutor: the real `claude -p` subprocess (default).
+- RecordingExecutor: wraps another executor and saves each run's raw
+  stream-json transcript and chunk timing under a directory, keyed by
+  (description, query).
+- ReplayExecutor: streams recorded transcripts back with their original
+  timing, scaled by `speed` (0 replays without delays).
+- SimulatedExecutor: synthesizes transcripts from per-query trigger rates and
+  a latency distribution, for benchmarks that need no recordings at all.
+
+Recordings are stored as <dir>/<key>/<run id>.jsonl (the raw bytes claude
+wrote, usable with scripts.bench_stream_json) plus <run id>.json (metadata and
+chunk offsets).
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import math
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+
+
+def build_claude_command(query: str, model: str | None = None, command: str = "claude") -> list[str]:
+    cmd = [
+        command,
+        "-p", query,
+        "--output-format", "stream-json",
+        "--verbose",
+        "--include-partial-messages",
+    ]
+    if model:
+        cmd.extend(["--model", model])
+    return cmd
+
+
+def claude_env() -> dict[str, str]:
+    """Environment for nested `claude -p` runs.
+
+    Removes the CLAUDECODE env var to allow nesting claude -p inside a
+    Claude Code session. The guard is for interactive terminal conflicts;
+    programmatic subprocess usage is safe.
+    """
+    return {k: v for k, v in os.environ.items() if k != "CLAUDECODE"}
+
+
+def transcript_key(description: str, query: str) -> str:
+    """Directory name that recordings of (description, query) are stored under."""
+    payload = json.dumps([description, query], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class RunStream:
+    """Raw stdout of one run. read() returns b"" at EOF; close() stops the run.
+
+    returncode is the exit status once a process exited on its own (None for
+    in-process streams, or while running).
+    """
+
+    returncode: int | None = None
+
+    async def read(self, n: int) -> bytes:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class Executor:
+    """Starts trigger runs. `clean_name` is the unique command name detection looks for."""
+
+    async def start(
+        self,
+        query: str,
+        description: str,
+        clean_name: str,
+        project_root: str,
+        model: str | None,
+    ) -> RunStream:
+        raise NotImplementedError
+
+    async def version(self) -> str:
+        """Identifies what produces the runs; part of the run cache key."""
+        return type(self).__name__
+
+
+class ProcessStream(RunStream):
+    # After EOF, how long to let the process exit by itself before killing it
+    EXIT_GRACE_SECONDS = 1.0
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.eof = False
+
+    async def read(self, n: int) -> bytes:
+        chunk = await self.process.stdout.read(n)
+        self.eof = not chunk
+        return chunk
+
+    async def close(self) -> None:
+        if self.eof and self.process.returncode is None:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.process.wait(), self.EXIT_GRACE_SECONDS)
+        if self.process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                self.process.kill()
+        elif self.eof:
+            self.returncode = self.process.returncode
+        await self.process.wait()
+
+
+class ClaudeExecutor(Executor):
+    """Run the real `claude -p` (or a compatible `command`) as a subprocess."""
+
+    def __init__(self, command: str = "claude"):
+        self.command = command
+        self._version: str | None = None
+
+    async def version(self) -> str:
+        """The `claude --version` output, so a CLI upgrade invalidates cached runs."""
+        if self._version is None:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    self.command, "--version",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    env=claude_env(),
+                )
+                stdout, _ = await process.communicate()
+                self._version = stdout.decode("utf-8", "replace").strip() or "unknown"
+            except OSError:
+                self._version = "unknown"
+        return self._version
+
+    async def start(self, query, description, clean_name, project_root, model) -> RunStream:
+        process = await asyncio.create_subprocess_exec(
+            *build_claude_command(query, model, self.command),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=project_root,
+            env=claude_env(),
+        )
+        return ProcessStream(process)
+
+
+class RecordingStream(RunStream):
+    def __init__(self, inner: RunStream, path: Path, meta: dict):
+        self.inner = inner
+        self.path = path
+        self.meta = meta
+        self.started = time.monotonic()
+        self.data = bytearray()
+        self.chunks: list[list[float]] = []
+        self.eof = False
+
+    async def read(self, n: int) -> bytes:
+        chunk = await self.inner.read(n)
+        if chunk:
+            self.data += chunk
+            self.chunks.append([round(time.monotonic() - self.started, 4), len(chunk)])
+        else:
+            self.eof = True
+        return chunk
+
+    async def close(self) -> None:
+        await self.inner.close()
+        self.returncode = self.inner.returncode
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Data first: a recording only counts once its metadata file exists
+        self.path.with_suffix(".jsonl").write_bytes(self.data)
+        meta = {
+            **self.meta,
+            "eof": self.eof,
+            "duration": round(time.monotonic() - self.started, 4),
+            "chunks": self.chunks,
+        }
+        self.path.with_suffix(".json").write_text(json.dumps(meta))
+
+
+class RecordingExecutor(Executor):
+    """Save every run of `inner` as a replayable transcript under record_dir.
+
+    A run that was stopped early (decision made, timeout) is saved up to that
+    point, which is all a replay needs to reproduce the same outcome.
+    """
+
+    def __init__(self, inner: Executor, record_dir: Path):
+        self.inner = inner
+        self.record_dir = record_dir
+
+    async def start(self, query, description, clean_name, project_root, model) -> RunStream:
+        stream = await self.inner.start(query, description, clean_name, project_root, model)
+        path = self.record_dir / transcript_key(description, query) / uuid.uuid4().hex
+        meta = {"query": query, "description": description, "clean_name": clean_name, "model": model}
+        return RecordingStream(stream, path, meta)
+
+    async def version(self) -> str:
+        return await self.inner.version()
+
+
+class TimedStream(RunStream):
+    """Replay pre-built bytes in chunks at given offsets from the start of the run.
+
+    If the transcript did not end at EOF (the recorded run was cut short), the
+    stream stays open after the last chunk, as the original process did, until
+    the caller gives up. Per-run timings are appended to `stats` on close.
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        chunks: list[list[float]],
+        eof: bool,
+        speed: float,
+        stats: list[dict],
+        on_close=None,
+    ):
+        self.data = data
+        self.chunks = chunks
+        self.eof = eof
+        self.speed = speed
+        self.stats = stats
+        self.index = 0
+        self.offset = 0
+        self.started = time.monotonic()
+        self.last_chunk_at: float | None = None
+        self.on_close = on_close
+
+    async def read(self, n: int) -> bytes:
+        if self.index >= len(self.chunks):
+            if not self.eof:
+                await asyncio.Event().wait()
+            return b""
+        at, size = self.chunks[self.index]
+        if self.speed > 0:
+            delay = self.started + at / self.speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        # The last chunk absorbs any length change from renaming the command
+        end = len(self.data) if self.index == len(self.chunks) - 1 else self.offset + size
+        chunk = self.data[self.offset:end]
+        self.offset = end
+        self.index += 1
+        self.last_chunk_at = time.monotonic()
+        return chunk
+
+    async def close(self) -> None:
+        closed_at = time.monotonic()
+        self.stats.append({
+            "started": self.started,
+            "closed": closed_at,
+            "last_chunk": self.last_chunk_at,
+            "bytes": self.offset,
+        })
+        if self.on_close:
+            self.on_close()
+
+
+class ReplayExecutor(Executor):
+    """Stream recorded transcripts back instead of running claude.
+
+    Successive runs of the same (description, query) cycle through its
+    recordings in a fixed order, so replays are deterministic. The recorded
+    command name is rewritten to the current run's. Raises FileNotFoundError
+    for a pair that was never recorded.
+    """
+
+    def __init__(self, record_dir: Path, speed: float = 1.0):
+        self.record_dir = record_dir
+        self.speed = speed
+        self.stats: list[dict] = []
+        self._recordings: dict[str, list[tuple[bytes, dict]]] = {}
+        self._next: dict[str, int] = {}
+
+    def _load(self, key: str) -> list[tuple[bytes, dict]]:
+        if key not in self._recordings:
+            loaded = []
+            for meta_path in sorted((self.record_dir / key).glob("*.json")):
+                meta = json.loads(meta_path.read_text())
+                loaded.append((meta_path.with_suffix(".jsonl").read_bytes(), meta))
+            self._recordings[key] = loaded
+        return self._recordings[key]
+
+    async def start(self, query, description, clean_name, project_root, model) -> RunStream:
+        key = transcript_key(description, query)
+        recordings = self._load(key)
+        if not recordings:
+            raise FileNotFoundError(f"No recording for query {query[:60]!r} in {self.record_dir}")
+        index = self._next.get(key, 0)
+        self._next[key] = index + 1
+        data, meta = recordings[index % len(recordings)]
+        data = data.replace(meta["clean_name"].encode(), clean_name.encode())
+        return TimedStream(data, meta["chunks"], meta["eof"], self.speed, self.stats)
+
+    async def version(self) -> str:
+        return f"replay {self.record_dir.resolve()}"
+
+
+def _event_line(event: dict) -> bytes:
+    return json.dumps(event, separators=(",", ":")).encode() + b"\n"
+
+
+class SimulatedExecutor(Executor):
+    """Synthesize claude-like transcripts with known trigger rates and latencies.
+
+    Each run emits an init event, some text deltas, then either a Skill tool use
+    naming the command or a plain message_stop, and finally a result event.
+    The decisive event lands at a latency drawn from a log-normal distribution
+    with the given median (seconds) and sigma. Runs are seeded from
+    (seed, query, run number), so a benchmark is reproducible.
+
+    With `capacity` set, runs started while that many are already active are
+    throttled: they end early with an API rate-limit error result, the way an
+    overloaded account behaves.
+    """
+
+    def __init__(
+        self,
+        trigger_rates: dict[str, float],
+        median_latency: float = 5.0,
+        sigma: float = 0.5,
+        speed: float = 1.0,
+        seed: int = 42,
+        capacity: int | None = None,
+    ):
+        self.trigger_rates = trigger_rates
+        self.median_latency = median_latency
+        self.sigma = sigma
+        self.speed = speed
+        self.seed = seed
+        self.capacity = capacity
+        self.active = 0
+        self.throttled = 0
+        self.stats: list[dict] = []
+        self._runs: dict[str, int] = {}
+
+    def throttled_transcript(self) -> tuple[bytes, list[list[float]]]:
+        error = {"type": "result", "subtype": "error_during_execution", "is_error": True, "result": "API Error: 429 rate_limit_error"}
+        init = _event_line({"type": "system", "subtype": "init"})
+        failure = _event_line(error)
+        at = 0.1 * self.median_latency
+        return init + failure, [[0.05 * self.median_latency, len(init)], [at, len(failure)]]
+
+    def transcript(self, query: str, clean_name: str) -> tuple[bytes, list[list[float]]]:
+        run = self._runs.get(query, 0)
+        self._runs[query] = run + 1
+        rng = random.Random(f"{self.seed}:{query}:{run}")
+        latency = self.median_latency * math.exp(rng.gauss(0, self.sigma))
+        triggered = rng.random() < self.trigger_rates.get(query, 0.0)
+
+        timeline = [(0.05 * latency, {"type": "system", "subtype": "init"})]
+        timeline.append((0.6 * latency, {"type": "stream_event", "event": {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}}))
+        for i in range(8):
+            delta = {"type": "text_delta", "text": "Let me look into that. "}
+            timeline.append(((0.6 + 0.04 * i) * latency, {"type": "stream_event", "event": {"type": "content_block_delta", "index": 0, "delta": delta}}))
+        timeline.append((0.95 * latency, {"type": "stream_event", "event": {"type": "content_block_stop", "index": 0}}))
+        if triggered:
+            timeline.append((latency, {"type": "stream_event", "event": {"type": "content_block_start", "index": 1, "content_block": {"type": "tool_use", "name": "Skill"}}}))
+            partial = json.dumps({"skill": clean_name})
+            timeline.append((latency, {"type": "stream_event", "event": {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": partial}}}))
+            timeline.append((latency, {"type": "stream_event", "event": {"type": "content_block_stop", "index": 1}}))
+        else:
+            timeline.append((latency, {"type": "stream_event", "event": {"type": "message_stop"}}))
+        timeline.append((1.2 * latency, {"type": "result", "subtype": "success"}))
+
+        data = bytearray()
+        chunks = []
+        for at, event in timeline:
+            line = _event_line(event)
+            data += line
+            chunks.append([at, len(line)])
+        return bytes(data), chunks
+
+    async def start(self, query, description, clean_name, project_root, model) -> RunStream:
+        if self.capacity is not None and self.active >= self.capacity:
+            self.throttled += 1
+            data, chunks = self.throttled_transcript()
+        else:
+            data, chunks = self.transcript(query, clean_name)
+        self.active += 1
+        return TimedStream(data, chunks, True, self.speed, self.stats, on_close=self._closed)
+
+    def _closed(self) -> None:
+        self.active -= 1
+
+
+def make_executor(record_dir: Path | None = None, replay_dir: Path | None = None, replay_speed: float = 1.0) -> Executor:
+    """Build the executor selected by the --record / --replay command-line flags."""
+    if replay_dir is not None:
+        return ReplayExecutor(replay_dir, speed=replay_speed)
+    if record_dir is not None:
+        return RecordingExecutor(ClaudeExecutor(), record_dir)
+    return ClaudeExecutor()
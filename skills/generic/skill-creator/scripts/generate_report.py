@@ -1,42 +1,22 @@
 #!/usr/bin/env python3
 """Generate an HTML report from run_loop.py output.
 
-Takes the JSON output from run_loop.py and generates a visual HTML report
-showing each description attempt with check/x for each test case.
-Distinguishes between train and test queries.
+Takes the JSON output from run_loop.py (compact format 2 or the original
+format) and generates a visual HTML report showing each description attempt
+with check/x for each test case. Distinguishes between train and test queries.
 """
 
 import argparse
 import html
-import json
 import sys
-from pathlib import Path
+from collections.abc import Iterable, Iterator
 
+from scripts.history_format import compact_output, iter_output
+from scripts.usage import format_usage, total_tokens
 
-def generate_html(data: dict, auto_refresh: bool = False, skill_name: str = "") -> str:
-    """Generate HTML report from loop output data. If auto_refresh is True, adds a meta refresh tag."""
-    history = data.get("history", [])
-    holdout = data.get("holdout", 0)
-    title_prefix = html.escape(skill_name + " \u2014 ") if skill_name else ""
-
-    # Get all unique queries from train and test sets, with should_trigger info
-    train_queries: list[dict] = []
-    test_queries: list[dict] = []
-    if history:
-        for r in history[0].get("train_results", history[0].get("results", [])):
-            train_queries.append({"query": r["query"], "should_trigger": r.get("should_trigger", True)})
-        if history[0].get("test_results"):
-            for r in history[0].get("test_results", []):
-                test_queries.append({"query": r["query"], "should_trigger": r.get("should_trigger", True)})
 
-    refresh_tag = '    <meta http-equiv="refresh" content="5">\n' if auto_refresh else ""
-
-    html_parts = ["""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-""" + refresh_tag + """    <title>""" + title_prefix + """Skill Description Optimization</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
+# Fonts and styles, shared with the live dashboard page
+REPORT_HEAD = """    <link rel="preconnect" href="https://fonts.googleapis.com">
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
     <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@500;600&family=Lora:wght@400;500&display=swap" rel="stylesheet">
     <style>
@@ -113,6 +93,7 @@ def generate_html(data: dict, auto_refresh: bool = False, skill_name: str = "")
         }
         .pass { color: #788c5d; }
         .fail { color: #c44; }
+        .undecided { color: #b0aea5; }
         .rate {
             font-size: 9px;
             color: #b0aea5;
@@ -131,7 +112,6 @@ def generate_html(data: dict, auto_refresh: bool = False, skill_name: str = "")
         .score-bad { background: #fceaea; color: #c44; }
         .train-label { color: #b0aea5; font-size: 10px; }
         .test-label { color: #6a9bcc; font-size: 10px; font-weight: bold; }
-        .best-row { background: #f5f8f2; }
         th.positive-col { border-bottom: 3px solid #788c5d; }
         th.negative-col { border-bottom: 3px solid #c44; }
         th.test-col.positive-col { border-bottom: 3px solid #788c5d; }
@@ -144,28 +124,63 @@ def generate_html(data: dict, auto_refresh: bool = False, skill_name: str = "")
         .swatch-test { background: #6a9bcc; }
         .swatch-train { background: #141413; }
     </style>
-</head>
+"""
+
+
+def generate_html(data: dict, auto_refresh: bool = False, skill_name: str = "") -> str:
+    """Generate HTML report from loop output data. If auto_refresh is True, adds a meta refresh tag."""
+    data = compact_output(data)
+    return "".join(iter_html(data, data["history"], auto_refresh=auto_refresh, skill_name=skill_name))
+
+
+def short_count(n: int) -> str:
+    if n >= 1_000_000:
+        return f"{n / 1_000_000:.1f}M"
+    if n >= 1_000:
+        return f"{n / 1_000:.1f}k"
+    return str(n)
+
+
+def iter_html(data: dict, rows: Iterable[dict], auto_refresh: bool = False, skill_name: str = "") -> Iterator[str]:
+    """Yield the report in chunks: data is format 2 output without its history, rows its history rows."""
+    title_prefix = html.escape(skill_name + " \u2014 ") if skill_name else ""
+
+    # Query columns, train first, with should_trigger info
+    queries = data["queries"]
+    train_queries = [q for q in queries if q["split"] == "train"]
+    test_queries = [q for q in queries if q["split"] == "test"]
+
+    refresh_tag = '    <meta http-equiv="refresh" content="5">\n' if auto_refresh else ""
+
+    yield """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+""" + refresh_tag + """    <title>""" + title_prefix + """Skill Description Optimization</title>
+""" + REPORT_HEAD + """</head>
 <body>
     <h1>""" + title_prefix + """Skill Description Optimization</h1>
     <div class="explainer">
         <strong>Optimizing your skill's description.</strong> This page updates automatically as Claude tests different versions of your skill's description. Each row is an iteration — a new description attempt. The columns show test queries: green checkmarks mean the skill triggered correctly (or correctly didn't trigger), red crosses mean it got it wrong. The "Train" score shows performance on queries used to improve the description; the "Test" score shows performance on held-out queries the optimizer hasn't seen. When it's done, Claude will apply the best-performing description to your skill.
     </div>
-"""]
+"""
 
     # Summary section
     best_test_score = data.get('best_test_score')
     best_train_score = data.get('best_train_score')
-    html_parts.append(f"""
+    usage = data.get("usage")
+    usage_line = f"        <p><strong>Usage:</strong> {html.escape(format_usage(usage))}</p>\n" if usage else ""
+    yield f"""
     <div class="summary">
         <p><strong>Original:</strong> {html.escape(data.get('original_description', 'N/A'))}</p>
         <p class="best"><strong>Best:</strong> {html.escape(data.get('best_description', 'N/A'))}</p>
         <p><strong>Best Score:</strong> {data.get('best_score', 'N/A')} {'(test)' if best_test_score else '(train)'}</p>
         <p><strong>Iterations:</strong> {data.get('iterations_run', 0)} | <strong>Train:</strong> {data.get('train_size', '?')} | <strong>Test:</strong> {data.get('test_size', '?')}</p>
-    </div>
-""")
+{usage_line}    </div>
+"""
 
     # Legend
-    html_parts.append("""
+    yield """
     <div class="legend">
         <span style="font-weight:600">Query columns:</span>
         <span class="legend-item"><span class="legend-swatch swatch-positive"></span> Should trigger</span>
@@ -173,10 +188,10 @@ def generate_html(data: dict, auto_refresh: bool = False, skill_name: str = "")
         <span class="legend-item"><span class="legend-swatch swatch-train"></span> Train</span>
         <span class="legend-item"><span class="legend-swatch swatch-test"></span> Test</span>
     </div>
-""")
+"""
 
     # Table header
-    html_parts.append("""
+    yield """
     <div class="table-container">
     <table>
         <thead>
@@ -185,60 +200,54 @@ def generate_html(data: dict, auto_refresh: bool = False, skill_name: str = "")
                 <th>Train</th>
                 <th>Test</th>
                 <th class="query-col">Description</th>
-""")
+"""
 
     # Add column headers for train queries
     for qinfo in train_queries:
         polarity = "positive-col" if qinfo["should_trigger"] else "negative-col"
-        html_parts.append(f'                <th class="{polarity}">{html.escape(qinfo["query"])}</th>\n')
+        yield f'                <th class="{polarity}">{html.escape(qinfo["query"])}</th>\n'
 
     # Add column headers for test queries (different color)
     for qinfo in test_queries:
         polarity = "positive-col" if qinfo["should_trigger"] else "negative-col"
-        html_parts.append(f'                <th class="test-col {polarity}">{html.escape(qinfo["query"])}</th>\n')
+        yield f'                <th class="test-col {polarity}">{html.escape(qinfo["query"])}</th>\n'
 
-    html_parts.append("""            </tr>
+    yield """            </tr>
         </thead>
         <tbody>
-""")
+"""
 
-    # Find best iteration for highlighting
-    if test_queries:
-        best_iter = max(history, key=lambda h: h.get("test_passed") or 0).get("iteration")
-    else:
-        best_iter = max(history, key=lambda h: h.get("train_passed", h.get("passed", 0))).get("iteration")
-
-    # Add rows for each iteration
-    for h in history:
-        iteration = h.get("iteration", "?")
-        train_passed = h.get("train_passed", h.get("passed", 0))
-        train_total = h.get("train_total", h.get("total", 0))
-        test_passed = h.get("test_passed")
-        test_total = h.get("test_total")
-        description = h.get("description", "")
-        train_results = h.get("train_results", h.get("results", []))
-        test_results = h.get("test_results", [])
-
-        # Create lookups for results by query
-        train_by_query = {r["query"]: r for r in train_results}
-        test_by_query = {r["query"]: r for r in test_results} if test_results else {}
-
-        # Compute aggregate correct/total runs across all retries
-        def aggregate_runs(results: list[dict]) -> tuple[int, int]:
-            correct = 0
-            total = 0
-            for r in results:
-                runs = r.get("runs", 0)
-                triggers = r.get("triggers", 0)
-                total += runs
-                if r.get("should_trigger", True):
-                    correct += triggers
-                else:
-                    correct += runs - triggers
-            return correct, total
-
-        train_correct, train_runs = aggregate_runs(train_results)
-        test_correct, test_runs = aggregate_runs(test_results)
+    # Scores of each row, to highlight the best iteration once all are written
+    scores = []
+    for row in rows:
+        iteration = row.get("iteration", "?")
+        description = row.get("description", "")
+        columns = row["results"]
+        scores.append((iteration, row.get("partial"), row.get("train_passed", row.get("passed", 0)), row.get("test_passed")))
+
+        # Aggregate correct/total runs across all retries, and one cell per query
+        correct = {"train": 0, "test": 0}
+        total = {"train": 0, "test": 0}
+        cells = []
+        for i, qinfo in enumerate(queries):
+            cell_class = "result test-result" if qinfo["split"] == "test" else "result"
+            runs = columns["runs"][i]
+            if runs is None:
+                # Pruned before this query was decided, or holdout not evaluated
+                cells.append(f'                <td class="{cell_class} undecided">–</td>\n')
+                continue
+            triggers = columns["triggers"][i]
+            if not runs:
+                # Every run timed out or errored: neither pass nor fail
+                cells.append(f'                <td class="{cell_class} undecided">?<span class="rate">0/0</span></td>\n')
+                continue
+            total[qinfo["split"]] += runs
+            correct[qinfo["split"]] += triggers if qinfo["should_trigger"] else runs - triggers
+
+            did_pass = bool(columns["pass"][i])
+            icon = "✓" if did_pass else "✗"
+            css_class = "pass" if did_pass else "fail"
+            cells.append(f'                <td class="{cell_class} {css_class}">{icon}<span class="rate">{triggers}/{runs}</span></td>\n')
 
         # Determine score classes
         def score_class(correct: int, total: int) -> str:
@@ -250,55 +259,61 @@ def generate_html(data: dict, auto_refresh: bool = False, skill_name: str = "")
                     return "score-ok"
             return "score-bad"
 
-        train_class = score_class(train_correct, train_runs)
-        test_class = score_class(test_correct, test_runs)
-
-        row_class = "best-row" if iteration == best_iter else ""
-
-        html_parts.append(f"""            <tr class="{row_class}">
-                <td>{iteration}</td>
-                <td><span class="score {train_class}">{train_correct}/{train_runs}</span></td>
-                <td><span class="score {test_class}">{test_correct}/{test_runs}</span></td>
+        train_class = score_class(correct["train"], total["train"])
+        test_class = score_class(correct["test"], total["test"])
+        has_test = any(columns["runs"][i] is not None for i, q in enumerate(queries) if q["split"] == "test")
+
+        minibatch = row.get("minibatch")
+        if minibatch and not minibatch["promoted"]:
+            row_label = '<br><span class="train-label">mini-batch</span>'
+        elif row.get("partial"):
+            row_label = '<br><span class="train-label">pruned</span>'
+        else:
+            row_label = ""
+        # Mini-batch score against the incumbent's on the same queries
+        minibatch_label = (
+            f'<br><span class="train-label">mini {minibatch["passed"]}/{minibatch["total"]} vs {minibatch["incumbent_passed"]}</span>'
+            if minibatch else ""
+        )
+
+        usage = row.get("usage")
+        usage_label = (
+            f'<br><span class="train-label" title="{html.escape(format_usage(usage))}">{short_count(total_tokens(usage))} tok</span>'
+            if usage else ""
+        )
+
+        yield f"""            <tr class="iter-{iteration}">
+                <td>{iteration}{row_label}{usage_label}</td>
+                <td><span class="score {train_class}">{correct["train"]}/{total["train"]}</span>{minibatch_label}</td>
+                <td>{f'<span class="score {test_class}">{correct["test"]}/{total["test"]}</span>' if has_test else '–'}</td>
                 <td class="description">{html.escape(description)}</td>
-""")
-
-        # Add result for each train query
-        for qinfo in train_queries:
-            r = train_by_query.get(qinfo["query"], {})
-            did_pass = r.get("pass", False)
-            triggers = r.get("triggers", 0)
-            runs = r.get("runs", 0)
-
-            icon = "✓" if did_pass else "✗"
-            css_class = "pass" if did_pass else "fail"
-
-            html_parts.append(f'                <td class="result {css_class}">{icon}<span class="rate">{triggers}/{runs}</span></td>\n')
-
-        # Add result for each test query (with different background)
-        for qinfo in test_queries:
-            r = test_by_query.get(qinfo["query"], {})
-            did_pass = r.get("pass", False)
-            triggers = r.get("triggers", 0)
-            runs = r.get("runs", 0)
-
-            icon = "✓" if did_pass else "✗"
-            css_class = "pass" if did_pass else "fail"
-
-            html_parts.append(f'                <td class="result test-result {css_class}">{icon}<span class="rate">{triggers}/{runs}</span></td>\n')
-
-        html_parts.append("            </tr>\n")
+"""
+        yield from cells
+        yield "            </tr>\n"
 
-    html_parts.append("""        </tbody>
+    yield """        </tbody>
     </table>
     </div>
-""")
+"""
 
-    html_parts.append("""
+    # Best iteration: pruned, partial iterations can't be it, and with a
+    # deferred holdout only some iterations have test scores
+    complete = [s for s in scores if not s[1]] or scores
+    tested = [s for s in complete if s[3] is not None]
+    if tested:
+        best_iter = max(tested, key=lambda s: s[3])[0]
+    elif complete:
+        best_iter = max(complete, key=lambda s: s[2])[0]
+    else:
+        best_iter = None
+    if best_iter is not None:
+        yield f"""    <style>.iter-{best_iter} {{ background: #f5f8f2; }}</style>
+"""
+
+    yield """
 </body>
 </html>
-""")
-
-    return "".join(html_parts)
+"""
 
 
 def main():
@@ -308,18 +323,21 @@ def main():
     parser.add_argument("--skill-name", default="", help="Skill name to include in the report title")
     args = parser.parse_args()
 
-    if args.input == "-":
-        data = json.load(sys.stdin)
-    else:
-        data = json.loads(Path(args.input).read_text())
-
-    html_output = generate_html(data, skill_name=args.skill_name)
+    # Parse and render one history row at a time rather than loading it all
+    source = sys.stdin if args.input == "-" else open(args.input)
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        header, rows = iter_output(source)
+        for chunk in iter_html(header, rows, skill_name=args.skill_name):
+            out.write(chunk)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
 
     if args.output:
-        Path(args.output).write_text(html_output)
         print(f"Report written to {args.output}", file=sys.stderr)
-    else:
-        print(html_output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Compact (v2) format for run_loop output.
+
+The original format stores every query's result dict in every history entry,
+twice (`train_results` and the backward-compatible `results`). Format 2
+defines the queries once and stores each iteration's outcomes as columns
+aligned with that table:
+
+    {"format": 2, "best_description": ..., ...,
+     "queries": [{"query": ..., "should_trigger": ..., "split": "train" | "test"}, ...],
+     "history": [
+     {"iteration": 1, "description": ..., "train_passed": ..., ...,
+      "results": {"triggers": [...], "runs": [...], "pass": [...], "timeouts": [...], "errors": [...]}},
+     ...
+     ]}
+
+run_loop() returns the original format for API callers; its command line
+writes format 2 unless given --legacy-format. A null in a column means the
+query was not evaluated in that iteration (pruned, screened on a mini-batch,
+or holdout deferred); zero runs means it was, but none of its runs completed
+(undetermined). dumps_output() puts the header on the first line and each
+history row on its own line, so iter_output() can read a file one iteration
+at a time; any other layout falls back to a full json.loads. legacy_output()
+expands format 2 back to the original shape.
+
+Usage:
+    python -m scripts.history_format results.json > results_v1.json
+    python -m scripts.history_format --compact results_v1.json > results.json
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+FORMAT_VERSION = 2
+
+RESULT_COLUMNS = ("triggers", "runs", "pass", "timeouts", "errors")
+
+# Per-query result lists of the original format, replaced by the columns
+LEGACY_RESULT_KEYS = ("train_results", "test_results", "results")
+
+HISTORY_OPEN = '"history": ['
+
+
+def query_table(train_set: list[dict], test_set: list[dict]) -> list[dict]:
+    return [
+        {"query": e["query"], "should_trigger": e["should_trigger"], "split": split}
+        for split, items in (("train", train_set), ("test", test_set))
+        for e in items
+    ]
+
+
+def queries_from_history(history: list[dict]) -> list[dict]:
+    """Query table of original-format output (which has no split lists), from its results."""
+    seen: dict[str, dict] = {}
+    for h in history:
+        for split, results in (("train", h.get("train_results", h.get("results"))), ("test", h.get("test_results"))):
+            for r in results or []:
+                seen.setdefault(r["query"], {"query": r["query"], "should_trigger": r.get("should_trigger", True), "split": split})
+    return [q for split in ("train", "test") for q in seen.values() if q["split"] == split]
+
+
+def compact_entry(entry: dict, index: dict[str, int]) -> dict:
+    """One original-format history entry as a format 2 row."""
+    row = {k: v for k, v in entry.items() if k not in LEGACY_RESULT_KEYS}
+    columns = {name: [None] * len(index) for name in RESULT_COLUMNS}
+    for key in ("train_results", "test_results") if "train_results" in entry else ("results",):
+        for r in entry.get(key) or []:
+            i = index[r["query"]]
+            for name in RESULT_COLUMNS:
+                columns[name][i] = r.get(name, 0)
+    columns["pass"] = [None if p is None else int(p) for p in columns["pass"]]
+    row["results"] = columns
+    return row
+
+
+def compact_output(output: dict, queries: list[dict] | None = None) -> dict:
+    """Format 2 version of run_loop output (a no-op if it already is)."""
+    if output.get("format") == FORMAT_VERSION:
+        return output
+    history = output.get("history", [])
+    queries = queries if queries is not None else queries_from_history(history)
+    index = {q["query"]: i for i, q in enumerate(queries)}
+    header = {k: v for k, v in output.items() if k != "history"}
+    return {"format": FORMAT_VERSION, **header, "queries": queries, "history": [compact_entry(h, index) for h in history]}
+
+
+def expand_entry(row: dict, queries: list[dict]) -> dict:
+    """One format 2 row as an original-format history entry."""
+    columns = row["results"]
+    split_results: dict[str, list[dict]] = {"train": [], "test": []}
+    for i, q in enumerate(queries):
+        runs = columns["runs"][i]
+        if runs is None:
+            continue
+        triggers = columns["triggers"][i]
+        split_results[q["split"]].append({
+            "query": q["query"],
+            "should_trigger": q["should_trigger"],
+            "trigger_rate": triggers / runs if runs else None,
+            "triggers": triggers,
+            "runs": runs,
+            "timeouts": columns["timeouts"][i],
+            "errors": columns["errors"][i],
+            "pass": bool(columns["pass"][i]),
+            "undetermined": not runs,
+        })
+    entry = {k: v for k, v in row.items() if k != "results"}
+    entry["train_results"] = split_results["train"]
+    entry["test_results"] = split_results["test"] if row.get("test_total") is not None else None
+    entry["results"] = split_results["train"]
+    return entry
+
+
+def legacy_output(data: dict) -> dict:
+    """Original-format version of run_loop output (a no-op if it already is)."""
+    if data.get("format") != FORMAT_VERSION:
+        return data
+    queries = data["queries"]
+    header = {k: v for k, v in data.items() if k not in ("format", "queries", "history")}
+    return {**header, "history": [expand_entry(row, queries) for row in data["history"]]}
+
+
+def dumps_output(data: dict) -> str:
+    """Serialize format 2 output with one history row per line (see iter_output)."""
+    header = {k: v for k, v in data.items() if k != "history"}
+    lines = [json.dumps(header)[:-1] + ",", HISTORY_OPEN]
+    rows = [json.dumps(row) for row in data["history"]]
+    lines.extend(row + "," for row in rows[:-1])
+    lines.extend(rows[-1:])
+    lines.append("]}")
+    return "\n".join(lines)
+
+
+def iter_output(lines: Iterable[str]) -> tuple[dict, Iterator[dict]]:
+    """Header and lazily parsed history rows of run_loop output, as format 2.
+
+    Reads dumps_output's layout a line at a time; anything else (the original
+    format, or format 2 re-indented by another tool) is parsed whole.
+    """
+    lines = iter(lines)
+    first = next(lines, "")
+    second = next(lines, "")
+    if first.rstrip().endswith(",") and second.strip() == HISTORY_OPEN:
+        try:
+            header = json.loads(first.rstrip()[:-1] + "}")
+        except json.JSONDecodeError:
+            header = None
+        if header is not None and header.get("format") == FORMAT_VERSION:
+            return header, _iter_rows(lines)
+    data = compact_output(json.loads(first + second + "".join(lines)))
+    rows = data.pop("history")
+    return data, iter(rows)
+
+
+def _iter_rows(lines: Iterator[str]) -> Iterator[dict]:
+    for line in lines:
+        line = line.strip()
+        if line in ("]}", ""):
+            continue
+        yield json.loads(line.rstrip(","))
+
+
+def load_output(path: Path) -> dict:
+    """Read a run_loop output file of either format, as format 2."""
+    with open(path) as f:
+        header, rows = iter_output(f)
+        return {**header, "history": list(rows)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert run_loop output between the compact (v2) and original formats")
+    parser.add_argument("input", help="run_loop output JSON (or - for stdin)")
+    parser.add_argument("--compact", action="store_true", help="Write format 2 instead of the original format")
+    args = parser.parse_args()
+
+    if args.input == "-":
+        header, rows = iter_output(sys.stdin)
+        data = {**header, "history": list(rows)}
+    else:
+        data = load_output(Path(args.input))
+    if args.compact:
+        print(dumps_output(data))
+    else:
+        print(json.dumps(legacy_output(data), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ using Claude with extended thinking.
 """
 
 import argparse
+import asyncio
 import json
 import re
 import sys
@@ -13,29 +14,34 @@ from pathlib import Path
 
 import anthropic
 
-from scripts.utils import parse_skill_md
+from scripts.eval_cache import resolve_cache_dir
+from scripts.llm_cache import ResponseCache, create_message, default_llm_cache_dir, total_usage
+from scripts.utils import parse_skill_md, result_status
 
 
-def improve_description(
-    client: anthropic.Anthropic,
+def build_prompt(
     skill_name: str,
     skill_content: str,
     current_description: str,
     eval_results: dict,
     history: list[dict],
-    model: str,
     test_results: dict | None = None,
-    log_dir: Path | None = None,
-    iteration: int | None = None,
-) -> str:
-    """Call Claude to improve the description based on eval results."""
+) -> list[dict]:
+    """The improvement prompt as two content blocks, each ending a cache breakpoint.
+
+    The first block (instructions and skill content) is identical on every
+    iteration of a loop, so the provider serves it from its prompt cache;
+    the second holds the current description, scores and history. Marking
+    the second block too lets the "shorten" follow-up reuse the whole prompt.
+    """
+    # Undetermined queries (no completed runs) say nothing about the description
     failed_triggers = [
         r for r in eval_results["results"]
-        if r["should_trigger"] and not r["pass"]
+        if r["should_trigger"] and not r["pass"] and not r.get("undetermined")
     ]
     false_triggers = [
         r for r in eval_results["results"]
-        if not r["should_trigger"] and not r["pass"]
+        if not r["should_trigger"] and not r["pass"] and not r.get("undetermined")
     ]
 
     # Build scores summary
@@ -46,11 +52,33 @@ def improve_description(
     else:
         scores_summary = f"Train: {train_score}"
 
-    prompt = f"""You are optimizing a skill description for a Claude Code skill called "{skill_name}". A "skill" is sort of like a prompt, but with progressive disclosure -- there's a title and description that Claude sees when deciding whether to use the skill, and then if it does use the skill, it reads the .md file which has lots more details and potentially links to other resources in the skill folder like helper files and scripts and additional documentation or examples.
+    static = f"""You are optimizing a skill description for a Claude Code skill called "{skill_name}". A "skill" is sort of like a prompt, but with progressive disclosure -- there's a title and description that Claude sees when deciding whether to use the skill, and then if it does use the skill, it reads the .md file which has lots more details and potentially links to other resources in the skill folder like helper files and scripts and additional documentation or examples.
 
 The description appears in Claude's "available_skills" list. When a user sends a query, Claude decides whether to invoke the skill based solely on the title and on this description. Your goal is to write a description that triggers for relevant queries, and doesn't trigger for irrelevant ones.
 
-Here's the current description:
+Skill content (for context on what the skill does):
+<skill_content>
+{skill_content}
+</skill_content>
+
+Based on the failures shown below, write a new and improved description that is more likely to trigger correctly. When I say "based on the failures", it's a bit of a tricky line to walk because we don't want to overfit to the specific cases you're seeing. So what I DON'T want you to do is produce an ever-expanding list of specific queries that this skill should or shouldn't trigger for. Instead, try to generalize from the failures to broader categories of user intent and situations where this skill would be useful or not useful. The reason for this is twofold:
+
+1. Avoid overfitting
+2. The list might get loooong and it's injected into ALL queries and there might be a lot of skills, so we don't want to blow too much space on any given description.
+
+Concretely, your description should not be more than about 100-200 words, even if that comes at the cost of accuracy.
+
+Here are some tips that we've found to work well in writing these descriptions:
+- The skill should be phrased in the imperative -- "Use this skill for" rather than "this skill does"
+- The skill description should focus on the user's intent, what they are trying to achieve, vs. the implementation details of how the skill works.
+- The description competes with other skills for Claude's attention — make it distinctive and immediately recognizable.
+- If you're getting lots of failures after repeated attempts, change things up. Try different sentence structures or wordings.
+
+I'd encourage you to be creative and mix up the style in different iterations since you'll have multiple opportunities to try different approaches and we'll just grab the highest-scoring one at the end.
+
+Please respond with only the new description text in <new_description> tags, nothing else."""
+
+    prompt = f"""Here's the current description:
 <current_description>
 "{current_description}"
 </current_description>
@@ -81,63 +109,69 @@ Current scores ({scores_summary}):
             if "results" in h:
                 prompt += "Train results:\n"
                 for r in h["results"]:
-                    status = "PASS" if r["pass"] else "FAIL"
+                    status = result_status(r)
                     prompt += f'  [{status}] "{r["query"][:80]}" (triggered {r["triggers"]}/{r["runs"]})\n'
             if h.get("note"):
                 prompt += f'Note: {h["note"]}\n'
             prompt += "</attempt>\n\n"
 
-    prompt += f"""</scores_summary>
-
-Skill content (for context on what the skill does):
-<skill_content>
-{skill_content}
-</skill_content>
-
-Based on the failures, write a new and improved description that is more likely to trigger correctly. When I say "based on the failures", it's a bit of a tricky line to walk because we don't want to overfit to the specific cases you're seeing. So what I DON'T want you to do is produce an ever-expanding list of specific queries that this skill should or shouldn't trigger for. Instead, try to generalize from the failures to broader categories of user intent and situations where this skill would be useful or not useful. The reason for this is twofold:
-
-1. Avoid overfitting
-2. The list might get loooong and it's injected into ALL queries and there might be a lot of skills, so we don't want to blow too much space on any given description.
-
-Concretely, your description should not be more than about 100-200 words, even if that comes at the cost of accuracy.
-
-Here are some tips that we've found to work well in writing these descriptions:
-- The skill should be phrased in the imperative -- "Use this skill for" rather than "this skill does"
-- The skill description should focus on the user's intent, what they are trying to achieve, vs. the implementation details of how the skill works.
-- The description competes with other skills for Claude's attention — make it distinctive and immediately recognizable.
-- If you're getting lots of failures after repeated attempts, change things up. Try different sentence structures or wordings.
-
-I'd encourage you to be creative and mix up the style in different iterations since you'll have multiple opportunities to try different approaches and we'll just grab the highest-scoring one at the end.
+    prompt += "</scores_summary>\n\nWrite the improved description following the instructions above, in <new_description> tags."
 
-Please respond with only the new description text in <new_description> tags, nothing else."""
+    return [
+        {"type": "text", "text": static, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}},
+    ]
 
-    response = client.messages.create(
-        model=model,
-        max_tokens=16000,
-        thinking={
-            "type": "enabled",
-            "budget_tokens": 10000,
-        },
-        messages=[{"role": "user", "content": prompt}],
-    )
 
-    # Extract thinking and text from response
+def parse_response(response: dict) -> tuple[str, str, str]:
+    """Return (thinking, text, parsed description) from a normalized response."""
     thinking_text = ""
     text = ""
-    for block in response.content:
-        if block.type == "thinking":
-            thinking_text = block.thinking
-        elif block.type == "text":
-            text = block.text
+    for block in response["content"]:
+        if block["type"] == "thinking":
+            thinking_text = block["thinking"]
+        elif block["type"] == "text":
+            text = block["text"]
 
     # Parse out the <new_description> tags
     match = re.search(r"<new_description>(.*?)</new_description>", text, re.DOTALL)
     description = match.group(1).strip().strip('"') if match else text.strip().strip('"')
+    return thinking_text, text, description
+
+
+async def improve_description_async(
+    client: anthropic.Anthropic | anthropic.AsyncAnthropic,
+    skill_name: str,
+    skill_content: str,
+    current_description: str,
+    eval_results: dict,
+    history: list[dict],
+    model: str,
+    test_results: dict | None = None,
+    log_dir: Path | None = None,
+    iteration: int | None = None,
+    cache: ResponseCache | None = None,
+    log_name: str | None = None,
+) -> str:
+    """Async improve_description. Several calls run concurrently with either client."""
+    blocks = build_prompt(skill_name, skill_content, current_description, eval_results, history, test_results)
+    request = {
+        "model": model,
+        "max_tokens": 16000,
+        "thinking": {
+            "type": "enabled",
+            "budget_tokens": 10000,
+        },
+        "messages": [{"role": "user", "content": blocks}],
+    }
+    response, call = await create_message(client, request, cache)
+    calls = [call]
+    thinking_text, text, description = parse_response(response)
 
     # Log the transcript
     transcript: dict = {
         "iteration": iteration,
-        "prompt": prompt,
+        "prompt": "\n\n".join(block["text"] for block in blocks),
         "thinking": thinking_text,
         "response": text,
         "parsed_description": description,
@@ -148,30 +182,17 @@ Please respond with only the new description text in <new_description> tags, not
     # If over 1024 chars, ask the model to shorten it
     if len(description) > 1024:
         shorten_prompt = f"Your description is {len(description)} characters, which exceeds the hard 1024 character limit. Please rewrite it to be under 1024 characters while preserving the most important trigger words and intent coverage. Respond with only the new description in <new_description> tags."
-        shorten_response = client.messages.create(
-            model=model,
-            max_tokens=16000,
-            thinking={
-                "type": "enabled",
-                "budget_tokens": 10000,
-            },
-            messages=[
-                {"role": "user", "content": prompt},
+        shorten_request = {
+            **request,
+            "messages": [
+                {"role": "user", "content": blocks},
                 {"role": "assistant", "content": text},
                 {"role": "user", "content": shorten_prompt},
             ],
-        )
-
-        shorten_thinking = ""
-        shorten_text = ""
-        for block in shorten_response.content:
-            if block.type == "thinking":
-                shorten_thinking = block.thinking
-            elif block.type == "text":
-                shorten_text = block.text
-
-        match = re.search(r"<new_description>(.*?)</new_description>", shorten_text, re.DOTALL)
-        shortened = match.group(1).strip().strip('"') if match else shorten_text.strip().strip('"')
+        }
+        shorten_response, call = await create_message(client, shorten_request, cache)
+        calls.append(call)
+        shorten_thinking, shorten_text, shortened = parse_response(shorten_response)
 
         transcript["rewrite_prompt"] = shorten_prompt
         transcript["rewrite_thinking"] = shorten_thinking
@@ -180,22 +201,69 @@ Please respond with only the new description text in <new_description> tags, not
         transcript["rewrite_char_count"] = len(shortened)
         description = shortened
 
+    replayed = sum(call["cache"] == "hit" for call in calls)
+    if replayed:
+        print(f"Replayed {replayed} cached improve_description response(s) from {cache.dir}", file=sys.stderr)
+
     transcript["final_description"] = description
+    transcript["calls"] = calls
+    transcript["usage"] = total_usage(calls)
 
     if log_dir:
         log_dir.mkdir(parents=True, exist_ok=True)
-        log_file = log_dir / f"improve_iter_{iteration or 'unknown'}.json"
+        log_file = log_dir / (log_name or f"improve_iter_{iteration or 'unknown'}.json")
         log_file.write_text(json.dumps(transcript, indent=2))
 
     return description
 
 
+def improve_description(
+    client: anthropic.Anthropic,
+    skill_name: str,
+    skill_content: str,
+    current_description: str,
+    eval_results: dict,
+    history: list[dict],
+    model: str,
+    test_results: dict | None = None,
+    log_dir: Path | None = None,
+    iteration: int | None = None,
+    cache: ResponseCache | None = None,
+    log_name: str | None = None,
+) -> str:
+    """Call Claude to improve the description based on eval results.
+
+    With cache, responses are stored on disk by request hash and replayed on
+    identical requests (see scripts/llm_cache.py); replays are reported on
+    stderr. Transcripts in log_dir
+    (named log_name, by default improve_iter_<iteration>.json) record each
+    call's cache status and token usage, including provider-side prompt
+    cache reads and writes.
+    """
+    return asyncio.run(improve_description_async(
+        client=client,
+        skill_name=skill_name,
+        skill_content=skill_content,
+        current_description=current_description,
+        eval_results=eval_results,
+        history=history,
+        model=model,
+        test_results=test_results,
+        log_dir=log_dir,
+        iteration=iteration,
+        cache=cache,
+        log_name=log_name,
+    ))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Improve a skill description based on eval results")
     parser.add_argument("--eval-results", required=True, help="Path to eval results JSON (from run_eval.py)")
     parser.add_argument("--skill-path", required=True, help="Path to skill directory")
     parser.add_argument("--history", default=None, help="Path to history JSON (previous attempts)")
     parser.add_argument("--model", required=True, help="Model for improvement")
+    parser.add_argument("--llm-cache", action="store_true", help="Store API responses and replay them for identical requests instead of calling the API again")
+    parser.add_argument("--llm-cache-dir", default=None, help=f"Directory of cached LLM responses for --llm-cache (default: {default_llm_cache_dir()})")
     parser.add_argument("--verbose", action="store_true", help="Print thinking to stderr")
     args = parser.parse_args()
 
@@ -217,6 +285,7 @@ def main():
         print(f"Score: {eval_results['summary']['passed']}/{eval_results['summary']['total']}", file=sys.stderr)
 
     client = anthropic.Anthropic()
+    llm_cache_dir = resolve_cache_dir(args.llm_cache_dir, not args.llm_cache, default_llm_cache_dir())
     new_description = improve_description(
         client=client,
         skill_name=name,
@@ -225,6 +294,7 @@ def main():
         eval_results=eval_results,
         history=history,
         model=args.model,
+        cache=ResponseCache(llm_cache_dir) if llm_cache_dir else None,
     )
 
     if args.verbose:
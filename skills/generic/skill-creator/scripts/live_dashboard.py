@@ -0,0 +1,373 @@
+"""Live dashboard for run_loop, served over HTTP with the standard library.
+
+Rewriting the whole HTML report after every iteration (and reloading it every
+5 seconds) gets slow once the report is megabytes. LiveDashboard instead
+serves a static page once and streams small events to it:
+
+- GET /              the page (same styles as generate_report)
+- GET /events        Server-Sent Events; reconnects resume from Last-Event-ID
+- GET /events.json   the same events as JSON, `?since=<id>` for polling
+
+Events, each a JSON object:
+
+- start:     skill name, descriptions, split sizes and the query table
+- begin:     an iteration's description, before its runs start
+- progress:  one query's running tally in an iteration, after each run
+- row:       a finished history entry in format 2 (see history_format.py)
+- finish:    best description, score and iteration, once the loop ends
+
+A row event supersedes every earlier event of its iteration, which is
+dropped from the log, so a client connecting late replays roughly one event
+per iteration rather than one per run. The server binds to localhost and
+runs in daemon threads.
+"""
+
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from scripts.generate_report import REPORT_HEAD
+from scripts.history_format import compact_entry
+
+# Comment line sent on idle event streams so proxies and browsers keep them open
+KEEPALIVE_S = 15.0
+
+# History entry fields a row event carries (telemetry stays in results.json)
+ROW_FIELDS = (
+    "iteration", "description", "train_passed", "train_total", "test_passed", "test_total",
+    "partial", "minibatch", "round", "parent", "usage", "results",
+)
+
+
+class LiveDashboard:
+    """HTTP server streaming run_loop progress to a browser."""
+
+    def __init__(self, port: int = 0, host: str = "127.0.0.1"):
+        self._cond = threading.Condition()
+        # (id, event name, JSON data, iteration) in id order
+        self._events: list[tuple[int, str, str, int | None]] = []
+        self._next_id = 0
+        self._done = False
+        self._streams = 0
+        self._index: dict[str, int] = {}
+
+        handler = type("Handler", (_Handler,), {"dashboard": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name="live-dashboard", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _publish(self, event: str, data: dict, iteration: int | None = None) -> None:
+        payload = json.dumps(data)
+        with self._cond:
+            if event == "row":
+                self._events = [e for e in self._events if e[3] != iteration]
+            self._events.append((self._next_id, event, payload, iteration))
+            self._next_id += 1
+            self._cond.notify_all()
+
+    def start(self, info: dict, queries: list[dict]) -> None:
+        """Begin a loop: info is shown in the summary, queries are the columns (see query_table)."""
+        self._index = {q["query"]: i for i, q in enumerate(queries)}
+        self._publish("start", {**info, "queries": queries})
+
+    def begin(self, iteration: int, description: str) -> None:
+        self._publish("begin", {"iteration": iteration, "description": description}, iteration)
+
+    def progress(self, iteration: int, result: dict) -> None:
+        """One query's running tally (a run_eval result dict) for an iteration."""
+        self._publish("progress", {
+            "iteration": iteration,
+            "index": self._index[result["query"]],
+            "triggers": result["triggers"],
+            "runs": result["runs"],
+            "pass": result["pass"],
+        }, iteration)
+
+    def row(self, entry: dict) -> None:
+        """A finished (or updated) history entry."""
+        row = compact_entry(entry, self._index)
+        self._publish("row", {k: row[k] for k in ROW_FIELDS if k in row}, entry["iteration"])
+
+    def finish(self, summary: dict) -> None:
+        self._publish("finish", summary)
+
+    def events_since(self, last_id: int) -> tuple[list[tuple[int, str, str, int | None]], bool]:
+        with self._cond:
+            start = bisect.bisect_right(self._events, last_id, key=lambda e: e[0])
+            return self._events[start:], self._done
+
+    def wait(self, last_id: int, timeout: float) -> tuple[list[tuple[int, str, str, int | None]], bool]:
+        """Events after last_id, waiting up to timeout for one; and whether the loop is over."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._next_id - 1 > last_id or self._done, timeout)
+        return self.events_since(last_id)
+
+    def close(self, drain_timeout: float = 2.0) -> None:
+        """Stop the server once open event streams have received everything (or after drain_timeout)."""
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+        deadline = time.monotonic() + drain_timeout
+        with self._cond:
+            while self._streams and time.monotonic() < deadline:
+                self._cond.wait(0.05)
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    dashboard: LiveDashboard
+
+    def log_message(self, format, *args):
+        # Keep stderr for the loop's own progress output
+        pass
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == "/":
+            self._send("text/html; charset=utf-8", PAGE.encode())
+        elif path == "/events":
+            self._stream(int(self.headers.get("Last-Event-ID") or -1))
+        elif path == "/events.json":
+            since = int(parse_qs(query).get("since", ["-1"])[0])
+            events, done = self.dashboard.events_since(since)
+            body = {
+                "events": [{"id": i, "event": name, "data": json.loads(data)} for i, name, data, _ in events],
+                "done": done,
+            }
+            self._send("application/json", json.dumps(body).encode())
+        else:
+            self.send_error(404)
+
+    def _send(self, content_type: str, body: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, last_id: int) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        dashboard = self.dashboard
+        with dashboard._cond:
+            dashboard._streams += 1
+        try:
+            while True:
+                events, done = dashboard.wait(last_id, KEEPALIVE_S)
+                if events:
+                    self.wfile.write("".join(f"id: {i}\nevent: {name}\ndata: {data}\n\n" for i, name, data, _ in events).encode())
+                    last_id = events[-1][0]
+                elif done:
+                    return
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with dashboard._cond:
+                dashboard._streams -= 1
+                dashboard._cond.notify_all()
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Skill Description Optimization</title>
+""" + REPORT_HEAD + """    <style>
+        td.running { opacity: 0.55; }
+        .best-row { background: #f5f8f2; }
+        .status { color: #b0aea5; font-size: 0.875rem; }
+    </style>
+</head>
+<body>
+    <h1 id="title">Skill Description Optimization</h1>
+    <div class="summary" id="summary"><p class="status">Connecting&hellip;</p></div>
+    <div class="legend">
+        <span style="font-weight:600">Query columns:</span>
+        <span class="legend-item"><span class="legend-swatch swatch-positive"></span> Should trigger</span>
+        <span class="legend-item"><span class="legend-swatch swatch-negative"></span> Should NOT trigger</span>
+        <span class="legend-item"><span class="legend-swatch swatch-train"></span> Train</span>
+        <span class="legend-item"><span class="legend-swatch swatch-test"></span> Test</span>
+        <span class="legend-item"><span class="status">Faded cells are still running</span></span>
+    </div>
+    <div class="table-container">
+    <table>
+        <thead><tr id="head"></tr></thead>
+        <tbody id="rows"></tbody>
+    </table>
+    </div>
+<script>
+"use strict";
+let queries = [];
+let info = {};
+const rows = new Map();   // iteration -> <tr>
+const cells = new Map();  // iteration -> per-query {triggers, runs, pass} or null
+const head = document.getElementById("head");
+const body = document.getElementById("rows");
+const summary = document.getElementById("summary");
+
+function el(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+}
+
+function scoreClass(correct, total) {
+    if (total > 0 && correct / total >= 0.8) return "score-good";
+    if (total > 0 && correct / total >= 0.5) return "score-ok";
+    return "score-bad";
+}
+
+function tokens(usage) {
+    const n = usage.input_tokens + usage.output_tokens + usage.cache_read_input_tokens + usage.cache_creation_input_tokens;
+    return n >= 1e6 ? (n / 1e6).toFixed(1) + "M" : n >= 1e3 ? (n / 1e3).toFixed(1) + "k" : String(n);
+}
+
+function showSummary(lines) {
+    summary.replaceChildren(...lines.map(([label, value, className]) => {
+        const p = el("p", className);
+        p.append(el("strong", "", label + ": "), String(value));
+        return p;
+    }));
+}
+
+function showStatus(status) {
+    showSummary([
+        ["Original", info.original_description],
+        ["Train", info.train_size + " | Test: " + info.test_size],
+        ["Status", status],
+    ]);
+}
+
+function row(iteration) {
+    let tr = rows.get(iteration);
+    if (tr) return tr;
+    tr = el("tr");
+    tr.append(el("td", "", iteration), el("td"), el("td", "", "\\u2013"), el("td", "description"));
+    for (const q of queries) tr.append(el("td", "result undecided" + (q.split === "test" ? " test-result" : ""), "\\u2013"));
+    const later = [...rows.keys()].filter(k => k > iteration).sort((a, b) => a - b)[0];
+    body.insertBefore(tr, later === undefined ? null : rows.get(later));
+    rows.set(iteration, tr);
+    cells.set(iteration, queries.map(() => null));
+    return tr;
+}
+
+function setCell(iteration, index, cell, running) {
+    cells.get(iteration)[index] = cell;
+    const td = rows.get(iteration).children[4 + index];
+    const base = "result" + (queries[index].split === "test" ? " test-result" : "");
+    if (!cell) {
+        td.className = base + " undecided";
+        td.textContent = "\\u2013";
+        return;
+    }
+    if (!cell.runs) {
+        // No run completed (all timed out or errored): undetermined
+        td.className = base + " undecided" + (running ? " running" : "");
+        td.replaceChildren("?", el("span", "rate", "0/0"));
+        return;
+    }
+    td.className = base + (cell.pass ? " pass" : " fail") + (running ? " running" : "");
+    td.replaceChildren(cell.pass ? "\\u2713" : "\\u2717", el("span", "rate", cell.triggers + "/" + cell.runs));
+}
+
+function setScores(iteration) {
+    const totals = {train: [0, 0], test: [0, 0]};
+    cells.get(iteration).forEach((cell, i) => {
+        if (!cell) return;
+        const total = totals[queries[i].split];
+        total[0] += queries[i].should_trigger ? cell.triggers : cell.runs - cell.triggers;
+        total[1] += cell.runs;
+    });
+    const tr = rows.get(iteration);
+    for (const [split, td] of [["train", tr.children[1]], ["test", tr.children[2]]]) {
+        const [correct, total] = totals[split];
+        if (split === "test" && total === 0) td.replaceChildren("\\u2013");
+        else td.replaceChildren(el("span", "score " + scoreClass(correct, total), correct + "/" + total));
+    }
+    // Mini-batch score against the incumbent's on the same queries
+    if (tr.dataset.minibatch) tr.children[1].append(el("br"), el("span", "train-label", tr.dataset.minibatch));
+}
+
+const source = new EventSource("events");
+
+source.addEventListener("start", event => {
+    const data = JSON.parse(event.data);
+    info = data;
+    queries = data.queries;
+    rows.clear();
+    cells.clear();
+    body.replaceChildren();
+    document.title = data.skill_name + " \\u2014 Skill Description Optimization";
+    document.getElementById("title").textContent = document.title;
+    head.replaceChildren(el("th", "", "Iter"), el("th", "", "Train"), el("th", "", "Test"), el("th", "query-col", "Description"));
+    for (const q of queries) {
+        head.append(el("th", (q.split === "test" ? "test-col " : "") + (q.should_trigger ? "positive-col" : "negative-col"), q.query));
+    }
+    showStatus("running");
+});
+
+source.addEventListener("begin", event => {
+    const data = JSON.parse(event.data);
+    row(data.iteration).children[3].textContent = data.description;
+    showStatus("evaluating iteration " + data.iteration);
+});
+
+source.addEventListener("progress", event => {
+    const data = JSON.parse(event.data);
+    row(data.iteration);
+    setCell(data.iteration, data.index, data, true);
+    setScores(data.iteration);
+});
+
+source.addEventListener("row", event => {
+    const data = JSON.parse(event.data);
+    const tr = row(data.iteration);
+    tr.children[3].textContent = data.description;
+    const columns = data.results;
+    queries.forEach((q, i) => {
+        const runs = columns.runs[i];
+        setCell(data.iteration, i, runs === null ? null : {triggers: columns.triggers[i], runs: runs, pass: columns.pass[i]}, false);
+    });
+    const label = data.minibatch && !data.minibatch.promoted ? "mini-batch" : (data.partial ? "pruned" : "");
+    tr.children[0].replaceChildren(String(data.iteration));
+    if (label) tr.children[0].append(el("br"), el("span", "train-label", label));
+    if (data.usage) tr.children[0].append(el("br"), el("span", "train-label", tokens(data.usage) + " tok"));
+    const mb = data.minibatch;
+    if (mb) tr.dataset.minibatch = "mini " + mb.passed + "/" + mb.total + " vs " + mb.incumbent_passed;
+    setScores(data.iteration);
+});
+
+source.addEventListener("finish", event => {
+    const data = JSON.parse(event.data);
+    showSummary([
+        ["Original", info.original_description],
+        ["Best", data.best_description, "best"],
+        ["Best Score", data.best_score + (data.best_test_score ? " (test)" : " (train)")],
+        ["Iterations", data.iterations_run + " | Exit: " + data.exit_reason],
+        ...(data.usage ? [["Usage", tokens(data.usage) + " tokens" + (data.usage.cost_runs ? " | $" + data.usage.cost_usd.toFixed(4) + " reported by " + data.usage.cost_runs + " of " + data.usage.runs + " runs" : "")]] : []),
+    ]);
+    const best = rows.get(data.best_iteration);
+    if (best) best.classList.add("best-row");
+    source.close();
+});
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,120 @@
+"""On-disk cache of LLM responses for improve_description.
+
+Each Messages API request (model, parameters and messages) is hashed, and the
+normalized response -- content blocks, stop reason and token usage -- is
+stored as one JSON file under that hash. Re-running a loop, or a test against
+recorded responses, replays them without calling the API.
+
+create_message() works with anthropic.Anthropic, anthropic.AsyncAnthropic or
+any stub whose `messages.create(**request)` returns (or awaits to) an object
+or dict with `content` blocks and `usage`. A synchronous client is called in
+a worker thread, so it never blocks the event loop other requests share.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+from scripts.eval_cache import default_cache_dir
+
+# Bump when the stored response format changes
+CACHE_VERSION = 1
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def default_llm_cache_dir() -> Path:
+    return default_cache_dir() / "llm-responses"
+
+
+def request_key(request: dict) -> str:
+    """Hash everything that determines a response."""
+    payload = json.dumps([CACHE_VERSION, request], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _field(obj, name: str):
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def normalize_response(response) -> dict:
+    """Plain-dict form of a Messages API response (SDK object, dict or stub)."""
+    content = []
+    for block in _field(response, "content") or []:
+        block_type = _field(block, "type")
+        if block_type == "thinking":
+            content.append({"type": "thinking", "thinking": _field(block, "thinking") or ""})
+        elif block_type == "text":
+            content.append({"type": "text", "text": _field(block, "text") or ""})
+    usage = _field(response, "usage")
+    return {
+        "content": content,
+        "stop_reason": _field(response, "stop_reason"),
+        "usage": {name: (_field(usage, name) or 0) if usage is not None else 0 for name in USAGE_FIELDS},
+    }
+
+
+class ResponseCache:
+    """Directory of normalized responses, one `<request key>.json` per request."""
+
+    def __init__(self, cache_dir: Path):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> dict | None:
+        try:
+            return json.loads((self.dir / f"{key}.json").read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, response: dict) -> None:
+        # Write-then-rename so concurrent readers never see half a file
+        tmp = self.dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        tmp.write_text(json.dumps(response))
+        os.replace(tmp, self.dir / f"{key}.json")
+
+
+async def create_message(client, request: dict, cache: ResponseCache | None = None) -> tuple[dict, dict]:
+    """Send (or replay) one request; return the normalized response and a call record.
+
+    The call record holds the request key, whether it was replayed from the
+    local cache, the token usage and the elapsed time.
+    """
+    key = request_key(request)
+    start = time.monotonic()
+    response = cache.get(key) if cache else None
+    replayed = response is not None
+    if response is None:
+        create = client.messages.create
+        if inspect.iscoroutinefunction(create):
+            raw = await create(**request)
+        else:
+            # May be a blocking client; its wrapper may also return an awaitable
+            raw = await asyncio.to_thread(create, **request)
+        if inspect.isawaitable(raw):
+            raw = await raw
+        response = normalize_response(raw)
+        if cache:
+            cache.put(key, response)
+    record = {
+        "key": key,
+        "cache": "hit" if replayed else ("miss" if cache else "disabled"),
+        "usage": response["usage"],
+        "elapsed_s": round(time.monotonic() - start, 3),
+    }
+    return response, record
+
+
+def total_usage(records: list[dict], replayed: bool | None = None) -> dict:
+    """Sum token usage over call records (optionally only replayed or only live calls)."""
+    totals = dict.fromkeys(USAGE_FIELDS, 0)
+    for record in records:
+        if replayed is None or (record["cache"] == "hit") == replayed:
+            for name in USAGE_FIELDS:
+                totals[name] += record["usage"].get(name, 0)
+    return totals
@@ -3,20 +3,38 @@
 
 Tests whether a skill's description causes Claude to trigger (read the skill)
 for a set of queries. Outputs results as JSON.
+
+Runs that time out or error are retried once and never count as "did not
+trigger"; each result reports them as "timeouts" and "errors". A query with
+no completed runs at all is "undetermined" (trigger_rate None, pass False),
+and the summary counts it apart from "passed" and "failed".
+
+`run_eval worker --queue PATH` instead runs jobs that `run_eval --queue PATH`
+(or run_loop) enqueued, so several processes or machines can share a batch;
+see scripts/work_queue.py.
 """
 
 import argparse
+import asyncio
 import json
-import os
-import select
-import subprocess
 import sys
-import time
 import uuid
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import Counter
+from collections.abc import Callable
+from functools import partial
 from pathlib import Path
 
-from scripts.utils import parse_skill_md
+from scripts.concurrency import FAILURE_KINDS, ConcurrencyController, result_failure, run_failure
+from scripts.eval_cache import NO_CACHE_ENV, TriggerCache, default_cache_dir, query_key, resolve_cache_dir, run_key
+from scripts.executors import ClaudeExecutor, Executor, make_executor
+from scripts.sampling import first_wave_size, is_settled
+from scripts.sandbox import SandboxPool, command_file_content
+from scripts.scheduling import SCHEDULES, QueryStats, RunScheduler
+from scripts.stream_json import JsonlDecoder, parse_event, type_pattern
+from scripts.telemetry import format_telemetry, query_latency, summarize_runs, write_chrome_trace
+from scripts.usage import UsageMeter, format_usage, run_usage
+from scripts.utils import parse_skill_md, result_status
+from scripts.work_queue import DEFAULT_LEASE_S, POLL_INTERVAL_S, RemoteRunner, WorkQueue, worker_id
 
 
 def find_project_root() -> Path:
@@ -32,156 +50,300 @@ def find_project_root() -> Path:
     return current
 
 
-def run_single_query(
+# Bytes requested from the child's stdout per read
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Upper bound on concurrency for --adaptive-workers
+DEFAULT_MAX_WORKERS = 64
+
+# Times a run that timed out or errored is retried before being given up on
+RUN_RETRIES = 1
+
+# Run record fields a queue worker reports back (see scripts/work_queue.py)
+REMOTE_RUN_FIELDS = (
+    "spawn_s", "first_event_s", "decision_s", "source", "exit_reason", "returncode", "triggered", "usage", "cost_usd"
+)
+
+# Seconds between a queue worker's lease renewals, which is also how soon it
+# notices that a job was cancelled
+LEASE_RENEW_S = 1.0
+
+
+def write_command_file(project_root: str, skill_name: str, skill_description: str) -> tuple[str, Path]:
+    """Create a uniquely named command file so the skill shows up in available_skills.
+
+    Returns the unique command name (what detection looks for) and the file path.
+    """
+    unique_id = uuid.uuid4().hex[:8]
+    clean_name = f"{skill_name}-skill-{unique_id}"
+    project_commands_dir = Path(project_root) / ".claude" / "commands"
+    command_file = project_commands_dir / f"{clean_name}.md"
+
+    project_commands_dir.mkdir(parents=True, exist_ok=True)
+    command_file.write_text(command_file_content(skill_name, skill_description))
+    return clean_name, command_file
+
+
+class TriggerDetector:
+    """Decide from stream-json events whether our command was invoked.
+
+    feed() returns True/False as soon as the outcome is known and None while
+    it is still undecided. Detection prefers stream events (content_block_start
+    plus input_json_delta) so it can decide before the tool actually runs, and
+    falls back to the full assistant message.
+    """
+
+    # Only lines carrying one of these types can affect the decision
+    EVENT_TYPES = (
+        "content_block_start",
+        "input_json_delta",
+        "content_block_stop",
+        "message_stop",
+        "assistant",
+        "result",
+    )
+    EVENT_PATTERN = type_pattern(EVENT_TYPES)
+
+    def __init__(self, clean_name: str):
+        self.clean_name = clean_name
+        self.triggered = False
+        self.pending_tool_name: str | None = None
+        self.accumulated_json = ""
+        # Top-level type of the event that decided the outcome
+        self.source: str | None = None
+
+    def feed(self, event: dict) -> bool | None:
+        decision = self._feed(event)
+        if decision is not None:
+            self.source = event.get("type")
+        return decision
+
+    def _feed(self, event: dict) -> bool | None:
+        event_type = event.get("type")
+
+        # Early detection via stream events
+        if event_type == "stream_event":
+            se = event.get("event", {})
+            se_type = se.get("type", "")
+
+            if se_type == "content_block_start":
+                cb = se.get("content_block", {})
+                if cb.get("type") == "tool_use":
+                    tool_name = cb.get("name", "")
+                    if tool_name in ("Skill", "Read"):
+                        self.pending_tool_name = tool_name
+                        self.accumulated_json = ""
+                    else:
+                        return False
+
+            elif se_type == "content_block_delta" and self.pending_tool_name:
+                delta = se.get("delta", {})
+                if delta.get("type") == "input_json_delta":
+                    self.accumulated_json += delta.get("partial_json", "")
+                    if self.clean_name in self.accumulated_json:
+                        return True
+
+            elif se_type in ("content_block_stop", "message_stop"):
+                if self.pending_tool_name:
+                    return self.clean_name in self.accumulated_json
+                if se_type == "message_stop":
+                    return False
+
+        # Fallback: full assistant message
+        elif event_type == "assistant":
+            message = event.get("message", {})
+            for content_item in message.get("content", []):
+                if content_item.get("type") != "tool_use":
+                    continue
+                tool_name = content_item.get("name", "")
+                tool_input = content_item.get("input", {})
+                if tool_name == "Skill" and self.clean_name in tool_input.get("skill", ""):
+                    self.triggered = True
+                elif tool_name == "Read" and self.clean_name in tool_input.get("file_path", ""):
+                    self.triggered = True
+                return self.triggered
+
+        elif event_type == "result":
+            return self.triggered
+
+        return None
+
+
+# Lines detect_trigger decodes: those the detector or the usage meter can use
+RUN_EVENT_PATTERN = type_pattern({*TriggerDetector.EVENT_TYPES, *UsageMeter.EVENT_TYPES})
+
+
+async def detect_trigger(
+    executor: Executor,
+    query: str,
+    skill_description: str,
+    clean_name: str,
+    timeout: int,
+    project_root: str,
+    model: str | None = None,
+    telemetry: dict | None = None,
+) -> bool:
+    """Start one run for an already written command file and detect whether it triggered.
+
+    Parses the stream-json output line by line as it arrives. The run gets an
+    exact deadline of `timeout` seconds from spawn and is stopped as soon as
+    the outcome is known, on timeout, or if the task is cancelled. If given,
+    `telemetry` is filled with the run's timings and outcome (see
+    scripts/telemetry.py) and the token usage and cost observed before the
+    run was stopped (see scripts/usage.py).
+    """
+    run = telemetry if telemetry is not None else {}
+    loop = asyncio.get_running_loop()
+    run["started_at"] = loop.time()
+    run["exit_reason"] = "error"
+    stream = None
+    meter = UsageMeter()
+    try:
+        stream = await executor.start(query, skill_description, clean_name, project_root, model)
+        spawned = loop.time()
+        run["spawn_s"] = spawned - run["started_at"]
+        detector = TriggerDetector(clean_name)
+        decoder = JsonlDecoder()
+        deadline = spawned + timeout
+
+        def finish(triggered: bool, source: str | None, exit_reason: str) -> bool:
+            run["decision_s"] = loop.time() - spawned
+            run["source"] = source
+            run["exit_reason"] = exit_reason
+            run["triggered"] = triggered
+            return triggered
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return finish(detector.triggered, "timeout", "timeout")
+            try:
+                chunk = await asyncio.wait_for(stream.read(STREAM_CHUNK_SIZE), remaining)
+            except asyncio.TimeoutError:
+                return finish(detector.triggered, "timeout", "timeout")
+            if not chunk:
+                # EOF: a final line may lack its trailing newline
+                rest = decoder.flush()
+                event = parse_event(rest, RUN_EVENT_PATTERN)
+                if event:
+                    meter.feed(event)
+                decision = detector.feed(event) if event else None
+                if decision is None:
+                    return finish(detector.triggered, "eof", "eof")
+                return finish(decision, detector.source, result_failure(event, rest) or "eof")
+
+            for line in decoder.feed(chunk):
+                if "first_event_s" not in run:
+                    run["first_event_s"] = loop.time() - spawned
+                event = parse_event(line, RUN_EVENT_PATTERN)
+                if event is None:
+                    continue
+                meter.feed(event)
+                decision = detector.feed(event)
+                if decision is not None:
+                    return finish(decision, detector.source, result_failure(event, line) or "decided")
+    except asyncio.CancelledError:
+        run["exit_reason"] = "cancelled"
+        raise
+    finally:
+        # Stop the run on any exit path (return, exception, timeout, cancel)
+        if stream is not None:
+            await stream.close()
+            if stream.returncode is not None:
+                run["returncode"] = stream.returncode
+            meter.record(run)
+        run["ended_at"] = loop.time()
+
+
+async def run_single_query_async(
     query: str,
     skill_name: str,
     skill_description: str,
     timeout: int,
     project_root: str,
     model: str | None = None,
+    executor: Executor | None = None,
+    telemetry: dict | None = None,
 ) -> bool:
     """Run a single query and return whether the skill was triggered.
 
     Creates a command file in .claude/commands/ so it appears in Claude's
-    available_skills list, then runs `claude -p` with the raw query.
-    Uses --include-partial-messages to detect triggering early from
-    stream events (content_block_start) rather than waiting for the
-    full assistant message, which only arrives after tool execution.
+    available_skills list, then runs `claude -p` with the raw query (or
+    whatever `executor` provides, see scripts/executors.py). The command file
+    is removed afterwards. run_eval uses per-worker sandboxes instead (see
+    scripts/sandbox.py).
     """
-    unique_id = uuid.uuid4().hex[:8]
-    clean_name = f"{skill_name}-skill-{unique_id}"
-    project_commands_dir = Path(project_root) / ".claude" / "commands"
-    command_file = project_commands_dir / f"{clean_name}.md"
-
+    clean_name, command_file = write_command_file(project_root, skill_name, skill_description)
     try:
-        project_commands_dir.mkdir(parents=True, exist_ok=True)
-        # Use YAML block scalar to avoid breaking on quotes in description
-        indented_desc = "\n  ".join(skill_description.split("\n"))
-        command_content = (
-            f"---\n"
-            f"description: |\n"
-            f"  {indented_desc}\n"
-            f"---\n\n"
-            f"# {skill_name}\n\n"
-            f"This skill handles: {skill_description}\n"
-        )
-        command_file.write_text(command_content)
-
-        cmd = [
-            "claude",
-            "-p", query,
-            "--output-format", "stream-json",
-            "--verbose",
-            "--include-partial-messages",
-        ]
-        if model:
-            cmd.extend(["--model", model])
-
-        # Remove CLAUDECODE env var to allow nesting claude -p inside a
-        # Claude Code session. The guard is for interactive terminal conflicts;
-        # programmatic subprocess usage is safe.
-        env = {k: v for k, v in os.environ.items() if k != "CLAUDECODE"}
-
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            cwd=project_root,
-            env=env,
+        return await detect_trigger(
+            executor or ClaudeExecutor(), query, skill_description, clean_name, timeout, project_root, model, telemetry
         )
+    finally:
+        command_file.unlink(missing_ok=True)
 
-        triggered = False
-        start_time = time.time()
-        buffer = ""
-        # Track state for stream event detection
-        pending_tool_name = None
-        accumulated_json = ""
 
-        try:
-            while time.time() - start_time < timeout:
-                if process.poll() is not None:
-                    remaining = process.stdout.read()
-                    if remaining:
-                        buffer += remaining.decode("utf-8", errors="replace")
-                    break
+def run_single_query(
+    query: str,
+    skill_name: str,
+    skill_description: str,
+    timeout: int,
+    project_root: str,
+    model: str | None = None,
+    executor: Executor | None = None,
+) -> bool:
+    """Synchronous wrapper around run_single_query_async."""
+    return asyncio.run(
+        run_single_query_async(query, skill_name, skill_description, timeout, project_root, model, executor)
+    )
 
-                ready, _, _ = select.select([process.stdout], [], [], 1.0)
-                if not ready:
-                    continue
 
-                chunk = os.read(process.stdout.fileno(), 8192)
-                if not chunk:
-                    break
-                buffer += chunk.decode("utf-8", errors="replace")
-
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    try:
-                        event = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-
-                    # Early detection via stream events
-                    if event.get("type") == "stream_event":
-                        se = event.get("event", {})
-                        se_type = se.get("type", "")
-
-                        if se_type == "content_block_start":
-                            cb = se.get("content_block", {})
-                            if cb.get("type") == "tool_use":
-                                tool_name = cb.get("name", "")
-                                if tool_name in ("Skill", "Read"):
-                                    pending_tool_name = tool_name
-                                    accumulated_json = ""
-                                else:
-                                    return False
-
-                        elif se_type == "content_block_delta" and pending_tool_name:
-                            delta = se.get("delta", {})
-                            if delta.get("type") == "input_json_delta":
-                                accumulated_json += delta.get("partial_json", "")
-                                if clean_name in accumulated_json:
-                                    return True
-
-                        elif se_type in ("content_block_stop", "message_stop"):
-                            if pending_tool_name:
-                                return clean_name in accumulated_json
-                            if se_type == "message_stop":
-                                return False
-
-                    # Fallback: full assistant message
-                    elif event.get("type") == "assistant":
-                        message = event.get("message", {})
-                        for content_item in message.get("content", []):
-                            if content_item.get("type") != "tool_use":
-                                continue
-                            tool_name = content_item.get("name", "")
-                            tool_input = content_item.get("input", {})
-                            if tool_name == "Skill" and clean_name in tool_input.get("skill", ""):
-                                triggered = True
-                            elif tool_name == "Read" and clean_name in tool_input.get("file_path", ""):
-                                triggered = True
-                            return triggered
-
-                    elif event.get("type") == "result":
-                        return triggered
-        finally:
-            # Clean up process on any exit path (return, exception, timeout)
-            if process.poll() is None:
-                process.kill()
-                process.wait()
+async def run_remote(
+    runner: RemoteRunner,
+    query: str,
+    skill_name: str,
+    skill_description: str,
+    timeout: int,
+    model: str | None = None,
+    telemetry: dict | None = None,
+) -> bool:
+    """Run one query on a `run_eval worker` through the work queue.
 
-        return triggered
+    Fills `telemetry` like detect_trigger: durations come from the worker,
+    started_at/ended_at are when the job was enqueued and its result read.
+    """
+    run = telemetry if telemetry is not None else {}
+    loop = asyncio.get_running_loop()
+    run["started_at"] = loop.time()
+    run["exit_reason"] = "error"
+    try:
+        record = await runner.run({
+            "query": query,
+            "skill_name": skill_name,
+            "description": skill_description,
+            "timeout": timeout,
+            "model": model,
+        })
+    except asyncio.CancelledError:
+        run["exit_reason"] = "cancelled"
+        raise
     finally:
-        if command_file.exists():
-            command_file.unlink()
+        run["ended_at"] = loop.time()
+    run.update({k: record[k] for k in REMOTE_RUN_FIELDS if k in record})
+    run["remote_worker"] = record.get("worker")
+    return bool(record.get("triggered"))
 
 
-def run_eval(
+def make_controller(
+    num_workers: int, adaptive_workers: bool = False, max_workers: int | None = None
+) -> ConcurrencyController:
+    return ConcurrencyController(
+        num_workers,
+        max_limit=(max_workers or DEFAULT_MAX_WORKERS) if adaptive_workers else num_workers,
+        adaptive=adaptive_workers,
+    )
+
+
+async def run_eval_async(
     eval_set: list[dict],
     skill_name: str,
     description: str,
@@ -191,72 +353,632 @@ def run_eval(
     runs_per_query: int = 1,
     trigger_threshold: float = 0.5,
     model: str | None = None,
+    cache_dir: Path | None = None,
+    adaptive: bool = False,
+    confidence: float | None = None,
+    executor: Executor | None = None,
+    isolate: bool = True,
+    trace_path: Path | None = None,
+    adaptive_workers: bool = False,
+    max_workers: int | None = None,
+    on_outcome: Callable[[dict], bool] | None = None,
+    on_run: Callable[[dict], None] | None = None,
+    queue: Path | None = None,
+    schedule: str = "makespan",
+    stats: QueryStats | None = None,
+    controller: ConcurrencyController | None = None,
+    sandboxes: SandboxPool | None = None,
 ) -> dict:
-    """Run the full eval set and return results."""
+    """Async implementation of run_eval; see run_eval for the parameters.
+
+    A single event loop drives every `claude -p` child; a ConcurrencyController
+    bounds how many run at once, each in its own sandbox project root when
+    isolate is set. Concurrent calls can share one controller and sandbox
+    pool (see run_evals_async); a shared pool is left open for its owner.
+    """
     results = []
+    cache = TriggerCache(cache_dir) if cache_dir else None
+    cache_hits = 0
+    launched = 0
+    cancelled = 0
 
-    with ProcessPoolExecutor(max_workers=num_workers) as executor:
-        future_to_info = {}
-        for item in eval_set:
-            for run_idx in range(runs_per_query):
-                future = executor.submit(
-                    run_single_query,
-                    item["query"],
-                    skill_name,
-                    description,
-                    timeout,
-                    str(project_root),
-                    model,
-                )
-                future_to_info[future] = (item, run_idx)
-
-        query_triggers: dict[str, list[bool]] = {}
-        query_items: dict[str, dict] = {}
-        for future in as_completed(future_to_info):
-            item, _ = future_to_info[future]
-            query = item["query"]
-            query_items[query] = item
-            if query not in query_triggers:
-                query_triggers[query] = []
-            try:
-                query_triggers[query].append(future.result())
-            except Exception as e:
-                print(f"Warning: query failed: {e}", file=sys.stderr)
-                query_triggers[query].append(False)
+    retried = 0
 
-    for query, triggers in query_triggers.items():
+    query_triggers: dict[str, list[bool]] = {}
+    query_failures: dict[str, Counter] = {}
+    query_items: dict[str, dict] = {}
+    for item in eval_set:
+        query_items[item["query"]] = item
+        query_triggers.setdefault(item["query"], [])
+        query_failures.setdefault(item["query"], Counter())
+    attempts: Counter = Counter()
+    # Run indices still to launch per query, in order
+    todo = {query: list(range(runs_per_query)) for query in query_items}
+
+    def settled(query: str) -> bool:
+        triggers = query_triggers[query]
+        return is_settled(sum(triggers), len(triggers), runs_per_query, trigger_threshold, confidence)
+
+    def query_result(query: str) -> dict:
+        """A query's outcome so far.
+
+        With no completed runs (every run timed out or errored) there is no
+        evidence either way: the query is undetermined, with trigger_rate None
+        and pass False, and counts as neither passed nor failed.
+        """
+        triggers = query_triggers[query]
         item = query_items[query]
-        trigger_rate = sum(triggers) / len(triggers)
         should_trigger = item["should_trigger"]
-        if should_trigger:
+        if not triggers:
+            trigger_rate = None
+            did_pass = False
+        elif should_trigger:
+            trigger_rate = sum(triggers) / len(triggers)
             did_pass = trigger_rate >= trigger_threshold
         else:
+            trigger_rate = sum(triggers) / len(triggers)
             did_pass = trigger_rate < trigger_threshold
-        results.append({
+        return {
             "query": query,
             "should_trigger": should_trigger,
             "trigger_rate": trigger_rate,
             "triggers": sum(triggers),
             "runs": len(triggers),
+            "timeouts": query_failures[query]["timeout"],
+            "errors": query_failures[query]["error"] + query_failures[query]["throttled"],
             "pass": did_pass,
-        })
+            "undetermined": not triggers,
+        }
+
+    # Pass/fail of every query whose outcome can no longer change
+    decided: dict[str, bool] = {}
+
+    def decide(query: str) -> bool:
+        """Record query's outcome once final; return True if on_outcome asks to abort."""
+        if query in decided:
+            return False
+        triggers = query_triggers[query]
+        finished = not todo[query] and not pending_by_query[query]
+        if adaptive:
+            final = finished or settled(query)
+        else:
+            # Remaining runs can still shift the rate, but not across the threshold
+            final = finished or is_settled(sum(triggers), len(triggers), runs_per_query, trigger_threshold)
+        if not final:
+            return False
+        result = query_result(query)
+        decided[query] = result["pass"]
+        return on_outcome is not None and bool(on_outcome(result))
+
+    executor = executor or ClaudeExecutor()
+    controller = controller or make_controller(num_workers, adaptive_workers, max_workers)
+    remote = RemoteRunner(WorkQueue(queue)) if queue else None
+    owns_sandboxes = sandboxes is None
+    if owns_sandboxes and isolate and not remote:
+        sandboxes = SandboxPool(project_root, skill_name, controller.max_limit)
+    free_slots = list(range(controller.max_limit, 0, -1))
+    task_to_info: dict[asyncio.Task, tuple[str, int, dict]] = {}
+    pending_by_query: dict[str, set[asyncio.Task]] = {query: set() for query in query_items}
+    runs: list[dict] = []
+    loop = asyncio.get_running_loop()
+    batch_start = loop.time()
+    stats = stats if stats is not None else QueryStats()
+    stats_keys = {query: query_key(query, model) for query in query_items}
+
+    async def run_limited(query: str, run: dict, priority: float) -> bool:
+        await controller.acquire(priority)
+        try:
+            if remote or sandboxes is None:
+                run["worker"] = slot = free_slots.pop()
+                try:
+                    if remote:
+                        return await run_remote(remote, query, skill_name, description, timeout, model, run)
+                    return await run_single_query_async(
+                        query, skill_name, description, timeout, str(project_root), model, executor, run
+                    )
+                finally:
+                    free_slots.append(slot)
+            sandbox = await sandboxes.acquire()
+            try:
+                run["worker"] = sandbox.index
+                sandbox.prepare(description)
+                return await detect_trigger(
+                    executor, query, description, sandbox.clean_name, timeout, str(sandbox.root), model, run
+                )
+            finally:
+                sandboxes.release(sandbox)
+        finally:
+            controller.release(run)
+
+    def submit(query: str, count: int) -> None:
+        nonlocal launched
+        for _ in range(count):
+            if not todo[query]:
+                return
+            run_idx = todo[query].pop(0)
+            run = {"query": query, "run_idx": run_idx, "queued_at": loop.time()}
+            runs.append(run)
+            triggers = query_triggers[query]
+            task = asyncio.create_task(run_limited(query, run, scheduler.priority(query, sum(triggers), len(triggers))))
+            task_to_info[task] = (query, run_idx, run)
+            pending_by_query[query].add(task)
+            launched += 1
+
+    in_flight: set[asyncio.Task] = set()
+    aborted = False
+    try:
+        if cache:
+            version = await executor.version()
+            # Queue workers apply their own isolation, as requested by `isolate`
+            isolated = isolate if remote else sandboxes is not None
+            keys = {
+                (query, run_idx): run_key(skill_name, description, query, model, run_idx, version, isolated)
+                for query in query_items
+                for run_idx in range(runs_per_query)
+            }
+            cached = cache.get_many(list(keys.values()))
+            for query in query_items:
+                remaining = []
+                for run_idx in todo[query]:
+                    key = keys[(query, run_idx)]
+                    # Adaptive sampling only reuses a leading run of cached
+                    # indices, so it extends the same sequence on later calls
+                    reusable = key in cached and (not adaptive or not (remaining or settled(query)))
+                    if reusable:
+                        query_triggers[query].append(cached[key])
+                        cache_hits += 1
+                    else:
+                        remaining.append(run_idx)
+                todo[query] = remaining
+                if on_run and query_triggers[query]:
+                    on_run(query_result(query))
+
+        if cache:
+            stats.load(cache, list(stats_keys.values()))
+        wave = first_wave_size(runs_per_query, trigger_threshold, confidence) if adaptive else runs_per_query
+        scheduler = RunScheduler(schedule, stats, stats_keys, runs_per_query, trigger_threshold, adaptive, wave)
+        # Runs created first take free slots first; the rest wait in priority order
+        for query in scheduler.order(list(query_items)):
+            if adaptive and settled(query):
+                continue
+            submit(query, max(1, wave - len(query_triggers[query])))
+
+        in_flight = set(task_to_info)
+        aborted = any(decide(query) for query in query_items)
+        while in_flight and not aborted:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            # Drop every finished task first, so re-adding a query's pending
+            # tasks below never re-adds a sibling that finished in this batch
+            for task in done:
+                pending_by_query[task_to_info[task][0]].discard(task)
+            for task in done:
+                query, run_idx, run = task_to_info[task]
+                if task.cancelled():
+                    continue
+                try:
+                    triggered = task.result()
+                except Exception as e:
+                    print(f"Warning: query failed: {e}", file=sys.stderr)
+                    run["exit_reason"] = "error"
+                    triggered = False
+
+                # Timeouts and errors say nothing about triggering: keep them
+                # out of the trigger rate (and the cache), and retry the run
+                failure = run_failure(run)
+                if failure in (None, "timeout"):
+                    # A timeout is how long the query runs, as far as scheduling goes
+                    stats.update(stats_keys[query], run["ended_at"] - run["started_at"], None if failure else triggered)
+                if failure:
+                    query_failures[query][failure] += 1
+                    if attempts[(query, run_idx)] < RUN_RETRIES:
+                        attempts[(query, run_idx)] += 1
+                        todo[query].insert(0, run_idx)
+                        retried += 1
+                        if not adaptive:
+                            submit(query, 1)
+                else:
+                    query_triggers[query].append(triggered)
+                    if cache:
+                        cache.put(keys[(query, run_idx)], triggered)
+                if on_run:
+                    on_run(query_result(query))
+
+                if adaptive:
+                    if settled(query):
+                        # Cancelling a running task kills its claude -p child
+                        for pending in list(pending_by_query[query]):
+                            if pending.cancel():
+                                cancelled += 1
+                    elif not pending_by_query[query]:
+                        submit(query, 1)
+                in_flight |= pending_by_query[query]
+                if decide(query):
+                    # The finally block below cancels everything still in flight
+                    aborted = True
+                    break
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        if cache:
+            stats.save(cache)
+            cache.close()
+        if sandboxes and owns_sandboxes:
+            sandboxes.close()
+        if remote:
+            await remote.close()
+            remote.queue.close()
+
+    wall = loop.time() - batch_start
+    if trace_path:
+        write_chrome_trace(trace_path, runs, batch_start)
+    runs_by_query: dict[str, list[dict]] = {}
+    for run in runs:
+        runs_by_query.setdefault(run["query"], []).append(run)
+
+    for query in query_items:
+        if aborted and query not in decided:
+            continue
+        query_runs = runs_by_query.get(query, [])
+        results.append({**query_result(query), "latency": query_latency(query_runs), "usage": run_usage(query_runs)})
 
     passed = sum(1 for r in results if r["pass"])
+    undetermined = sum(1 for r in results if r["undetermined"])
     total = len(results)
 
     return {
         "skill_name": skill_name,
         "description": description,
         "results": results,
+        "aborted": aborted,
         "summary": {
             "total": total,
             "passed": passed,
-            "failed": total - passed,
+            "failed": total - passed - undetermined,
+            "undetermined": undetermined,
+        },
+        "cache": {
+            "enabled": cache is not None,
+            "hits": cache_hits,
+            "launched": launched,
+        },
+        "sampling": {
+            "mode": "adaptive" if adaptive else "fixed",
+            "confidence": confidence,
+            "runs_budget": runs_per_query * total,
+            "runs_spent": sum(r["runs"] for r in results),
+            "runs_cancelled": cancelled,
         },
+        "failures": {
+            **{kind: sum(failures[kind] for failures in query_failures.values()) for kind in FAILURE_KINDS},
+            "retried": retried,
+        },
+        "telemetry": {
+            **summarize_runs(runs, wall, controller.mean_limit()),
+            "schedule": schedule,
+            "concurrency": controller.summary(),
+        },
+        # Every launched run, including those of queries left out of an aborted batch
+        "usage": run_usage(runs),
     }
 
 
+def run_eval(
+    eval_set: list[dict],
+    skill_name: str,
+    description: str,
+    num_workers: int,
+    timeout: int,
+    project_root: Path,
+    runs_per_query: int = 1,
+    trigger_threshold: float = 0.5,
+    model: str | None = None,
+    cache_dir: Path | None = None,
+    adaptive: bool = False,
+    confidence: float | None = None,
+    executor: Executor | None = None,
+    isolate: bool = True,
+    trace_path: Path | None = None,
+    adaptive_workers: bool = False,
+    max_workers: int | None = None,
+    on_outcome: Callable[[dict], bool] | None = None,
+    on_run: Callable[[dict], None] | None = None,
+    queue: Path | None = None,
+    schedule: str = "makespan",
+    stats: QueryStats | None = None,
+) -> dict:
+    """Run the full eval set and return results.
+
+    Returns {"description", "results", "summary", "cache", "sampling",
+    "telemetry", "usage"}: one result per query (trigger counts and rate,
+    pass, timeouts, errors, latency and usage) and batch totals, plus
+    "aborted" when on_outcome stopped the batch early.
+
+    cache_dir reuses recorded runs (scripts/eval_cache.py). adaptive stops
+    sampling a query once it is settled, making runs_per_query an upper
+    bound (scripts/sampling.py). executor picks where run output comes from
+    (scripts/executors.py); isolate gives each worker its own project root
+    (scripts/sandbox.py). adaptive_workers lets num_workers grow up to
+    max_workers (scripts/concurrency.py). trace_path writes a Chrome trace
+    (scripts/telemetry.py). queue hands runs to `run_eval worker` processes
+    (scripts/work_queue.py), and schedule orders them using stats
+    (scripts/scheduling.py).
+
+    on_outcome(result) is called once per query when its outcome can no
+    longer change; returning True cancels the rest of the batch. on_run(result)
+    is called with a query's running tally after each of its runs.
+    """
+    return asyncio.run(
+        run_eval_async(
+            eval_set=eval_set,
+            skill_name=skill_name,
+            description=description,
+            num_workers=num_workers,
+            timeout=timeout,
+            project_root=project_root,
+            runs_per_query=runs_per_query,
+            trigger_threshold=trigger_threshold,
+            model=model,
+            cache_dir=cache_dir,
+            adaptive=adaptive,
+            confidence=confidence,
+            executor=executor,
+            isolate=isolate,
+            trace_path=trace_path,
+            adaptive_workers=adaptive_workers,
+            max_workers=max_workers,
+            on_outcome=on_outcome,
+            on_run=on_run,
+            queue=queue,
+            schedule=schedule,
+            stats=stats,
+        )
+    )
+
+
+async def run_evals_async(
+    descriptions: list[str],
+    eval_set: list[dict],
+    skill_name: str,
+    num_workers: int,
+    timeout: int,
+    project_root: Path,
+    runs_per_query: int = 1,
+    trigger_threshold: float = 0.5,
+    model: str | None = None,
+    cache_dir: Path | None = None,
+    adaptive: bool = False,
+    confidence: float | None = None,
+    executor: Executor | None = None,
+    isolate: bool = True,
+    adaptive_workers: bool = False,
+    max_workers: int | None = None,
+    on_run: Callable[[int, dict], None] | None = None,
+    queue: Path | None = None,
+    schedule: str = "makespan",
+    stats: QueryStats | None = None,
+) -> list[dict]:
+    """Evaluate several descriptions in one batch; see run_evals."""
+    stats = stats if stats is not None else QueryStats()
+    controller = make_controller(num_workers, adaptive_workers, max_workers)
+    sandboxes = SandboxPool(project_root, skill_name, controller.max_limit) if isolate and not queue else None
+    try:
+        return await asyncio.gather(*(
+            run_eval_async(
+                eval_set=eval_set,
+                skill_name=skill_name,
+                description=description,
+                num_workers=num_workers,
+                timeout=timeout,
+                project_root=project_root,
+                runs_per_query=runs_per_query,
+                trigger_threshold=trigger_threshold,
+                model=model,
+                cache_dir=cache_dir,
+                adaptive=adaptive,
+                confidence=confidence,
+                executor=executor,
+                isolate=isolate,
+                on_run=partial(on_run, i) if on_run else None,
+                queue=queue,
+                schedule=schedule,
+                stats=stats,
+                controller=controller,
+                sandboxes=sandboxes,
+            )
+            for i, description in enumerate(descriptions)
+        ))
+    finally:
+        if sandboxes:
+            sandboxes.close()
+
+
+def run_evals(
+    descriptions: list[str],
+    eval_set: list[dict],
+    skill_name: str,
+    num_workers: int,
+    timeout: int,
+    project_root: Path,
+    runs_per_query: int = 1,
+    trigger_threshold: float = 0.5,
+    model: str | None = None,
+    cache_dir: Path | None = None,
+    adaptive: bool = False,
+    confidence: float | None = None,
+    executor: Executor | None = None,
+    isolate: bool = True,
+    adaptive_workers: bool = False,
+    max_workers: int | None = None,
+    on_run: Callable[[int, dict], None] | None = None,
+    queue: Path | None = None,
+    schedule: str = "makespan",
+    stats: QueryStats | None = None,
+) -> list[dict]:
+    """Run the eval set against each of several descriptions in one batch.
+
+    Returns one run_eval output per description, in order. All runs share a
+    single concurrency limit (num_workers, or AIMD with adaptive_workers) and
+    sandbox pool, so the batch keeps every worker busy until the last run
+    instead of draining once per description. Each output's telemetry
+    reports the shared limit. on_run(i, result) reports progress as in
+    run_eval, for the i-th description. With queue, runs go through the
+    work queue as in run_eval. schedule orders the runs of all descriptions
+    together, and they share stats.
+    """
+    return asyncio.run(
+        run_evals_async(
+            descriptions=descriptions,
+            eval_set=eval_set,
+            skill_name=skill_name,
+            num_workers=num_workers,
+            timeout=timeout,
+            project_root=project_root,
+            runs_per_query=runs_per_query,
+            trigger_threshold=trigger_threshold,
+            model=model,
+            cache_dir=cache_dir,
+            adaptive=adaptive,
+            confidence=confidence,
+            executor=executor,
+            isolate=isolate,
+            adaptive_workers=adaptive_workers,
+            max_workers=max_workers,
+            on_run=on_run,
+            queue=queue,
+            schedule=schedule,
+            stats=stats,
+        )
+    )
+
+
+async def serve_queue_async(
+    queue_path: Path,
+    project_root: Path,
+    num_workers: int,
+    executor: Executor | None = None,
+    isolate: bool = True,
+    lease_s: float = DEFAULT_LEASE_S,
+    idle_exit: float | None = None,
+    verbose: bool = False,
+) -> dict:
+    """Claim and run jobs from a work queue, num_workers at a time.
+
+    Each run goes through detect_trigger exactly as in a local batch (in a
+    per-slot sandbox with isolate), and its run record is written back as
+    the job's result. The lease is renewed every LEASE_RENEW_S while a run
+    lasts; if that fails the job was cancelled (or given to another worker
+    after this one stalled) and the run is stopped. Returns counts of
+    completed, duplicate and cancelled jobs once the queue has been empty
+    for idle_exit seconds (never, if None).
+    """
+    queue = WorkQueue(queue_path)
+    owner = worker_id()
+    executor = executor or ClaudeExecutor()
+    pools: dict[str, SandboxPool] = {}
+    stats: Counter = Counter()
+    loop = asyncio.get_running_loop()
+    last_active = loop.time()
+
+    async def execute(payload: dict, run: dict) -> bool:
+        if not isolate:
+            return await run_single_query_async(
+                payload["query"], payload["skill_name"], payload["description"], payload["timeout"],
+                str(project_root), payload["model"], executor, run,
+            )
+        skill_name = payload["skill_name"]
+        if skill_name not in pools:
+            pools[skill_name] = SandboxPool(project_root, skill_name, num_workers)
+        sandbox = await pools[skill_name].acquire()
+        try:
+            run["worker"] = sandbox.index
+            sandbox.prepare(payload["description"])
+            return await detect_trigger(
+                executor, payload["query"], payload["description"], sandbox.clean_name,
+                payload["timeout"], str(sandbox.root), payload["model"], run,
+            )
+        finally:
+            pools[skill_name].release(sandbox)
+
+    async def slot() -> None:
+        nonlocal last_active
+        while True:
+            claimed = queue.claim(owner, lease_s)
+            if claimed is None:
+                if idle_exit is not None and loop.time() - last_active > idle_exit:
+                    return
+                await asyncio.sleep(POLL_INTERVAL_S)
+                continue
+            job_id, payload = claimed
+            run: dict = {}
+            task = asyncio.create_task(execute(payload, run))
+            while not task.done():
+                await asyncio.wait({task}, timeout=LEASE_RENEW_S)
+                if not task.done() and not queue.renew(job_id, owner, lease_s):
+                    task.cancel()
+            last_active = loop.time()
+            try:
+                triggered = await task
+            except asyncio.CancelledError:
+                stats["cancelled"] += 1
+                continue
+            except Exception as e:
+                print(f"Warning: query failed: {e}", file=sys.stderr)
+                run["exit_reason"] = "error"
+                triggered = False
+            record = {k: run[k] for k in REMOTE_RUN_FIELDS if k in run}
+            record.update(triggered=triggered, worker=owner)
+            if queue.complete(job_id, record):
+                stats["completed"] += 1
+            else:
+                # Another worker finished it first after this one's lease lapsed
+                stats["duplicate"] += 1
+            if verbose:
+                print(f"[{record['exit_reason']}] triggered={triggered}: {payload['query'][:60]}", file=sys.stderr)
+
+    try:
+        await asyncio.gather(*(slot() for _ in range(num_workers)))
+    finally:
+        for pool in pools.values():
+            pool.close()
+        queue.close()
+    return {"worker": owner, **stats}
+
+
+def worker_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="run_eval worker", description="Run trigger evals enqueued by run_eval --queue")
+    parser.add_argument("--queue", required=True, help="Work queue database shared with the coordinator")
+    parser.add_argument("--num-workers", type=int, default=10, help="Runs to execute at once")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_S, help="Seconds a claimed job stays leased without a renewal before other workers may take it over")
+    parser.add_argument("--idle-exit", type=float, default=None, help="Exit once the queue has been empty for this many seconds (default: run until interrupted)")
+    parser.add_argument("--no-isolate", action="store_true", help="Run every query in the shared project root instead of per-worker sandboxes")
+    parser.add_argument("--record", default=None, help="Save each run's raw stream-json transcript under this directory for later --replay")
+    parser.add_argument("--replay", default=None, help="Replay transcripts recorded with --record instead of running claude")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay timing multiplier (2 = twice as fast, 0 = no delays)")
+    parser.add_argument("--verbose", action="store_true", help="Print each finished run to stderr")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(serve_queue_async(
+        queue_path=Path(args.queue),
+        project_root=find_project_root(),
+        num_workers=args.num_workers,
+        executor=make_executor(
+            record_dir=Path(args.record) if args.record else None,
+            replay_dir=Path(args.replay) if args.replay else None,
+            replay_speed=args.replay_speed,
+        ),
+        isolate=not args.no_isolate,
+        lease_s=args.lease,
+        idle_exit=args.idle_exit,
+        verbose=args.verbose,
+    ))
+    print(json.dumps(stats))
+
+
 def main():
+    if sys.argv[1:2] == ["worker"]:
+        worker_main(sys.argv[2:])
+        return
     parser = argparse.ArgumentParser(description="Run trigger evaluation for a skill description")
     parser.add_argument("--eval-set", required=True, help="Path to eval set JSON file")
     parser.add_argument("--skill-path", required=True, help="Path to skill directory")
@@ -266,6 +988,19 @@ def main():
     parser.add_argument("--runs-per-query", type=int, default=3, help="Number of runs per query")
     parser.add_argument("--trigger-threshold", type=float, default=0.5, help="Trigger rate threshold")
     parser.add_argument("--model", default=None, help="Model to use for claude -p (default: user's configured model)")
+    parser.add_argument("--adaptive", action="store_true", help="Stop sampling each query once its pass/fail outcome is decided (--runs-per-query becomes a cap)")
+    parser.add_argument("--confidence", type=float, default=None, help="With --adaptive, also stop once the Wilson interval at this confidence (e.g. 0.95) clears the threshold")
+    parser.add_argument("--cache-dir", default=None, help=f"Directory for the persistent run cache (default: {default_cache_dir()})")
+    parser.add_argument("--no-cache", action="store_true", help=f"Launch every run instead of reusing cached results (or set {NO_CACHE_ENV}=1)")
+    parser.add_argument("--adaptive-workers", action="store_true", help="Tune concurrency with AIMD, starting from --num-workers")
+    parser.add_argument("--max-workers", type=int, default=None, help=f"Upper bound for --adaptive-workers (default: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--no-isolate", action="store_true", help="Run every query in the shared project root instead of per-worker sandboxes")
+    parser.add_argument("--record", default=None, help="Save each run's raw stream-json transcript under this directory for later --replay")
+    parser.add_argument("--replay", default=None, help="Replay transcripts recorded with --record instead of running claude")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay timing multiplier (2 = twice as fast, 0 = no delays)")
+    parser.add_argument("--trace", default=None, help="Write a Chrome trace (chrome://tracing, Perfetto) of all runs to this path")
+    parser.add_argument("--queue", default=None, help="Enqueue runs in this work queue database for `run_eval worker` processes instead of running them here")
+    parser.add_argument("--schedule", choices=SCHEDULES, default="makespan", help="Order of runs: longest expected first, from per-query duration history (makespan), or eval set order (fifo)")
     parser.add_argument("--verbose", action="store_true", help="Print progress to stderr")
     args = parser.parse_args()
 
@@ -293,13 +1028,39 @@ def main():
         runs_per_query=args.runs_per_query,
         trigger_threshold=args.trigger_threshold,
         model=args.model,
+        cache_dir=resolve_cache_dir(args.cache_dir, args.no_cache),
+        adaptive=args.adaptive,
+        confidence=args.confidence,
+        executor=make_executor(
+            record_dir=Path(args.record) if args.record else None,
+            replay_dir=Path(args.replay) if args.replay else None,
+            replay_speed=args.replay_speed,
+        ),
+        isolate=not args.no_isolate,
+        trace_path=Path(args.trace) if args.trace else None,
+        adaptive_workers=args.adaptive_workers,
+        max_workers=args.max_workers,
+        queue=Path(args.queue) if args.queue else None,
+        schedule=args.schedule,
     )
 
     if args.verbose:
         summary = output["summary"]
-        print(f"Results: {summary['passed']}/{summary['total']} passed", file=sys.stderr)
+        cache_stats = output["cache"]
+        undetermined = f", {summary['undetermined']} undetermined" if summary["undetermined"] else ""
+        print(f"Results: {summary['passed']}/{summary['total']} passed{undetermined}", file=sys.stderr)
+        if cache_stats["enabled"]:
+            print(f"Cache: {cache_stats['hits']} hits, {cache_stats['launched']} runs launched", file=sys.stderr)
+        sampling = output["sampling"]
+        if sampling["mode"] == "adaptive":
+            print(f"Adaptive sampling: {sampling['runs_spent']}/{sampling['runs_budget']} runs spent, {sampling['runs_cancelled']} cancelled", file=sys.stderr)
+        print(format_telemetry(output["telemetry"]), file=sys.stderr)
+        print(f"Usage: {format_usage(output['usage'])}", file=sys.stderr)
+        failures = output["failures"]
+        if any(failures[kind] for kind in FAILURE_KINDS):
+            print(f"Failed runs (excluded from trigger rates): {failures['timeout']} timeouts, {failures['error']} errors, {failures['throttled']} throttled, {failures['retried']} retried", file=sys.stderr)
         for r in output["results"]:
-            status = "PASS" if r["pass"] else "FAIL"
+            status = result_status(r)
             rate_str = f"{r['triggers']}/{r['runs']}"
             print(f"  [{status}] rate={rate_str} expected={r['should_trigger']}: {r['query'][:70]}", file=sys.stderr)
 
@@ -8,22 +8,167 @@ overfitting.
 
 import argparse
 import json
+import os
 import random
 import sys
 import tempfile
 import time
 import webbrowser
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 import anthropic
 
+from scripts.eval_cache import NO_CACHE_ENV, default_cache_dir, resolve_cache_dir
+from scripts.executors import Executor, make_executor
 from scripts.generate_report import generate_html
+from scripts.history_format import compact_output, dumps_output, query_table
 from scripts.improve_description import improve_description
-from scripts.run_eval import find_project_root, run_eval
-from scripts.utils import parse_skill_md
+from scripts.live_dashboard import LiveDashboard
+from scripts.llm_cache import ResponseCache, default_llm_cache_dir
+from scripts.run_eval import find_project_root, run_eval, run_evals
+from scripts.scheduling import SCHEDULES, QueryStats
+from scripts.telemetry import format_telemetry
+from scripts.usage import empty_usage, format_usage, sum_usage, total_tokens
+from scripts.utils import parse_skill_md, result_status
 
 
-def split_eval_set(eval_set: list[dict], holdout: float, seed: int = 42) -> tuple[list[dict], list[dict]]:
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path: Path, state: dict) -> None:
+    """Write state to path atomically: a crash leaves the old or the new file, never half of one."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": CHECKPOINT_VERSION, **state}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: Path) -> dict:
+    state = json.loads(path.read_text())
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {state.get('version')!r} in {path}")
+    return state
+
+
+SPLIT_SEED = 42
+# Past iterations (besides its parent) each beam candidate's improver sees
+BEAM_HISTORY_SAMPLE = 4
+
+
+def history_entry(iteration: int, description: str, output: dict, train_queries: set[str], with_test: bool) -> dict:
+    """One history record from a run_eval output, split back into train/test by query."""
+    train_result_list = [r for r in output["results"] if r["query"] in train_queries]
+    test_result_list = [r for r in output["results"] if r["query"] not in train_queries]
+    train_passed = sum(1 for r in train_result_list if r["pass"])
+    test_passed = sum(1 for r in test_result_list if r["pass"])
+    # Queries none of whose runs completed count as neither passed nor failed
+    train_undetermined = sum(1 for r in train_result_list if r.get("undetermined"))
+    test_undetermined = sum(1 for r in test_result_list if r.get("undetermined"))
+    return {
+        "iteration": iteration,
+        "description": description,
+        "train_passed": train_passed,
+        "train_failed": len(train_result_list) - train_passed - train_undetermined,
+        "train_undetermined": train_undetermined,
+        "train_total": len(train_result_list),
+        "train_results": train_result_list,
+        "test_passed": test_passed if with_test else None,
+        "test_failed": len(test_result_list) - test_passed - test_undetermined if with_test else None,
+        "test_undetermined": test_undetermined if with_test else None,
+        "test_total": len(test_result_list) if with_test else None,
+        "test_results": test_result_list if with_test else None,
+        # For backward compat with report generator
+        "passed": train_passed,
+        "failed": len(train_result_list) - train_passed - train_undetermined,
+        "total": len(train_result_list),
+        "results": train_result_list,
+        "eval_telemetry": output["telemetry"],
+        "usage": output["usage"],
+        "partial": output["aborted"],
+    }
+
+
+def train_results_of(entry: dict) -> dict:
+    """The eval_results shape improve_description expects, from a history record."""
+    return {
+        "results": entry["train_results"],
+        "summary": {
+            "passed": entry["train_passed"],
+            "failed": entry["train_failed"],
+            "undetermined": entry.get("train_undetermined", 0),
+            "total": entry["train_total"],
+        },
+    }
+
+
+def prune_bound(complete: list[dict], keep: int | None) -> int | None:
+    """Most train failures a candidate can have and still rank among the `keep` best by train_passed.
+
+    None (never prune) when keep is None, i.e. when the best description is
+    chosen by a score that train failures do not bound, or when fewer than
+    `keep` iterations are complete.
+    """
+    if keep is None or len(complete) < keep:
+        return None
+    # Queries not passed: failed, or undetermined
+    return sorted(h["train_total"] - h["train_passed"] for h in complete)[keep - 1]
+
+
+def improve_log_name(iteration: int, attempt: int | None = None) -> str:
+    """Transcript file of an iteration's improve_description call (or of a speculative attempt at it)."""
+    if attempt is None:
+        return f"improve_iter_{iteration}.json"
+    return f"improve_iter_{iteration}_spec{attempt}.json"
+
+
+def failed_queries(results: list[dict]) -> set[str]:
+    return {r["query"] for r in results if not r["pass"]}
+
+
+def stage_summary(intervals: dict[str, list[tuple[float, float]]], wall: float) -> dict:
+    """Busy time and utilization of each loop stage, plus how long stages overlapped."""
+
+    def union(spans: list[tuple[float, float]]) -> float:
+        total, end = 0.0, float("-inf")
+        for start, stop in sorted(spans):
+            if stop > end:
+                total += stop - max(start, end)
+                end = stop
+        return total
+
+    summary = {"wall_s": round(wall, 3)}
+    for stage, spans in intervals.items():
+        busy = union(spans)
+        summary[stage] = {
+            "busy_s": round(busy, 3),
+            "calls": len(spans),
+            "utilization": round(busy / wall, 4) if wall > 0 else None,
+        }
+    everything = [span for spans in intervals.values() for span in spans]
+    summary["overlap_s"] = round(max(0.0, sum(summary[stage]["busy_s"] for stage in intervals) - union(everything)), 3)
+    return summary
+
+
+def sample_minibatch(train_set: list[dict], size: int, seed: int) -> list[dict]:
+    """Sample `size` train queries, stratified by should_trigger."""
+    rng = random.Random(seed)
+    trigger = [e for e in train_set if e["should_trigger"]]
+    no_trigger = [e for e in train_set if not e["should_trigger"]]
+    n_trigger = round(size * len(trigger) / len(train_set))
+    # Keep both classes represented when there is room for them
+    n_trigger = min(len(trigger), max(n_trigger, 1 if trigger and size > 1 else 0))
+    n_no_trigger = min(len(no_trigger), size - n_trigger)
+    return rng.sample(trigger, n_trigger) + rng.sample(no_trigger, n_no_trigger)
+
+
+def split_eval_set(eval_set: list[dict], holdout: float, seed: int = SPLIT_SEED) -> tuple[list[dict], list[dict]]:
     """Split eval set into train and test sets, stratified by should_trigger."""
     random.seed(seed)
 
@@ -60,8 +205,97 @@ def run_loop(
     verbose: bool,
     live_report_path: Path | None = None,
     log_dir: Path | None = None,
+    cache_dir: Path | None = None,
+    adaptive: bool = False,
+    confidence: float | None = None,
+    executor: Executor | None = None,
+    isolate: bool = True,
+    trace_dir: Path | None = None,
+    adaptive_workers: bool = False,
+    max_workers: int | None = None,
+    prune: bool = True,
+    checkpoint_path: Path | None = None,
+    resume_state: dict | None = None,
+    defer_holdout: int | None = None,
+    minibatch: int | None = None,
+    beam: int | None = None,
+    beam_width: int = 2,
+    pipeline: float | None = None,
+    llm_cache_dir: Path | None = None,
+    dashboard: LiveDashboard | None = None,
+    queue: Path | None = None,
+    max_tokens: int | None = None,
+    max_cost: float | None = None,
+    schedule: str = "makespan",
 ) -> dict:
-    """Run the eval + improvement loop."""
+    """Run the eval + improvement loop.
+
+    With prune=True, an iteration's eval batch is cancelled as soon as enough
+    of its train queries have definitely failed that it can no longer be
+    chosen: without a test split, once it can no longer beat the best
+    complete iteration's train score; with defer_holdout=K, once it can no
+    longer rank among the K best by train score. When every iteration is
+    scored on the test split, the best is chosen by test score, which train
+    failures do not bound, so nothing is pruned. Such iterations are kept in
+    history with "partial": True and only their decided queries.
+
+    With checkpoint_path, the loop state (split, history, current description,
+    next step) is saved atomically after every eval batch and every
+    improvement; passing a loaded checkpoint as resume_state continues from
+    it. Runs finished before an interruption are reused through the cache.
+
+    With defer_holdout=K, iterations evaluate only the train split; the test
+    split is evaluated once at the end, in a single batch, for the K
+    complete iterations with the best train scores, and the best iteration
+    is chosen among those.
+
+    With minibatch=N, every iteration after the first scores its candidate
+    on a stratified sample of N train queries (seeded per iteration) and
+    only promotes it to a full train evaluation if it beats the best
+    complete iteration on that sample. Unpromoted iterations are kept as
+    "partial" with their mini-batch results; each entry's "minibatch"
+    records both scores.
+
+    With beam=K, each of max_iterations rounds proposes K descriptions with
+    concurrent improve_description calls (parents taken round-robin from
+    the beam_width best so far, each call seeing a different sample of
+    history) and evaluates them all in one run_evals batch. Every candidate
+    gets its own history entry, tagged with its round and parent.
+
+    With pipeline=F (0 < F <= 1), the next improve_description call starts
+    in the background as soon as a fraction F of the train queries is
+    decided, overlapping the rest of the eval batch, and restarts on each
+    later train failure. The newest proposal is kept if no failure was
+    decided after it started; otherwise the improvement is redone from the
+    full results. The output's "stages" reports eval and
+    improvement busy time, utilization and overlap.
+
+    With llm_cache_dir, improve_description responses are replayed from
+    disk for identical requests (see scripts/llm_cache.py).
+
+    With queue, trigger runs are enqueued for `run_eval worker` processes
+    (see scripts/work_queue.py) instead of started locally.
+
+    schedule is passed to run_eval; every batch shares one QueryStats, so
+    each iteration's runs are ordered by the durations and trigger rates seen
+    in the iterations before it (see scripts/scheduling.py).
+
+    With dashboard, progress is streamed to a LiveDashboard as it happens:
+    each query's tally after every run, and each history entry once done.
+
+    Each history entry's "usage" holds the tokens (and, where reported, the
+    cost) its trigger runs consumed, and the output's "usage" the total over
+    every batch of the loop (see scripts/usage.py). With max_tokens or
+    max_cost, no further iteration is started once that total goes over the
+    budget; it is checked after each eval batch, so it can be overshot by at
+    most one batch. A deferred holdout is still scored, so the best
+    description is chosen as usual.
+
+    Returns the output in the original shape, every history entry holding
+    its per-query result dicts ("train_results", "test_results", "results");
+    compact_output() converts it to format 2 (see scripts/history_format.py),
+    which main writes unless --legacy-format is given.
+    """
     project_root = find_project_root()
     name, original_description, content = parse_skill_md(skill_path)
     current_description = description_override or original_description
@@ -76,70 +310,57 @@ def run_loop(
         test_set = []
 
     client = anthropic.Anthropic()
+    llm_cache = ResponseCache(llm_cache_dir) if llm_cache_dir else None
+    workers = num_workers
     history = []
     exit_reason = "unknown"
+    transcripts = []
+    # Token usage and cost of every trigger run so far
+    spent = empty_usage()
+    query_stats = QueryStats()
+    loop_start = time.time()
+    # (start, end) of every eval batch and improve_description call
+    stage_intervals: dict[str, list[tuple[float, float]]] = {"eval": [], "improve": []}
+    improver = ThreadPoolExecutor(max_workers=2) if pipeline else None
+    speculations = {"launched": 0, "hits": 0}
 
-    for iteration in range(1, max_iterations + 1):
-        if verbose:
-            print(f"\n{'='*60}", file=sys.stderr)
-            print(f"Iteration {iteration}/{max_iterations}", file=sys.stderr)
-            print(f"Description: {current_description}", file=sys.stderr)
-            print(f"{'='*60}", file=sys.stderr)
+    def checkpoint(phase: str, next_iteration: int) -> None:
+        """Save the loop state; phase is the next step: "eval", "improve" or "done"."""
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, {
+                "skill_name": name,
+                "seed": SPLIT_SEED,
+                "holdout": holdout,
+                "defer_holdout": defer_holdout,
+                "train_set": train_set,
+                "test_set": test_set,
+                "current_description": current_description,
+                "phase": phase,
+                "next_iteration": next_iteration,
+                "workers": workers,
+                "exit_reason": exit_reason,
+                "history": history,
+                "transcripts": transcripts,
+                "usage": spent,
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            })
 
-        # Evaluate train + test together in one batch for parallelism
-        all_queries = train_set + test_set
-        t0 = time.time()
-        all_results = run_eval(
-            eval_set=all_queries,
-            skill_name=name,
-            description=current_description,
-            num_workers=num_workers,
-            timeout=timeout,
-            project_root=project_root,
-            runs_per_query=runs_per_query,
-            trigger_threshold=trigger_threshold,
-            model=model,
-        )
-        eval_elapsed = time.time() - t0
+    def spend(outputs: list[dict]) -> None:
+        spent.update(sum_usage([spent, *(output["usage"] for output in outputs)]))
 
-        # Split results back into train/test by matching queries
-        train_queries_set = {q["query"] for q in train_set}
-        train_result_list = [r for r in all_results["results"] if r["query"] in train_queries_set]
-        test_result_list = [r for r in all_results["results"] if r["query"] not in train_queries_set]
-
-        train_passed = sum(1 for r in train_result_list if r["pass"])
-        train_total = len(train_result_list)
-        train_summary = {"passed": train_passed, "failed": train_total - train_passed, "total": train_total}
-        train_results = {"results": train_result_list, "summary": train_summary}
-
-        if test_set:
-            test_passed = sum(1 for r in test_result_list if r["pass"])
-            test_total = len(test_result_list)
-            test_summary = {"passed": test_passed, "failed": test_total - test_passed, "total": test_total}
-            test_results = {"results": test_result_list, "summary": test_summary}
-        else:
-            test_results = None
-            test_summary = None
-
-        history.append({
-            "iteration": iteration,
-            "description": current_description,
-            "train_passed": train_summary["passed"],
-            "train_failed": train_summary["failed"],
-            "train_total": train_summary["total"],
-            "train_results": train_results["results"],
-            "test_passed": test_summary["passed"] if test_summary else None,
-            "test_failed": test_summary["failed"] if test_summary else None,
-            "test_total": test_summary["total"] if test_summary else None,
-            "test_results": test_results["results"] if test_results else None,
-            # For backward compat with report generator
-            "passed": train_summary["passed"],
-            "failed": train_summary["failed"],
-            "total": train_summary["total"],
-            "results": train_results["results"],
-        })
+    def over_budget() -> str | None:
+        """The exit reason if the loop has used up its budget, else None."""
+        if max_tokens is not None and total_tokens(spent) > max_tokens:
+            return f"budget ({total_tokens(spent)} tokens > {max_tokens})"
+        if max_cost is not None and spent["cost_usd"] > max_cost:
+            return f"budget (${spent['cost_usd']:.4f} > ${max_cost:.4f})"
+        return None
 
-        # Write live report if path provided
+    def write_live_report(updated: list[dict]) -> None:
+        """Publish new or changed history entries to the live report and dashboard."""
+        if dashboard:
+            for entry in updated:
+                dashboard.row(entry)
         if live_report_path:
             partial_output = {
                 "original_description": original_description,
@@ -149,9 +370,356 @@ def run_loop(
                 "holdout": holdout,
                 "train_size": len(train_set),
                 "test_size": len(test_set),
+                "usage": spent,
                 "history": history,
             }
-            live_report_path.write_text(generate_html(partial_output, auto_refresh=True, skill_name=name))
+            compact = compact_output(partial_output, query_table(train_set, test_set))
+            live_report_path.write_text(generate_html(compact, auto_refresh=True, skill_name=name))
+
+    def track(iteration: int, description: str) -> Callable[[dict], None] | None:
+        """run_eval on_run callback streaming an iteration's query tallies to the dashboard."""
+        if not dashboard:
+            return None
+        dashboard.begin(iteration, description)
+        return partial(dashboard.progress, iteration)
+
+    def improve(
+        iteration: int,
+        train_results: dict,
+        description: str | None = None,
+        past: list[dict] | None = None,
+        attempt: int | None = None,
+    ) -> str:
+        """Propose the next description from an iteration's train results.
+
+        Beam search and speculation pass the description and the slice of
+        history to improve on; by default it is the current description and
+        the whole history. A speculative call passes its attempt number: its
+        transcript is written to improve_iter_<iteration>_spec<attempt>.json
+        and only listed in "transcripts" if the speculation is kept.
+        """
+        if verbose:
+            print(f"\nImproving description...", file=sys.stderr)
+
+        t0 = time.time()
+        # Strip test scores from history so improvement model can't see them
+        blinded_history = [
+            {k: v for k, v in h.items() if not k.startswith("test_")}
+            for h in (history if past is None else past)
+        ]
+        new_description = improve_description(
+            client=client,
+            skill_name=name,
+            skill_content=content,
+            current_description=description or current_description,
+            eval_results=train_results,
+            history=blinded_history,
+            model=model,
+            log_dir=log_dir,
+            iteration=iteration,
+            cache=llm_cache,
+            log_name=improve_log_name(iteration, attempt),
+        )
+        improve_elapsed = time.time() - t0
+        stage_intervals["improve"].append((t0, t0 + improve_elapsed))
+        if log_dir and attempt is None:
+            transcripts.append(str(log_dir / improve_log_name(iteration)))
+
+        if verbose:
+            print(f"Proposed ({improve_elapsed:.1f}s): {new_description}", file=sys.stderr)
+        return new_description
+
+    def beam_search(first_round: int) -> None:
+        """Rounds of `beam` concurrent improvements, evaluated in one shared batch."""
+        nonlocal current_description, exit_reason, workers
+        eval_queries = train_set if defer_holdout else train_set + test_set
+        train_queries_set = {q["query"] for q in train_set}
+        for round_number in range(first_round, max_iterations + 1):
+            if verbose:
+                print(f"\n{'='*60}", file=sys.stderr)
+                print(f"Round {round_number}/{max_iterations}", file=sys.stderr)
+                print(f"{'='*60}", file=sys.stderr)
+
+            next_iteration = history[-1]["iteration"] + 1 if history else 1
+            complete = sorted((h for h in history if not h.get("partial")), key=lambda h: -h["train_passed"])
+            if not complete:
+                candidates = [(current_description, None)]
+            else:
+                parents = complete[:beam_width]
+                with ThreadPoolExecutor(max_workers=beam) as pool:
+                    futures = []
+                    for j in range(beam):
+                        parent = parents[j % len(parents)]
+                        # Each call sees its parent plus its own sample of the rest of history
+                        rng = random.Random(SPLIT_SEED + next_iteration + j)
+                        others = [h for h in history if h is not parent]
+                        past = sorted([parent] + rng.sample(others, min(len(others), BEAM_HISTORY_SAMPLE)), key=lambda h: h["iteration"])
+                        futures.append((pool.submit(improve, next_iteration + j, train_results_of(parent), parent["description"], past), parent))
+                    candidates = [(future.result(), parent["iteration"]) for future, parent in futures]
+                # Identical proposals are evaluated (and recorded) once
+                unique: dict[str, int] = {}
+                for description, parent_iteration in candidates:
+                    unique.setdefault(description, parent_iteration)
+                candidates = list(unique.items())
+
+            trackers = [track(next_iteration + j, description) for j, (description, _) in enumerate(candidates)]
+            t0 = time.time()
+            outputs = run_evals(
+                descriptions=[description for description, _ in candidates],
+                eval_set=eval_queries,
+                skill_name=name,
+                num_workers=workers,
+                timeout=timeout,
+                project_root=project_root,
+                runs_per_query=runs_per_query,
+                trigger_threshold=trigger_threshold,
+                model=model,
+                cache_dir=cache_dir,
+                adaptive=adaptive,
+                confidence=confidence,
+                executor=executor,
+                isolate=isolate,
+                adaptive_workers=adaptive_workers,
+                max_workers=max_workers,
+                queue=queue,
+                schedule=schedule,
+                stats=query_stats,
+                on_run=(lambda j, result: trackers[j](result)) if dashboard else None,
+            )
+            eval_elapsed = time.time() - t0
+            stage_intervals["eval"].append((t0, t0 + eval_elapsed))
+            spend(outputs)
+            if adaptive_workers:
+                workers = outputs[0]["telemetry"]["concurrency"]["final"]
+
+            entries = []
+            for j, ((description, parent_iteration), output) in enumerate(zip(candidates, outputs)):
+                entry = history_entry(next_iteration + j, description, output, train_queries_set, bool(test_set) and not defer_holdout)
+                entry["round"] = round_number
+                entry["parent"] = parent_iteration
+                entries.append(entry)
+            history.extend(entries)
+            leader = max((h for h in history if not h.get("partial")), key=lambda h: h["train_passed"])
+            current_description = leader["description"]
+            write_live_report(entries)
+
+            if verbose:
+                print(f"Evaluated {len(entries)} candidates in {eval_elapsed:.1f}s; {format_telemetry(outputs[0]['telemetry'])}", file=sys.stderr)
+                print(f"Usage so far: {format_usage(spent)}", file=sys.stderr)
+                for entry in entries:
+                    test = f", test {entry['test_passed']}/{entry['test_total']}" if entry["test_passed"] is not None else ""
+                    print(f"  [{entry['iteration']}] train {entry['train_passed']}/{entry['train_total']}{test}: {entry['description'][:80]}", file=sys.stderr)
+
+            perfect = [entry for entry in entries if entry["train_passed"] == entry["train_total"]]
+            if perfect:
+                exit_reason = f"all_passed (iteration {perfect[0]['iteration']})"
+                if verbose:
+                    print(f"\nAll train queries passed on iteration {perfect[0]['iteration']}!", file=sys.stderr)
+                checkpoint("done", round_number + 1)
+                return
+            budget = over_budget()
+            if budget:
+                exit_reason = budget
+                if verbose:
+                    print(f"\nBudget exhausted after round {round_number}: {format_usage(spent)}", file=sys.stderr)
+                checkpoint("done", round_number + 1)
+                return
+            if round_number == max_iterations:
+                exit_reason = f"max_iterations ({max_iterations})"
+                if verbose:
+                    print(f"\nMax rounds reached ({max_iterations}).", file=sys.stderr)
+                checkpoint("done", round_number + 1)
+                return
+            checkpoint("eval", round_number + 1)
+
+    start_iteration = 1
+    if resume_state:
+        train_set, test_set = resume_state["train_set"], resume_state["test_set"]
+        history = resume_state["history"]
+        current_description = resume_state["current_description"]
+        workers = resume_state["workers"]
+        exit_reason = resume_state["exit_reason"]
+        transcripts = resume_state["transcripts"]
+        # Checkpoints from before usage accounting lack the running total
+        spent.update(resume_state.get("usage") or sum_usage(h.get("usage") for h in history))
+        start_iteration = resume_state["next_iteration"]
+        if verbose:
+            print(f"Resuming at iteration {start_iteration} ({resume_state['phase']}), {len(history)} iterations done", file=sys.stderr)
+        if resume_state["phase"] == "done":
+            start_iteration = max_iterations + 1
+        elif resume_state["phase"] == "improve" and start_iteration < max_iterations:
+            # Interrupted between this iteration's eval and its improvement
+            current_description = improve(start_iteration, train_results_of(history[-1]))
+            start_iteration += 1
+            checkpoint("eval", start_iteration)
+        elif resume_state["phase"] == "improve":
+            start_iteration = max_iterations + 1
+        if start_iteration > max_iterations and exit_reason == "unknown":
+            exit_reason = f"max_iterations ({max_iterations})"
+    else:
+        # Resumable (from the cache) even if the first batch is interrupted
+        checkpoint("eval", start_iteration)
+
+    # How many of the best iterations by train score the best description is
+    # chosen from (see prune_bound); None when it is chosen by test score.
+    # Computed from the split actually in use, which a resume restores.
+    if not test_set:
+        selection_width = 1
+    elif defer_holdout:
+        selection_width = defer_holdout
+    else:
+        selection_width = None
+
+    if dashboard:
+        dashboard.start({
+            "skill_name": name,
+            "original_description": original_description,
+            "holdout": holdout,
+            "train_size": len(train_set),
+            "test_size": len(test_set),
+        }, query_table(train_set, test_set))
+        for entry in history:
+            dashboard.row(entry)
+
+    if beam:
+        # Rounds take the place of iterations; the serial loop below is skipped
+        beam_search(start_iteration)
+        start_iteration = max_iterations + 1
+
+    for iteration in range(start_iteration, max_iterations + 1):
+        if verbose:
+            print(f"\n{'='*60}", file=sys.stderr)
+            print(f"Iteration {iteration}/{max_iterations}", file=sys.stderr)
+            print(f"Description: {current_description}", file=sys.stderr)
+            print(f"{'='*60}", file=sys.stderr)
+
+        train_queries_set = {q["query"] for q in train_set}
+        complete = [h for h in history if not h.get("partial")]
+
+        speculative: dict = {}
+
+        def evaluate(queries: list[dict], label: str, max_failures: int | None, speculate: bool = False) -> dict:
+            """run_eval the current description, aborting once more than max_failures train queries fail.
+
+            With speculate, the next improvement starts in the background once
+            the pipeline fraction of train queries is decided, and restarts
+            whenever another train query fails.
+            """
+            nonlocal workers
+            train_failures = 0
+            decided_train: list[dict] = []
+
+            def dominated(result: dict) -> bool:
+                nonlocal train_failures
+                if result["query"] in train_queries_set:
+                    decided_train.append(result)
+                    # An undetermined query is no evidence against the candidate
+                    if not result["pass"] and not result["undetermined"]:
+                        train_failures += 1
+                    # Start the next improvement once enough is decided, and restart
+                    # it on every later failure so the newest one has seen them all
+                    if speculate and len(decided_train) >= pipeline * len(train_set) and (not speculative or not result["pass"]):
+                        if speculative:
+                            speculative["future"].cancel()
+                        snapshot = list(decided_train)
+                        passed = sum(1 for r in snapshot if r["pass"])
+                        undetermined = sum(1 for r in snapshot if r["undetermined"])
+                        summary = {
+                            "passed": passed,
+                            "failed": len(snapshot) - passed - undetermined,
+                            "undetermined": undetermined,
+                            "total": len(snapshot),
+                        }
+                        speculations["launched"] += 1
+                        # Each attempt logs to its own file: a superseded call may still finish later
+                        speculative["attempt"] = speculations["launched"]
+                        speculative["results"] = snapshot
+                        speculative["future"] = improver.submit(
+                            improve, iteration, {"results": snapshot, "summary": summary}, current_description,
+                            list(history), speculative["attempt"],
+                        )
+                        if verbose:
+                            print(f"Speculating: improving from {len(snapshot)}/{len(train_set)} decided train queries", file=sys.stderr)
+                return max_failures is not None and train_failures > max_failures
+
+            t0 = time.time()
+            output = run_eval(
+                eval_set=queries,
+                skill_name=name,
+                description=current_description,
+                num_workers=workers,
+                timeout=timeout,
+                project_root=project_root,
+                runs_per_query=runs_per_query,
+                trigger_threshold=trigger_threshold,
+                model=model,
+                cache_dir=cache_dir,
+                adaptive=adaptive,
+                confidence=confidence,
+                executor=executor,
+                isolate=isolate,
+                trace_path=trace_dir / f"{label}.trace.json" if trace_dir else None,
+                adaptive_workers=adaptive_workers,
+                max_workers=max_workers,
+                queue=queue,
+                schedule=schedule,
+                stats=query_stats,
+                on_outcome=dominated,
+                on_run=track(iteration, current_description),
+            )
+            stage_intervals["eval"].append((t0, time.time()))
+            spend([output])
+            if adaptive_workers:
+                # Start the next batch where this one's controller settled
+                workers = output["telemetry"]["concurrency"]["final"]
+            return output
+
+        t0 = time.time()
+        minibatch_info = None
+        if minibatch and minibatch < len(train_set) and complete:
+            # Score the candidate on a sampled mini-batch first; the incumbent's
+            # score on the same queries is already known from its full run
+            incumbent = max(complete, key=lambda h: h["train_passed"])
+            batch = sample_minibatch(train_set, minibatch, SPLIT_SEED + iteration)
+            batch_queries = {q["query"] for q in batch}
+            incumbent_failed = sum(1 for r in incumbent["train_results"] if r["query"] in batch_queries and not r["pass"])
+            # Beating the incumbent takes fewer queries not passed (none if it has none);
+            # undetermined ones count against promotion, but never abort the screening
+            allowed = max(incumbent_failed, 1) - 1
+            all_results = evaluate(batch, f"iteration-{iteration}-minibatch", allowed if prune else None)
+            minibatch_info = {
+                "passed": all_results["summary"]["passed"],
+                "total": len(batch),
+                "incumbent_iteration": incumbent["iteration"],
+                "incumbent_passed": len(batch) - incumbent_failed,
+                "promoted": not all_results["aborted"] and len(batch) - all_results["summary"]["passed"] <= allowed,
+                "eval_telemetry": all_results["telemetry"],
+                "usage": all_results["usage"],
+            }
+            if verbose:
+                outcome = "promoted to a full train evaluation" if minibatch_info["promoted"] else "not promoted"
+                if all_results["aborted"]:
+                    outcome += " (stopped early)"
+                print(f"Mini-batch: {minibatch_info['passed']}/{len(batch)} vs {minibatch_info['incumbent_passed']}/{len(batch)} for iteration {incumbent['iteration']}, {outcome}", file=sys.stderr)
+        if minibatch_info is None or minibatch_info["promoted"]:
+            # Evaluate train + test together in one batch for parallelism
+            all_queries = train_set if defer_holdout else train_set + test_set
+            bound = prune_bound(complete, selection_width) if prune else None
+            all_results = evaluate(all_queries, f"iteration-{iteration}", bound, speculate=bool(pipeline) and iteration < max_iterations)
+        eval_elapsed = time.time() - t0
+
+        unpromoted = minibatch_info is not None and not minibatch_info["promoted"]
+        entry = history_entry(iteration, current_description, all_results, train_queries_set, bool(test_set) and not defer_holdout and not unpromoted)
+        entry["partial"] = entry["partial"] or unpromoted
+        entry["minibatch"] = minibatch_info
+        if minibatch_info is not None and minibatch_info["promoted"]:
+            # The iteration paid for its mini-batch as well as the full batch
+            entry["usage"] = sum_usage([minibatch_info["usage"], entry["usage"]])
+        history.append(entry)
+        train_results = train_results_of(entry)
+        train_summary = train_results["summary"]
+
+        write_live_report([entry])
 
         if verbose:
             def print_eval_stats(label, results, elapsed):
@@ -169,65 +737,153 @@ def run_loop(
                 accuracy = (tp + tn) / total if total > 0 else 0.0
                 print(f"{label}: {tp+tn}/{total} correct, precision={precision:.0%} recall={recall:.0%} accuracy={accuracy:.0%} ({elapsed:.1f}s)", file=sys.stderr)
                 for r in results:
-                    status = "PASS" if r["pass"] else "FAIL"
+                    status = result_status(r)
                     rate_str = f"{r['triggers']}/{r['runs']}"
                     print(f"  [{status}] rate={rate_str} expected={r['should_trigger']}: {r['query'][:60]}", file=sys.stderr)
 
+            if all_results["aborted"]:
+                print(f"Pruned: {train_summary['failed']} train failures already rule this candidate out; remaining runs cancelled", file=sys.stderr)
+            cache_stats = all_results["cache"]
+            if cache_stats["enabled"]:
+                print(f"Cache: {cache_stats['hits']} hits, {cache_stats['launched']} runs launched", file=sys.stderr)
+            print(format_telemetry(all_results["telemetry"]), file=sys.stderr)
+            print(f"Usage: {format_usage(entry['usage'])} (loop total {total_tokens(spent)} tokens)", file=sys.stderr)
             print_eval_stats("Train", train_results["results"], eval_elapsed)
-            if test_summary:
-                print_eval_stats("Test ", test_results["results"], 0)
+            if entry["test_results"] is not None:
+                print_eval_stats("Test ", entry["test_results"], 0)
 
-        if train_summary["failed"] == 0:
+        if train_summary["passed"] == train_summary["total"]:
             exit_reason = f"all_passed (iteration {iteration})"
             if verbose:
                 print(f"\nAll train queries passed on iteration {iteration}!", file=sys.stderr)
+            checkpoint("done", iteration + 1)
+            break
+
+        budget = over_budget()
+        if budget:
+            exit_reason = budget
+            if verbose:
+                print(f"\nBudget exhausted after iteration {iteration}: {format_usage(spent)}", file=sys.stderr)
+            checkpoint("done", iteration + 1)
             break
 
         if iteration == max_iterations:
             exit_reason = f"max_iterations ({max_iterations})"
             if verbose:
                 print(f"\nMax iterations reached ({max_iterations}).", file=sys.stderr)
+            checkpoint("done", iteration + 1)
             break
 
         # Improve the description based on train results
-        if verbose:
-            print(f"\nImproving description...", file=sys.stderr)
-
-        t0 = time.time()
-        # Strip test scores from history so improvement model can't see them
-        blinded_history = [
-            {k: v for k, v in h.items() if not k.startswith("test_")}
-            for h in history
-        ]
-        new_description = improve_description(
-            client=client,
-            skill_name=name,
-            skill_content=content,
-            current_description=current_description,
-            eval_results=train_results,
-            history=blinded_history,
-            model=model,
-            log_dir=log_dir,
-            iteration=iteration,
-        )
-        improve_elapsed = time.time() - t0
+        checkpoint("improve", iteration)
+        if speculative and failed_queries(speculative["results"]) == failed_queries(train_results["results"]):
+            # The speculative improvement already saw every failure: keep it
+            current_description = speculative["future"].result()
+            speculations["hits"] += 1
+            if log_dir:
+                transcripts.append(str(log_dir / improve_log_name(iteration, speculative["attempt"])))
+            if verbose:
+                print(f"Speculation held: {current_description}", file=sys.stderr)
+        else:
+            if speculative and verbose:
+                print("Speculation missed failures decided later; improving from the full results", file=sys.stderr)
+            current_description = improve(iteration, train_results)
+        checkpoint("eval", iteration + 1)
 
-        if verbose:
-            print(f"Proposed ({improve_elapsed:.1f}s): {new_description}", file=sys.stderr)
+    if defer_holdout and test_set:
+        # Score the holdout only for the best train candidates, in one batch
+        ranked = sorted((h for h in history if not h.get("partial")), key=lambda h: -h["train_passed"])
+        finalists = [h for h in ranked[:defer_holdout] if h["test_passed"] is None]
+        if finalists:
+            descriptions = list(dict.fromkeys(h["description"] for h in finalists))
+            if verbose:
+                print(f"\nEvaluating the holdout for iterations {', '.join(str(h['iteration']) for h in finalists)}...", file=sys.stderr)
+            if dashboard:
+                # Finalists sharing a description share its eval
+                trackers = [[track(h["iteration"], h["description"]) for h in finalists if h["description"] == d] for d in descriptions]
 
-        current_description = new_description
+                def on_run(j: int, result: dict) -> None:
+                    for tracker in trackers[j]:
+                        tracker(result)
+            t0 = time.time()
+            outputs = run_evals(
+                descriptions=descriptions,
+                eval_set=test_set,
+                skill_name=name,
+                num_workers=workers,
+                timeout=timeout,
+                project_root=project_root,
+                runs_per_query=runs_per_query,
+                trigger_threshold=trigger_threshold,
+                model=model,
+                cache_dir=cache_dir,
+                adaptive=adaptive,
+                confidence=confidence,
+                executor=executor,
+                isolate=isolate,
+                adaptive_workers=adaptive_workers,
+                max_workers=max_workers,
+                queue=queue,
+                schedule=schedule,
+                stats=query_stats,
+                on_run=on_run if dashboard else None,
+            )
+            stage_intervals["eval"].append((t0, time.time()))
+            spend(outputs)
+            by_description = dict(zip(descriptions, outputs))
+            for h in finalists:
+                test_output = by_description[h["description"]]
+                h["test_passed"] = test_output["summary"]["passed"]
+                h["test_failed"] = test_output["summary"]["failed"]
+                h["test_undetermined"] = test_output["summary"]["undetermined"]
+                h["test_total"] = test_output["summary"]["total"]
+                h["test_results"] = test_output["results"]
+                h["test_eval_telemetry"] = test_output["telemetry"]
+                # Shared by finalists with the same description; counted once in the loop total
+                h["test_usage"] = test_output["usage"]
+            write_live_report(finalists)
+            if verbose:
+                print(f"Holdout ({time.time() - t0:.1f}s): " + ", ".join(f"iteration {h['iteration']} {h['test_passed']}/{h['test_total']}" for h in finalists), file=sys.stderr)
+            checkpoint("done", history[-1]["iteration"] + 1)
 
-    # Find the best iteration by TEST score (or train if no test set)
+    # Find the best iteration by TEST score (or train if no test set); pruned
+    # iterations were only partially evaluated and cannot be the best, and
+    # with a deferred holdout only the finalists have test scores
+    complete = [h for h in history if not h.get("partial")]
     if test_set:
-        best = max(history, key=lambda h: h["test_passed"] or 0)
+        best = max((h for h in complete if h["test_passed"] is not None), key=lambda h: h["test_passed"])
         best_score = f"{best['test_passed']}/{best['test_total']}"
     else:
-        best = max(history, key=lambda h: h["train_passed"])
+        best = max(complete, key=lambda h: h["train_passed"])
         best_score = f"{best['train_passed']}/{best['train_total']}"
 
+    if improver:
+        # A speculation that was superseded may still be running; don't wait for it
+        improver.shutdown(wait=False, cancel_futures=True)
+    stages = stage_summary(stage_intervals, time.time() - loop_start)
+    if dashboard:
+        dashboard.finish({
+            "exit_reason": exit_reason,
+            "best_description": best["description"],
+            "best_score": best_score,
+            "best_test_score": bool(test_set),
+            "best_iteration": best["iteration"],
+            "iterations_run": len(history),
+            "usage": spent,
+        })
+
     if verbose:
         print(f"\nExit reason: {exit_reason}", file=sys.stderr)
         print(f"Best score: {best_score} (iteration {best['iteration']})", file=sys.stderr)
+        print(
+            f"Stages: eval {stages['eval']['busy_s']}s ({stages['eval']['utilization']:.0%}), "
+            f"improve {stages['improve']['busy_s']}s ({stages['improve']['utilization']:.0%}), "
+            f"overlap {stages['overlap_s']}s of {stages['wall_s']}s wall",
+            file=sys.stderr,
+        )
+        if pipeline:
+            print(f"Speculation: {speculations['hits']}/{speculations['launched']} held", file=sys.stderr)
+        print(f"Usage: {format_usage(spent)}", file=sys.stderr)
 
     return {
         "exit_reason": exit_reason,
@@ -241,6 +897,11 @@ def run_loop(
         "holdout": holdout,
         "train_size": len(train_set),
         "test_size": len(test_set),
+        "deferred_holdout": defer_holdout if test_set else None,
+        "stages": stages,
+        "pipeline": {"fraction": pipeline, **speculations} if pipeline else None,
+        "usage": spent,
+        "budget": {"max_tokens": max_tokens, "max_cost": max_cost} if max_tokens is not None or max_cost is not None else None,
         "history": history,
     }
 
@@ -259,8 +920,40 @@ def main():
     parser.add_argument("--model", required=True, help="Model for improvement")
     parser.add_argument("--verbose", action="store_true", help="Print progress to stderr")
     parser.add_argument("--report", default="auto", help="Generate HTML report at this path (default: 'auto' for temp file, 'none' to disable)")
+    parser.add_argument("--serve", type=int, nargs="?", const=0, default=None, metavar="PORT", help="Follow progress in a live dashboard served on localhost at PORT (default: any free port), updated per run, instead of rewriting the HTML report each iteration")
+    parser.add_argument("--adaptive", action="store_true", help="Stop sampling each query once its pass/fail outcome is decided (--runs-per-query becomes a cap)")
+    parser.add_argument("--confidence", type=float, default=None, help="With --adaptive, also stop once the Wilson interval at this confidence (e.g. 0.95) clears the threshold")
+    parser.add_argument("--cache-dir", default=None, help=f"Directory for the persistent run cache (default: {default_cache_dir()})")
+    parser.add_argument("--no-cache", action="store_true", help=f"Launch every run instead of reusing cached results (or set {NO_CACHE_ENV}=1, which also disables the LLM cache)")
+    parser.add_argument("--llm-cache", action="store_true", help="Store improve_description responses and replay them for identical requests instead of calling the API again")
+    parser.add_argument("--llm-cache-dir", default=None, help=f"Directory of cached improve_description responses for --llm-cache (default: {default_llm_cache_dir()})")
+    parser.add_argument("--no-isolate", action="store_true", help="Run every trigger query in the shared project root instead of per-worker sandboxes")
+    parser.add_argument("--adaptive-workers", action="store_true", help="Tune trigger-eval concurrency with AIMD, starting from --num-workers")
+    parser.add_argument("--max-workers", type=int, default=None, help="Upper bound for --adaptive-workers")
+    parser.add_argument("--beam", type=int, default=None, metavar="K", help="Beam search: propose K candidates per round in parallel and evaluate them in one batch (--max-iterations counts rounds)")
+    parser.add_argument("--beam-width", type=int, default=2, metavar="B", help="With --beam, how many of the best descriptions so far each round improves on")
+    parser.add_argument("--pipeline", type=float, default=None, metavar="F", help="Start the next improvement once this fraction (e.g. 0.7) of train queries is decided, overlapping the rest of the eval")
+    parser.add_argument("--minibatch", type=int, default=None, metavar="N", help="Score each new candidate on N sampled train queries first; evaluate the full train split only if it beats the best so far")
+    parser.add_argument("--defer-holdout", type=int, default=None, metavar="K", help="Evaluate only the train split each iteration; score the test split once at the end for the K best train candidates")
+    parser.add_argument("--no-prune", action="store_true", help="Evaluate every iteration fully, even once its train failures rule it out of the selection (pruning never applies when every iteration is scored on the test split)")
+    parser.add_argument("--queue", default=None, help="Enqueue trigger runs in this work queue database for `run_eval worker` processes instead of running them here")
+    parser.add_argument("--schedule", choices=SCHEDULES, default="makespan", help="Order of runs: longest expected first, from per-query duration history (makespan), or eval set order (fifo)")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Stop starting new iterations once the trigger runs have used this many tokens (input, output and cache)")
+    parser.add_argument("--max-cost", type=float, default=None, metavar="USD", help="Stop starting new iterations once the cost claude reported for the trigger runs exceeds this (only runs that reach their final result event report one)")
+    parser.add_argument("--trace-dir", default=None, help="Write a Chrome trace of each iteration's trigger runs to this directory")
+    parser.add_argument("--record", default=None, help="Save each trigger run's raw stream-json transcript under this directory for later --replay")
+    parser.add_argument("--replay", default=None, help="Replay transcripts recorded with --record instead of running claude for trigger evals")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay timing multiplier (2 = twice as fast, 0 = no delays)")
     parser.add_argument("--results-dir", default=None, help="Save all outputs (results.json, report.html, log.txt) to a timestamped subdirectory here")
+    parser.add_argument("--legacy-format", action="store_true", help="Write results in the original format (per-query result dicts in every iteration) instead of the compact format 2 (see scripts/history_format.py)")
+    parser.add_argument("--resume", default=None, metavar="DIR", help=f"Continue an interrupted loop from DIR/{CHECKPOINT_FILE} (a results directory or the checkpoint directory printed at start); outputs go to DIR")
     args = parser.parse_args()
+    if args.beam and args.minibatch:
+        parser.error("--minibatch cannot be combined with --beam")
+    if args.beam and args.pipeline:
+        parser.error("--pipeline cannot be combined with --beam")
+    if args.pipeline is not None and not 0 < args.pipeline <= 1:
+        parser.error("--pipeline must be in (0, 1]")
 
     eval_set = json.loads(Path(args.eval_set).read_text())
     skill_path = Path(args.skill_path)
@@ -271,6 +964,24 @@ def main():
 
     name, _, _ = parse_skill_md(skill_path)
 
+    resume_state = None
+    if args.resume:
+        checkpoint_file = Path(args.resume) / CHECKPOINT_FILE
+        if not checkpoint_file.exists():
+            print(f"Error: No {CHECKPOINT_FILE} found in {args.resume}", file=sys.stderr)
+            sys.exit(1)
+        resume_state = load_checkpoint(checkpoint_file)
+        checkpoint_queries = {e["query"] for e in resume_state["train_set"] + resume_state["test_set"]}
+        if resume_state["skill_name"] != name or checkpoint_queries != {e["query"] for e in eval_set}:
+            print(f"Error: {checkpoint_file} was written for a different skill or eval set", file=sys.stderr)
+            sys.exit(1)
+        # The split and the selection rule must match the checkpointed history
+        split_options = {"--holdout": ("holdout", args.holdout), "--defer-holdout": ("defer_holdout", args.defer_holdout)}
+        changed = [flag for flag, (key, value) in split_options.items() if resume_state.get(key, value) != value]
+        if changed:
+            print(f"Error: {checkpoint_file} was written with a different {' and '.join(changed)}; resume with the original values", file=sys.stderr)
+            sys.exit(1)
+
     # Set up live report path
     if args.report != "none":
         if args.report == "auto":
@@ -278,14 +989,23 @@ def main():
             live_report_path = Path(tempfile.gettempdir()) / f"skill_description_report_{skill_path.name}_{timestamp}.html"
         else:
             live_report_path = Path(args.report)
-        # Open the report immediately so the user can watch
-        live_report_path.write_text("<html><body><h1>Starting optimization loop...</h1><meta http-equiv='refresh' content='5'></body></html>")
-        webbrowser.open(str(live_report_path))
     else:
         live_report_path = None
 
+    # Open the dashboard or the report immediately so the user can watch
+    dashboard = None
+    if args.serve is not None:
+        dashboard = LiveDashboard(port=args.serve)
+        print(f"Live dashboard: {dashboard.url}", file=sys.stderr)
+        webbrowser.open(dashboard.url)
+    elif live_report_path:
+        live_report_path.write_text("<html><body><h1>Starting optimization loop...</h1><meta http-equiv='refresh' content='5'></body></html>")
+        webbrowser.open(str(live_report_path))
+
     # Determine output directory (create before run_loop so logs can be written)
-    if args.results_dir:
+    if args.resume:
+        results_dir = Path(args.resume)
+    elif args.results_dir:
         timestamp = time.strftime("%Y-%m-%d_%H%M%S")
         results_dir = Path(args.results_dir) / timestamp
         results_dir.mkdir(parents=True, exist_ok=True)
@@ -293,25 +1013,61 @@ def main():
         results_dir = None
 
     log_dir = results_dir / "logs" if results_dir else None
+    if results_dir:
+        checkpoint_dir = results_dir
+    else:
+        checkpoint_dir = Path(tempfile.mkdtemp(prefix=f"skill_description_loop_{skill_path.name}_"))
+    print(f"Checkpointing to {checkpoint_dir} (continue an interrupted loop with --resume {checkpoint_dir})", file=sys.stderr)
 
-    output = run_loop(
-        eval_set=eval_set,
-        skill_path=skill_path,
-        description_override=args.description,
-        num_workers=args.num_workers,
-        timeout=args.timeout,
-        max_iterations=args.max_iterations,
-        runs_per_query=args.runs_per_query,
-        trigger_threshold=args.trigger_threshold,
-        holdout=args.holdout,
-        model=args.model,
-        verbose=args.verbose,
-        live_report_path=live_report_path,
-        log_dir=log_dir,
-    )
+    try:
+        output = run_loop(
+            eval_set=eval_set,
+            skill_path=skill_path,
+            description_override=args.description,
+            num_workers=args.num_workers,
+            timeout=args.timeout,
+            max_iterations=args.max_iterations,
+            runs_per_query=args.runs_per_query,
+            trigger_threshold=args.trigger_threshold,
+            holdout=args.holdout,
+            model=args.model,
+            verbose=args.verbose,
+            live_report_path=None if dashboard else live_report_path,
+            log_dir=log_dir,
+            cache_dir=resolve_cache_dir(args.cache_dir, args.no_cache),
+            adaptive=args.adaptive,
+            confidence=args.confidence,
+            executor=make_executor(
+                record_dir=Path(args.record) if args.record else None,
+                replay_dir=Path(args.replay) if args.replay else None,
+                replay_speed=args.replay_speed,
+            ),
+            isolate=not args.no_isolate,
+            trace_dir=Path(args.trace_dir) if args.trace_dir else None,
+            adaptive_workers=args.adaptive_workers,
+            max_workers=args.max_workers,
+            prune=not args.no_prune,
+            checkpoint_path=checkpoint_dir / CHECKPOINT_FILE,
+            resume_state=resume_state,
+            defer_holdout=args.defer_holdout,
+            minibatch=args.minibatch,
+            beam=args.beam,
+            beam_width=args.beam_width,
+            pipeline=args.pipeline,
+            llm_cache_dir=resolve_cache_dir(args.llm_cache_dir, not args.llm_cache, default_llm_cache_dir()),
+            dashboard=dashboard,
+            queue=Path(args.queue) if args.queue else None,
+            schedule=args.schedule,
+            max_tokens=args.max_tokens,
+            max_cost=args.max_cost,
+        )
+    finally:
+        if dashboard:
+            # Let open pages receive the final events before the server stops
+            dashboard.close()
 
     # Save JSON output
-    json_output = json.dumps(output, indent=2)
+    json_output = json.dumps(output, indent=2) if args.legacy_format else dumps_output(compact_output(output))
     print(json_output)
     if results_dir:
         (results_dir / "results.json").write_text(json_output)
@@ -0,0 +1,64 @@
+"""Sequential stopping rules for per-query trigger sampling.
+
+A query passes or fails on whether its trigger rate clears `trigger_threshold`.
+Instead of always spending `runs_per_query` runs, adaptive sampling stops a
+query as soon as its outcome is decided:
+
+- certain: no result from the remaining runs could flip the outcome
+  (e.g. 2 of 3 runs agreeing at threshold 0.5);
+- settled: with `confidence` set, the Wilson score interval of the observed
+  rate lies entirely on one side of the threshold.
+"""
+
+import math
+from statistics import NormalDist
+
+
+def outcome(triggers: int, runs: int, trigger_threshold: float) -> bool:
+    """Return whether the observed trigger rate clears the threshold."""
+    return runs > 0 and triggers / runs >= trigger_threshold
+
+
+def wilson_interval(triggers: int, runs: int, confidence: float) -> tuple[float, float]:
+    """Two-sided Wilson score interval for a binomial proportion."""
+    if runs == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = triggers / runs
+    denom = 1 + z * z / runs
+    center = (p + z * z / (2 * runs)) / denom
+    half = z * math.sqrt(p * (1 - p) / runs + z * z / (4 * runs * runs)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def is_settled(
+    triggers: int,
+    runs: int,
+    runs_per_query: int,
+    trigger_threshold: float,
+    confidence: float | None = None,
+) -> bool:
+    """Return True once more runs cannot (or are very unlikely to) change the outcome."""
+    if runs >= runs_per_query:
+        return True
+
+    remaining = runs_per_query - runs
+    lowest = triggers / runs_per_query
+    highest = (triggers + remaining) / runs_per_query
+    if (lowest >= trigger_threshold) == (highest >= trigger_threshold):
+        return True
+
+    if confidence is not None and runs > 0:
+        low, high = wilson_interval(triggers, runs, confidence)
+        return low >= trigger_threshold or high < trigger_threshold
+    return False
+
+
+def first_wave_size(runs_per_query: int, trigger_threshold: float, confidence: float | None = None) -> int:
+    """Smallest number of runs that can settle a query if they all agree."""
+    for runs in range(1, runs_per_query + 1):
+        if is_settled(runs, runs, runs_per_query, trigger_threshold, confidence) and is_settled(
+            0, runs, runs_per_query, trigger_threshold, confidence
+        ):
+            return runs
+    return max(1, runs_per_query)
@@ -0,0 +1,114 @@
+"""Per-worker sandbox project roots for trigger evals.
+
+With a shared project root every concurrent `claude -p` sees every other
+run's temporary command in its available skills, which inflates the prompt
+and skews trigger rates. Instead each worker slot gets its own directory
+(on tmpfs when available) holding a single command file that is rewritten
+in place only when the description changes. The real project's .claude
+entries and CLAUDE.md are symlinked in, minus other eval command files, so
+claude still sees the project's own skills and settings.
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+
+# Temporary command files created by run_eval: <skill>-skill-<8 hex chars>.md
+EVAL_COMMAND_RE = re.compile(r".+-skill-[0-9a-f]{8}\.md")
+
+
+def command_file_content(skill_name: str, skill_description: str) -> str:
+    # Use YAML block scalar to avoid breaking on quotes in description
+    indented_desc = "\n  ".join(skill_description.split("\n"))
+    return (
+        f"---\n"
+        f"description: |\n"
+        f"  {indented_desc}\n"
+        f"---\n\n"
+        f"# {skill_name}\n\n"
+        f"This skill handles: {skill_description}\n"
+    )
+
+
+def sandbox_base_dir() -> Path:
+    """Prefer tmpfs (/dev/shm) so command rewrites never touch disk."""
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm
+    return Path(tempfile.gettempdir())
+
+
+class Sandbox:
+    """One worker's project root with a single, reusable command file."""
+
+    def __init__(self, root: Path, project_root: Path, skill_name: str, index: int = 0):
+        self.root = root
+        self.index = index
+        self.skill_name = skill_name
+        self.clean_name = f"{skill_name}-skill-{uuid.uuid4().hex[:8]}"
+        commands_dir = root / ".claude" / "commands"
+        commands_dir.mkdir(parents=True)
+        self.command_file = commands_dir / f"{self.clean_name}.md"
+        self._content: str | None = None
+        self._mirror(project_root)
+
+    def _mirror(self, project_root: Path) -> None:
+        claude_md = project_root / "CLAUDE.md"
+        if claude_md.exists():
+            (self.root / "CLAUDE.md").symlink_to(claude_md.resolve())
+        claude_dir = project_root / ".claude"
+        if not claude_dir.is_dir():
+            return
+        for entry in claude_dir.iterdir():
+            if entry.name != "commands":
+                (self.root / ".claude" / entry.name).symlink_to(entry.resolve())
+        commands_dir = claude_dir / "commands"
+        if commands_dir.is_dir():
+            for entry in commands_dir.iterdir():
+                if not EVAL_COMMAND_RE.fullmatch(entry.name):
+                    (self.root / ".claude" / "commands" / entry.name).symlink_to(entry.resolve())
+
+    def prepare(self, skill_description: str) -> None:
+        """Point the command file at skill_description, rewriting only on change."""
+        content = command_file_content(self.skill_name, skill_description)
+        if content != self._content:
+            self.command_file.write_text(content)
+            self._content = content
+
+
+class SandboxPool:
+    """Hands out at most `size` sandboxes; one is held for the whole of a run.
+
+    Sandboxes are created on first use, so a small eval with many workers only
+    pays for the slots it actually needs. close() removes them all.
+    """
+
+    def __init__(self, project_root: Path, skill_name: str, size: int, base_dir: Path | None = None):
+        self.project_root = Path(project_root)
+        self.skill_name = skill_name
+        self.base = Path(tempfile.mkdtemp(prefix="skill-creator-", dir=base_dir or sandbox_base_dir()))
+        self._idle: list[Sandbox] = []
+        self._created = 0
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def acquire(self) -> Sandbox:
+        await self._semaphore.acquire()
+        if self._idle:
+            return self._idle.pop()
+        self._created += 1
+        try:
+            return Sandbox(self.base / f"worker-{self._created}", self.project_root, self.skill_name, self._created)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self, sandbox: Sandbox) -> None:
+        self._idle.append(sandbox)
+        self._semaphore.release()
+
+    def close(self) -> None:
+        shutil.rmtree(self.base, ignore_errors=True)
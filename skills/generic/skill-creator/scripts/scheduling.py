@@ -0,0 +1,115 @@
+"""Makespan-aware ordering of trigger runs.
+
+In eval-set order, the slow queries (long prompts that run to the timeout)
+often start last, and a batch ends with one or two workers busy while the
+rest sit idle. With the "makespan" schedule, runs instead wait for a
+concurrency slot in priority order (see ConcurrencyController.acquire),
+longest expected remaining work first -- the longest-processing-time rule,
+which keeps that tail short:
+
+- a query's expected run duration is a moving average over its earlier runs
+  (timeouts included), from previous iterations of a loop or, through the
+  run cache, from earlier invocations. Queries with no history get the
+  median of those that have one, longer prompts first;
+- with adaptive sampling, a query's follow-up runs only start once earlier
+  ones finish, so its remaining work is a chain: the run duration times the
+  runs it is still expected to need. Queries whose trigger rate (so far, or
+  in earlier batches) sits near trigger_threshold are the ones that need
+  more runs, so they start early and their follow-ups keep priority.
+
+The "fifo" schedule keeps the eval-set order, for comparison. Telemetry
+reports the makespan and idle worker time of either (see scripts/telemetry.py).
+"""
+
+import statistics
+
+from scripts.eval_cache import TriggerCache
+
+SCHEDULES = ("makespan", "fifo")
+
+# Weight of the newest run in a query's moving averages
+STATS_ALPHA = 0.3
+
+
+def closeness(rate: float | None, trigger_threshold: float) -> float:
+    """1 for a trigger rate at the threshold, falling to 0 at 0 or 1; 0.5 if unknown."""
+    if rate is None:
+        return 0.5
+    return max(0.0, 1 - abs(rate - trigger_threshold) / max(trigger_threshold, 1 - trigger_threshold))
+
+
+class QueryStats:
+    """Moving averages of each query's run duration and trigger outcome, keyed by query_key()."""
+
+    def __init__(self, alpha: float = STATS_ALPHA):
+        self.alpha = alpha
+        self._stats: dict[str, dict] = {}
+        # Keys updated since the last save()
+        self._dirty: set[str] = set()
+
+    def get(self, key: str) -> dict | None:
+        return self._stats.get(key)
+
+    def update(self, key: str, duration_s: float | None, triggered: bool | None) -> None:
+        stats = self._stats.setdefault(key, {"duration_s": None, "trigger_rate": None, "runs": 0})
+        for name, value in (("duration_s", duration_s), ("trigger_rate", None if triggered is None else float(triggered))):
+            if value is not None:
+                old = stats[name]
+                stats[name] = value if old is None else (1 - self.alpha) * old + self.alpha * value
+        stats["runs"] += 1
+        self._dirty.add(key)
+
+    def load(self, cache: TriggerCache, keys: list[str]) -> None:
+        """Fill in statistics stored in the run cache, for keys not already known."""
+        missing = [key for key in keys if key not in self._stats]
+        if missing:
+            self._stats.update(cache.get_stats(missing))
+
+    def save(self, cache: TriggerCache) -> None:
+        if self._dirty:
+            cache.put_stats({key: self._stats[key] for key in self._dirty})
+            self._dirty.clear()
+
+
+class RunScheduler:
+    """Slot priorities for one batch's runs; lower values are served first."""
+
+    def __init__(
+        self,
+        schedule: str,
+        stats: QueryStats,
+        keys: dict[str, str],
+        runs_per_query: int,
+        trigger_threshold: float,
+        adaptive: bool,
+        wave: int,
+    ):
+        self.enabled = schedule == "makespan"
+        self.stats = stats
+        self.keys = keys
+        self.runs_per_query = runs_per_query
+        self.trigger_threshold = trigger_threshold
+        self.adaptive = adaptive
+        self.wave = wave
+        known = [s["duration_s"] for key in keys.values() if (s := stats.get(key)) and s["duration_s"] is not None]
+        self.default_s = statistics.median(known) if known else 1.0
+
+    def order(self, queries: list[str]) -> list[str]:
+        """Queries in the order their first runs should be submitted."""
+        if not self.enabled:
+            return queries
+        return sorted(queries, key=lambda q: (self.priority(q, 0, 0), -len(q)))
+
+    def priority(self, query: str, triggers: int, runs: int) -> float:
+        """Priority of the next run of a query that has `runs` results so far."""
+        if not self.enabled:
+            return 0.0
+        stats = self.stats.get(self.keys[query]) or {}
+        duration = stats.get("duration_s")
+        chain = 1.0
+        if self.adaptive:
+            rate = triggers / runs if runs else stats.get("trigger_rate")
+            # Runs after this one (and after the first wave) only start once it is done
+            follow_ups = max(0, self.runs_per_query - max(runs + 1, self.wave))
+            chain += closeness(rate, self.trigger_threshold) * follow_ups
+        return -(self.default_s if duration is None else duration) * chain
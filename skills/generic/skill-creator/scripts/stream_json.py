@@ -0,0 +1,78 @@
+"""Incremental decoding of `claude -p --output-format stream-json` output.
+
+JsonlDecoder accumulates raw stdout chunks in a single bytearray and yields
+each complete line as a memoryview into it, so a long stream is scanned once
+and never re-copied line by line. parse_event() pairs it with a cheap byte-level
+pre-filter: lines whose event types the caller does not care about (text deltas,
+tool results, system messages) are skipped without being decoded.
+"""
+
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+
+def type_pattern(types: Iterable[str]) -> re.Pattern[bytes]:
+    """Compile a pattern matching lines that carry any of `types` as a "type" value.
+
+    The match is conservative: it can only produce false positives (e.g. a
+    nested content block of that type), never miss a top-level event, because
+    quotes inside JSON strings are always escaped.
+    """
+    alternatives = b"|".join(re.escape(t.encode()) for t in sorted(types))
+    return re.compile(rb'"type"\s*:\s*"(?:' + alternatives + rb')"')
+
+
+def parse_event(line: bytes | bytearray | memoryview, pattern: re.Pattern[bytes] | None = None) -> dict | None:
+    """Decode one stream-json line, or return None if it is filtered out or invalid."""
+    if pattern is not None and pattern.search(line) is None:
+        return None
+    try:
+        event = json.loads(bytes(line) if isinstance(line, memoryview) else line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return event if isinstance(event, dict) else None
+
+
+class JsonlDecoder:
+    """Split a byte stream into lines without quadratic buffering.
+
+    feed() appends a chunk and yields the complete lines it finished, as
+    memoryviews into the internal buffer. A yielded view is only valid until
+    the next line is requested; copy it (bytes(line)) to keep it. Consumed
+    bytes are dropped once per feed() call, after iteration stops.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        # Everything before this offset is known to contain no newline
+        self._scan = 0
+
+    def feed(self, chunk: bytes) -> Iterator[memoryview]:
+        buffer = self._buffer
+        buffer += chunk
+        start = 0
+        line = None
+        view = memoryview(buffer)
+        try:
+            while (end := buffer.find(b"\n", self._scan)) != -1:
+                line = view[start:end]
+                start = self._scan = end + 1
+                yield line
+                line.release()
+            self._scan = len(buffer)
+        finally:
+            # Also reached when the consumer stops early (e.g. a decision was made)
+            if line is not None:
+                line.release()
+            view.release()
+            if start:
+                del buffer[:start]
+                self._scan -= start
+
+    def flush(self) -> bytes:
+        """Return and clear any trailing bytes not terminated by a newline."""
+        rest = bytes(self._buffer)
+        self._buffer.clear()
+        self._scan = 0
+        return rest
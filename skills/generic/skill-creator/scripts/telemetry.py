@@ -0,0 +1,125 @@
+"""Per-run latency telemetry for trigger evals.
+
+detect_trigger fills one record per launched run (times are event-loop
+seconds; durations end in `_s`):
+
+- queued_at / started_at / ended_at: when the run was scheduled, got a
+  worker, and was stopped;
+- spawn_s: time for the executor to start the run (process creation);
+- first_event_s: time from spawn to the first complete stream-json line;
+- decision_s: time from spawn to the trigger decision;
+- source: what decided it -- "stream_event" (early detection), "assistant"
+  (full message fallback), "result", "eof" (output ended undecided) or
+  "timeout";
+- exit_reason: "decided", "eof", "timeout", "cancelled", "error" or
+  "throttled" (an error result that mentions rate limiting or overload);
+- returncode: the process exit status when it exited on its own.
+
+summarize_runs() turns them into batch percentiles, worker utilization,
+throughput and makespan -- from the first run queued to the last one ended,
+with the idle worker time in between, the tail after the last run started,
+and a lower bound a perfect schedule could not beat (see
+scripts/scheduling.py); write_chrome_trace() writes a chrome://tracing / Perfetto file with
+one lane per worker.
+"""
+
+import json
+import math
+from collections import Counter
+from pathlib import Path
+
+
+def percentiles(values: list[float]) -> dict | None:
+    """p50/p90/p99 (nearest rank) of values, rounded to milliseconds."""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(pct: float) -> float:
+        return round(ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)], 3)
+
+    return {"p50": rank(50), "p90": rank(90), "p99": rank(99), "max": round(ordered[-1], 3), "count": len(ordered)}
+
+
+def summarize_runs(runs: list[dict], wall: float, num_workers: float) -> dict:
+    """Aggregate run records from one batch (num_workers may be a time-weighted mean)."""
+    started = [r for r in runs if "started_at" in r and "ended_at" in r]
+    durations = [r["ended_at"] - r["started_at"] for r in started]
+    busy = sum(durations)
+    makespan = None
+    if started:
+        origin = min(r.get("queued_at", r["started_at"]) for r in started)
+        end = max(r["ended_at"] for r in started)
+        makespan = end - origin
+    return {
+        "wall_s": round(wall, 3),
+        "num_workers": round(num_workers, 2),
+        "runs_started": len(started),
+        "runs_per_s": round(len(started) / wall, 3) if wall > 0 else None,
+        "worker_utilization": round(busy / (num_workers * wall), 4) if wall > 0 else None,
+        "makespan_s": round(makespan, 3) if started else None,
+        # Perfectly balanced work, or the longest single run (ignores adaptive sampling's run chains)
+        "makespan_bound_s": round(max(busy / num_workers, max(durations)), 3) if started else None,
+        "idle_worker_s": round(max(0.0, num_workers * makespan - busy), 3) if started else None,
+        # From the last run's start (nothing left waiting) to the end: workers draining
+        "tail_s": round(end - max(r["started_at"] for r in started), 3) if started else None,
+        "queue_s": percentiles([r["started_at"] - r["queued_at"] for r in started if "queued_at" in r]),
+        "spawn_s": percentiles([r["spawn_s"] for r in started if "spawn_s" in r]),
+        "first_event_s": percentiles([r["first_event_s"] for r in started if "first_event_s" in r]),
+        "decision_s": percentiles([r["decision_s"] for r in started if "decision_s" in r]),
+        "run_s": percentiles([r["ended_at"] - r["started_at"] for r in started]),
+        "sources": dict(Counter(r["source"] for r in started if r.get("source"))),
+        "exit_reasons": dict(Counter(r.get("exit_reason", "cancelled") for r in runs)),
+    }
+
+
+def format_telemetry(summary: dict) -> str:
+    """One-line human summary for --verbose output."""
+    parts = [f"{summary['runs_started']} runs in {summary['wall_s']}s"]
+    if summary["runs_per_s"] is not None:
+        parts.append(f"{summary['runs_per_s']} runs/s")
+    if summary["worker_utilization"] is not None:
+        parts.append(f"utilization {summary['worker_utilization']:.0%} of {summary['num_workers']} workers")
+    if summary["makespan_s"] is not None:
+        parts.append(f"makespan {summary['makespan_s']}s (bound {summary['makespan_bound_s']}s, tail {summary['tail_s']}s, {summary['idle_worker_s']} idle worker-s)")
+    decision = summary["decision_s"]
+    if decision:
+        parts.append(f"decision p50/p90/p99 {decision['p50']}/{decision['p90']}/{decision['p99']}s")
+    if summary["sources"]:
+        parts.append("sources " + ", ".join(f"{k}={v}" for k, v in sorted(summary["sources"].items())))
+    return "Telemetry: " + "; ".join(parts)
+
+
+def query_latency(runs: list[dict]) -> dict | None:
+    """Decision-time percentiles for one query's runs."""
+    return percentiles([r["decision_s"] for r in runs if "decision_s" in r])
+
+
+def write_chrome_trace(path: Path, runs: list[dict], origin: float) -> None:
+    """Write runs as Chrome trace events (one thread per worker slot)."""
+
+    def us(t: float) -> int:
+        return round((t - origin) * 1_000_000)
+
+    events = []
+    for r in runs:
+        if "started_at" not in r or "ended_at" not in r:
+            continue
+        tid = r.get("worker", 0)
+        args = {k: r.get(k) for k in ("query", "run_idx", "triggered", "source", "exit_reason", "returncode")}
+        events.append({
+            "name": r["query"][:60],
+            "cat": r.get("exit_reason", "run"),
+            "ph": "X",
+            "pid": 1,
+            "tid": tid,
+            "ts": us(r["started_at"]),
+            "dur": us(r["ended_at"]) - us(r["started_at"]),
+            "args": args,
+        })
+        spawned = r["started_at"] + r.get("spawn_s", 0)
+        for name, key in (("first event", "first_event_s"), ("decision", "decision_s")):
+            if key in r:
+                events.append({"name": name, "ph": "i", "s": "t", "pid": 1, "tid": tid, "ts": us(spawned + r[key])})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
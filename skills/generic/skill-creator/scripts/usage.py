@@ -0,0 +1,125 @@
+"""Token and cost accounting for trigger runs.
+
+detect_trigger stops a run as soon as its outcome is known, which is usually
+before claude prints the final `result` event carrying the session's `usage`
+and `total_cost_usd`. UsageMeter therefore also reads the per-message usage
+the stream carries along the way: `message_start` (input and cache tokens)
+and `message_delta` (the running output count) stream events, and the usage
+of complete assistant messages. Each API message is counted once, by id; if
+the `result` event does arrive, its totals replace the partial counts.
+
+Token counts are whatever was observed before the run was stopped. Cost is
+only reported by the `result` event, so it is known for a subset of runs;
+every usage summary says how many ("cost_runs") out of how many ("runs").
+"""
+
+from collections.abc import Iterable
+
+from scripts.llm_cache import USAGE_FIELDS
+
+
+def empty_usage() -> dict:
+    return {**dict.fromkeys(USAGE_FIELDS, 0), "cost_usd": 0.0, "cost_runs": 0, "runs": 0}
+
+
+def total_tokens(usage: dict) -> int:
+    return sum(usage.get(name, 0) for name in USAGE_FIELDS)
+
+
+class UsageMeter:
+    """Accumulate one run's token usage and cost from its stream-json events."""
+
+    # Only lines carrying one of these types can contain usage
+    EVENT_TYPES = ("message_start", "message_delta", "assistant", "result")
+
+    def __init__(self):
+        # Highest count seen per field, per API message
+        self._messages: dict[str, dict[str, int]] = {}
+        self._current: str | None = None
+        self._result: dict[str, int] | None = None
+        self.cost_usd: float | None = None
+
+    def feed(self, event: dict) -> None:
+        event_type = event.get("type")
+        if event_type == "stream_event":
+            se = event.get("event") or {}
+            if se.get("type") == "message_start":
+                message = se.get("message") or {}
+                self._current = message.get("id") or f"#{len(self._messages)}"
+                self._add(self._current, message.get("usage"))
+            elif se.get("type") == "message_delta" and self._current:
+                self._add(self._current, se.get("usage"))
+        elif event_type == "assistant":
+            message = event.get("message") or {}
+            self._add(message.get("id") or f"#{len(self._messages)}", message.get("usage"))
+        elif event_type == "result":
+            usage = event.get("usage")
+            if isinstance(usage, dict):
+                self._result = {name: _count(usage.get(name)) for name in USAGE_FIELDS}
+            cost = event.get("total_cost_usd")
+            if isinstance(cost, (int, float)):
+                self.cost_usd = float(cost)
+
+    def _add(self, message_id: str, usage) -> None:
+        if not isinstance(usage, dict):
+            return
+        counts = self._messages.setdefault(message_id, dict.fromkeys(USAGE_FIELDS, 0))
+        for name in USAGE_FIELDS:
+            # message_delta repeats the running total, so keep the largest
+            counts[name] = max(counts[name], _count(usage.get(name)))
+
+    def usage(self) -> dict[str, int]:
+        if self._result is not None:
+            return dict(self._result)
+        totals = dict.fromkeys(USAGE_FIELDS, 0)
+        for counts in self._messages.values():
+            for name in USAGE_FIELDS:
+                totals[name] += counts[name]
+        return totals
+
+    def record(self, run: dict) -> None:
+        """Store the usage (and cost, if known) in a run record."""
+        run["usage"] = self.usage()
+        if self.cost_usd is not None:
+            run["cost_usd"] = self.cost_usd
+
+
+def _count(value) -> int:
+    return value if isinstance(value, int) and value > 0 else 0
+
+
+def run_usage(runs: Iterable[dict]) -> dict:
+    """Usage summary of run records (those without usage, e.g. cached, are skipped)."""
+    totals = empty_usage()
+    for run in runs:
+        if "usage" not in run:
+            continue
+        totals["runs"] += 1
+        for name in USAGE_FIELDS:
+            totals[name] += run["usage"].get(name, 0)
+        if run.get("cost_usd") is not None:
+            totals["cost_usd"] += run["cost_usd"]
+            totals["cost_runs"] += 1
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+    return totals
+
+
+def sum_usage(summaries: Iterable[dict | None]) -> dict:
+    """Combine usage summaries (e.g. the batches of an iteration, or a loop's iterations)."""
+    totals = empty_usage()
+    for summary in summaries:
+        for key in totals:
+            totals[key] += (summary or {}).get(key, 0)
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+    return totals
+
+
+def format_usage(usage: dict) -> str:
+    """One-line human summary for --verbose output."""
+    text = (
+        f"{usage['input_tokens']:,} in / {usage['output_tokens']:,} out / "
+        f"{usage['cache_read_input_tokens']:,} cache read / {usage['cache_creation_input_tokens']:,} cache write tokens"
+    )
+    if usage["cost_runs"]:
+        text += f"; ${usage['cost_usd']:.4f} reported by {usage['cost_runs']} of {usage['runs']} runs"
+    return text
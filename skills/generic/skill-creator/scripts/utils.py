@@ -4,6 +4,13 @@ from pathlib import Path
 
 
 
+def result_status(result: dict) -> str:
+    """PASS / FAIL label of a query result; UNDETERMINED when none of its runs completed."""
+    if result.get("undetermined"):
+        return "UNDETERMINED"
+    return "PASS" if result["pass"] else "FAIL"
+
+
 def parse_skill_md(skill_path: Path) -> tuple[str, str, str]:
     """Parse a SKILL.md file, returning (name, description, full_content)."""
     content = (skill_path / "SKILL.md").read_text()
@@ -0,0 +1,192 @@
+"""SQLite work queue that lets several machines share one run_eval batch.
+
+With `--queue PATH`, run_eval keeps all of its scheduling (adaptive
+sampling, retries, pruning, the run cache, the concurrency limit) but, instead
+of starting each trigger run itself, enqueues it as a job. Any number of
+`python -m scripts.run_eval worker --queue PATH` processes, on this machine or
+others that see the same file, claim jobs, run them with their own executor
+and sandboxes, and write back the run record detect_trigger produced. The
+batch output is the same as for local runs.
+
+Jobs move through queued -> leased -> done. A claim leases a job to one
+worker for `lease_s` seconds; the worker renews the lease while the run
+lasts, so a crashed worker's jobs become claimable again once their lease
+expires. Completing a job is idempotent: the first result written wins and
+later writes (say from a worker whose lease had lapsed) are ignored. The
+coordinator deletes each job once it has read the result (the ack), or as
+soon as it no longer needs the run (adaptive sampling settled the query, or
+the batch was pruned); a worker running a deleted job stops it at its next
+lease renewal.
+
+The queue is one SQLite file using the default rollback journal rather than
+WAL: WAL needs shared memory between the processes on one host, so it breaks
+on the NFS/SMB directories a multi-machine queue lives on. The filesystem
+still needs working POSIX locks (local disk, or a shared mount that
+supports them).
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+
+# A job claimed this many times without a result is failed instead of re-leased
+MAX_ATTEMPTS = 3
+
+DEFAULT_LEASE_S = 30.0
+
+# Seconds between the coordinator's checks for finished jobs
+POLL_INTERVAL_S = 0.05
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class WorkQueue:
+    """Jobs and their results in one SQLite file, safe for concurrent processes."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        # Rollback journal: safe on network filesystems, unlike WAL
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, payload TEXT NOT NULL, state TEXT NOT NULL, "
+            "owner TEXT, lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "result TEXT, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at)")
+
+    def submit(self, payload: dict) -> str:
+        job_id = uuid.uuid4().hex
+        self._conn.execute(
+            "INSERT INTO jobs (id, payload, state, created_at) VALUES (?, ?, 'queued', ?)",
+            (job_id, json.dumps(payload), time.time()),
+        )
+        return job_id
+
+    def claim(self, owner: str, lease_s: float = DEFAULT_LEASE_S) -> tuple[str, dict] | None:
+        """Lease the oldest queued (or lease-expired) job to owner, or return None."""
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can
+        # never both select the same job
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts FROM jobs "
+                    "WHERE state = 'queued' OR (state = 'leased' AND lease_expires < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id, payload, attempts = row
+                if attempts < MAX_ATTEMPTS:
+                    break
+                # Keeps killing its workers: report it as a failed run instead
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'done', result = ? WHERE id = ?",
+                    (json.dumps({"exit_reason": "error", "triggered": False}), job_id),
+                )
+            self._conn.execute(
+                "UPDATE jobs SET state = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (owner, now + lease_s, job_id),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return job_id, json.loads(payload)
+
+    def renew(self, job_id: str, owner: str, lease_s: float = DEFAULT_LEASE_S) -> bool:
+        """Extend owner's lease; False if the job was cancelled, finished or re-leased."""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = 'leased' AND owner = ?",
+            (time.time() + lease_s, job_id, owner),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, result: dict) -> bool:
+        """Record a job's result; only the first result for a job is kept."""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET state = 'done', result = ? WHERE id = ? AND state IN ('queued', 'leased')",
+            (json.dumps(result), job_id),
+        )
+        return cursor.rowcount == 1
+
+    def finished(self, job_ids: list[str]) -> dict[str, dict]:
+        """Results of whichever of job_ids are done."""
+        found: dict[str, dict] = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT id, result FROM jobs WHERE state = 'done' AND id IN ({placeholders})", chunk
+            )
+            found.update((job_id, json.loads(result)) for job_id, result in rows)
+        return found
+
+    def ack(self, job_ids: list[str]) -> None:
+        """Delete jobs whose results the coordinator has read, or no longer wants.
+
+        A worker still running a deleted job fails its next renewal and stops;
+        its result would be ignored anyway.
+        """
+        self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+
+    def counts(self) -> dict[str, int]:
+        return dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class RemoteRunner:
+    """Coordinator side: submit runs as jobs and await their results.
+
+    A single poller task checks all outstanding jobs per interval, so the
+    number of queries stays flat however many runs are in flight.
+    """
+
+    def __init__(self, queue: WorkQueue, poll_interval: float = POLL_INTERVAL_S):
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self._waiting: dict[str, asyncio.Future] = {}
+        self._poller: asyncio.Task | None = None
+
+    async def run(self, payload: dict) -> dict:
+        """Enqueue one run and return the worker's run record."""
+        job_id = self.queue.submit(payload)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[job_id] = future
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        try:
+            return await future
+        finally:
+            # Read, or cancelled: either way the job is finished with
+            self._waiting.pop(job_id, None)
+            self.queue.ack([job_id])
+
+    async def _poll(self) -> None:
+        while self._waiting:
+            await asyncio.sleep(self.poll_interval)
+            for job_id, result in self.queue.finished(list(self._waiting)).items():
+                future = self._waiting.get(job_id)
+                if future is not None and not future.done():
+                    future.set_result(result)
+
+    async def close(self) -> None:
+        if self._poller:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
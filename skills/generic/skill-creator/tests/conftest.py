@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts import each other as `scripts.*`, as when run with `python -m scripts.X`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
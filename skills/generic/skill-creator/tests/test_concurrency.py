@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from scripts.concurrency import ConcurrencyController, result_failure, run_failure
+
+
+def healthy(started_at=0.0, decision_s=1.0):
+    return {"exit_reason": "eof", "returncode": 0, "started_at": started_at, "decision_s": decision_s}
+
+
+async def saturate(controller):
+    """Fill every slot, so each release sees the limit as the bottleneck."""
+    while controller.active < controller.slots:
+        await controller.acquire()
+
+
+def test_slow_start_then_multiplicative_decrease_then_additive_increase():
+    async def main():
+        controller = ConcurrencyController(2, max_limit=16, adaptive=True)
+        loop = asyncio.get_running_loop()
+
+        for _ in range(3):
+            await saturate(controller)
+            controller.release(healthy())
+        # Slow start: one more slot per healthy run
+        assert controller.limit == 5
+
+        cut_before = loop.time()
+        await saturate(controller)
+        controller.release({"exit_reason": "timeout", "started_at": loop.time()})
+        assert controller.limit == 2.5
+        assert controller.slow_start is False
+        # A run started before the cut was in the same round: no second cut
+        controller.release({"exit_reason": "error", "started_at": cut_before})
+        assert controller.limit == 2.5
+
+        await saturate(controller)
+        controller.release(healthy())
+        # Additive increase: about one slot per round of `limit` runs
+        assert controller.limit == pytest.approx(2.5 + 1 / 2.5)
+        return controller.summary()
+
+    summary = asyncio.run(main())
+    assert [point["reason"] for point in summary["trajectory"]] == [
+        "initial", "increase", "increase", "increase", "decrease:timeout",
+    ]
+    assert (summary["min"], summary["max"], summary["final"]) == (2, 5, 2)
+
+
+def test_limit_stays_within_bounds_and_ignores_idle_runs():
+    async def main():
+        controller = ConcurrencyController(2, max_limit=3, adaptive=True)
+        for _ in range(5):
+            await saturate(controller)
+            controller.release(healthy())
+        assert controller.slots == 3
+
+        # Not saturated: a healthy run says nothing about a higher limit
+        await controller.acquire()
+        controller.release(healthy())
+        assert controller.slots == 3
+
+        loop = asyncio.get_running_loop()
+        for _ in range(5):
+            await saturate(controller)
+            # Each failing run started after the previous cut
+            controller.release({"exit_reason": "throttled", "started_at": loop.time() + 1})
+        assert controller.slots == 1
+
+    asyncio.run(main())
+
+
+def test_latency_spike_holds_the_limit():
+    async def main():
+        controller = ConcurrencyController(1, max_limit=8, adaptive=True)
+        for _ in range(3):
+            await saturate(controller)
+            controller.release(healthy(decision_s=1.0))
+        limit = controller.limit
+        await saturate(controller)
+        controller.release(healthy(decision_s=20.0))
+        return limit, controller.limit
+
+    limit, after_spike = asyncio.run(main())
+    assert after_spike == limit
+
+
+def test_cancelled_waiter_hands_its_slot_on():
+    async def main():
+        controller = ConcurrencyController(1)
+        await controller.acquire()
+        first = asyncio.create_task(controller.acquire())
+        second = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+
+        # The slot goes to `first`, which is cancelled before it resumes
+        controller.release({})
+        first.cancel()
+        await asyncio.wait_for(second, timeout=1)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return controller.active, controller._waiters
+
+    assert asyncio.run(main()) == (1, [])
+
+
+def test_failures_are_told_apart_from_outcomes():
+    assert run_failure({"exit_reason": "timeout"}) == "timeout"
+    assert run_failure({"exit_reason": "eof", "returncode": 1}) == "error"
+    assert run_failure({"exit_reason": "eof", "returncode": 0}) is None
+    assert run_failure({"exit_reason": "decided"}) is None
+
+    event = {"type": "result", "is_error": True}
+    assert result_failure(event, b'{"result": "API Error: 429 rate_limit_error"}') == "throttled"
+    assert result_failure(event, b'{"result": "boom"}') == "error"
+    assert result_failure({"type": "result", "is_error": False}, b"") is None
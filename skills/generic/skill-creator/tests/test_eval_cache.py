@@ -0,0 +1,80 @@
+from scripts import eval_cache
+from scripts.eval_cache import CACHE_TTL_SECONDS, TriggerCache, run_key
+from scripts.executors import SimulatedExecutor
+from scripts.run_eval import run_eval
+
+EVAL_SET = [
+    {"query": "merge these two pdfs", "should_trigger": True},
+    {"query": "what's the weather tomorrow", "should_trigger": False},
+]
+
+
+class VersionedExecutor(SimulatedExecutor):
+    def __init__(self, version):
+        super().__init__({"merge these two pdfs": 0.9}, speed=0)
+        self._version = version
+
+    async def version(self):
+        return self._version
+
+
+def evaluate(tmp_path, executor, description="Work with PDF files."):
+    return run_eval(
+        eval_set=EVAL_SET,
+        skill_name="pdf",
+        description=description,
+        num_workers=2,
+        timeout=10,
+        project_root=tmp_path,
+        runs_per_query=3,
+        executor=executor,
+        cache_dir=tmp_path / "cache",
+        isolate=False,
+    )
+
+
+def test_unchanged_inputs_reuse_every_run(tmp_path):
+    first = evaluate(tmp_path, VersionedExecutor("1.0"))
+    second = evaluate(tmp_path, VersionedExecutor("1.0"))
+
+    assert (first["cache"]["hits"], first["cache"]["launched"]) == (0, 6)
+    assert (second["cache"]["hits"], second["cache"]["launched"]) == (6, 0)
+    assert [(r["triggers"], r["runs"]) for r in second["results"]] == [
+        (r["triggers"], r["runs"]) for r in first["results"]
+    ]
+
+
+def test_new_version_or_description_starts_fresh(tmp_path):
+    evaluate(tmp_path, VersionedExecutor("1.0"))
+
+    assert evaluate(tmp_path, VersionedExecutor("2.0"))["cache"]["hits"] == 0
+    assert evaluate(tmp_path, VersionedExecutor("1.0"), description="Edit PDFs.")["cache"]["hits"] == 0
+
+
+def test_expired_runs_are_ignored_and_pruned(tmp_path, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(eval_cache.time, "time", lambda: now)
+    cache = TriggerCache(tmp_path)
+    cache.put("old", True)
+    now += CACHE_TTL_SECONDS - 1
+    cache.put("new", False)
+
+    assert cache.get_many(["old", "new"]) == {"old": True, "new": False}
+    now += 2
+    assert cache.get_many(["old", "new"]) == {"new": False}
+    cache.close()
+
+    reopened = TriggerCache(tmp_path)
+    assert reopened._conn.execute("SELECT key FROM runs").fetchall() == [("new",)]
+
+
+def test_get_many_handles_more_keys_than_one_query_binds(tmp_path):
+    cache = TriggerCache(tmp_path)
+    keys = [run_key("pdf", "d", f"q{i}", None, 0) for i in range(1200)]
+    for i, key in enumerate(keys):
+        cache.put(key, i % 2 == 0)
+
+    found = cache.get_many(keys)
+
+    assert len(found) == 1200
+    assert found[keys[3]] is False
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+
+from scripts.executors import RecordingExecutor, ReplayExecutor, SimulatedExecutor, transcript_key
+from scripts.run_eval import run_eval
+
+EVAL_SET = [
+    {"query": "merge these two pdfs", "should_trigger": True},
+    {"query": "rotate this pdf", "should_trigger": True},
+    {"query": "what's the weather tomorrow", "should_trigger": False},
+]
+RATES = {"merge these two pdfs": 0.9, "rotate this pdf": 0.5, "what's the weather tomorrow": 0.1}
+
+
+def evaluate(tmp_path, executor, **kwargs):
+    return run_eval(
+        eval_set=EVAL_SET,
+        skill_name="pdf",
+        description="Work with PDF files.",
+        num_workers=3,
+        timeout=10,
+        project_root=tmp_path,
+        runs_per_query=4,
+        executor=executor,
+        **kwargs,
+    )
+
+
+def triggers(output):
+    return {r["query"]: (r["triggers"], r["runs"]) for r in output["results"]}
+
+
+def test_replay_reproduces_recorded_outcomes_and_timing(tmp_path):
+    recordings = tmp_path / "recordings"
+    recorded = evaluate(
+        tmp_path, RecordingExecutor(SimulatedExecutor(RATES, median_latency=0.2, sigma=0.1), recordings)
+    )
+
+    # Each run in a fresh sandbox has its own command name, which replay rewrites
+    replayed = evaluate(tmp_path, ReplayExecutor(recordings))
+    fast = evaluate(tmp_path, ReplayExecutor(recordings, speed=0))
+
+    assert triggers(replayed) == triggers(fast) == triggers(recorded)
+    assert replayed["telemetry"]["decision_s"]["p50"] == pytest.approx(
+        recorded["telemetry"]["decision_s"]["p50"], abs=0.1
+    )
+    assert fast["telemetry"]["decision_s"]["p50"] < 0.05
+
+
+def test_recording_keeps_raw_transcript_and_chunk_timing(tmp_path):
+    recordings = tmp_path / "recordings"
+    evaluate(tmp_path, RecordingExecutor(SimulatedExecutor(RATES, speed=0), recordings), isolate=False)
+
+    runs = sorted((recordings / transcript_key("Work with PDF files.", "rotate this pdf")).glob("*.json"))
+    assert len(runs) == 4
+    meta = json.loads(runs[0].read_text())
+    data = runs[0].with_suffix(".jsonl").read_bytes()
+    assert meta["query"] == "rotate this pdf"
+    assert sum(size for _, size in meta["chunks"]) == len(data)
+    assert all(json.loads(line) for line in data.splitlines())
+
+
+def test_cut_short_recording_stays_open_like_the_process_did(tmp_path):
+    recordings = tmp_path / "recordings"
+    evaluate(tmp_path, RecordingExecutor(SimulatedExecutor(RATES, speed=0), recordings), isolate=False)
+
+    async def main():
+        executor = ReplayExecutor(recordings, speed=0)
+        stream = await executor.start("merge these two pdfs", "Work with PDF files.", "pdf-skill-00000000", ".", None)
+        for _ in stream.chunks:
+            assert await stream.read(1 << 16)
+        assert not stream.eof
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(stream.read(1 << 16), 0.05)
+
+    asyncio.run(main())
+
+
+def test_replay_of_unrecorded_query_fails_the_run(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(ReplayExecutor(tmp_path).start("q", "d", "pdf-skill-00000000", ".", None))
+
+    output = evaluate(tmp_path, ReplayExecutor(tmp_path / "empty", speed=0), isolate=False)
+    assert all(r["undetermined"] for r in output["results"])
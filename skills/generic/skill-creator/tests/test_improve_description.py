@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+
+from scripts.improve_description import improve_description, improve_description_async
+from scripts.llm_cache import ResponseCache
+
+EVAL_RESULTS = {
+    "description": "Work with PDF files.",
+    "results": [
+        {"query": "merge these pdfs", "should_trigger": True, "pass": False, "triggers": 0, "runs": 3},
+        {"query": "what's the weather", "should_trigger": False, "pass": True, "triggers": 0, "runs": 3},
+    ],
+    "summary": {"passed": 1, "failed": 1, "total": 2},
+}
+USAGE = {"input_tokens": 100, "output_tokens": 20, "cache_creation_input_tokens": 900, "cache_read_input_tokens": 0}
+
+
+def response(description: str) -> dict:
+    return {
+        "content": [
+            {"type": "thinking", "thinking": "Think it over."},
+            {"type": "text", "text": f"<new_description>{description}</new_description>"},
+        ],
+        "stop_reason": "end_turn",
+        "usage": USAGE,
+    }
+
+
+class StubMessages:
+    """messages.create for a synchronous client; replies with each of `descriptions` in turn."""
+
+    def __init__(self, descriptions: list[str], barrier: threading.Barrier | None = None):
+        self.descriptions = descriptions
+        self.barrier = barrier
+        self.requests: list[dict] = []
+        self.threads: set[int] = set()
+
+    def create(self, **request):
+        self.requests.append(request)
+        self.threads.add(threading.get_ident())
+        if self.barrier:
+            # Only passes if every concurrent call is in flight at once
+            self.barrier.wait()
+        return response(self.descriptions[(len(self.requests) - 1) % len(self.descriptions)])
+
+
+class AsyncStubMessages(StubMessages):
+    async def create(self, **request):
+        return super().create(**request)
+
+
+class StubClient:
+    def __init__(self, messages: StubMessages):
+        self.messages = messages
+
+
+def improve(client, tmp_path, current="Work with PDF files.", **kwargs):
+    return improve_description(
+        client=client,
+        skill_name="pdf",
+        skill_content="# PDF\nTools for PDF files.",
+        current_description=current,
+        eval_results=EVAL_RESULTS,
+        history=[],
+        model="stub-model",
+        log_dir=tmp_path / "logs",
+        iteration=1,
+        **kwargs,
+    )
+
+
+def test_prompt_has_a_stable_cached_prefix(tmp_path):
+    messages = StubMessages(["Better."])
+    improve(StubClient(messages), tmp_path)
+    improve(StubClient(messages), tmp_path, current="Handle PDFs.")
+
+    first, second = (request["messages"][0]["content"] for request in messages.requests)
+    assert [block["cache_control"] for block in first] == [{"type": "ephemeral"}] * 2
+    # Instructions and skill content are reused; only the second block changes
+    assert first[0] == second[0]
+    assert first[1] != second[1]
+
+
+def test_cache_hit_replays_without_calling_the_client(tmp_path, capsys):
+    cache = ResponseCache(tmp_path / "llm")
+    messages = StubMessages(["Better.", "Different."])
+
+    assert improve(StubClient(messages), tmp_path, cache=cache) == "Better."
+    assert improve(StubClient(messages), tmp_path, cache=cache) == "Better."
+
+    assert len(messages.requests) == 1
+    log = json.loads((tmp_path / "logs" / "improve_iter_1.json").read_text())
+    assert [call["cache"] for call in log["calls"]] == ["hit"]
+    assert "Replayed 1 cached improve_description response(s)" in capsys.readouterr().err
+
+
+def test_transcript_records_usage_of_every_call(tmp_path):
+    messages = StubMessages(["x" * 1100, "Short."])
+
+    assert improve(StubClient(messages), tmp_path) == "Short."
+
+    log = json.loads((tmp_path / "logs" / "improve_iter_1.json").read_text())
+    assert log["over_limit"] is True
+    assert [call["cache"] for call in log["calls"]] == ["disabled", "disabled"]
+    assert log["usage"] == {name: 2 * count for name, count in USAGE.items()}
+    # The shorten follow-up repeats the original prompt blocks
+    shorten = messages.requests[1]["messages"]
+    assert shorten[0] == messages.requests[0]["messages"][0]
+
+
+def run_concurrently(client, tmp_path, count):
+    async def main():
+        return await asyncio.gather(*(
+            improve_description_async(
+                client=client,
+                skill_name="pdf",
+                skill_content="# PDF",
+                current_description=f"Candidate {i}.",
+                eval_results=EVAL_RESULTS,
+                history=[],
+                model="stub-model",
+            )
+            for i in range(count)
+        ))
+
+    return asyncio.run(main())
+
+
+def test_sync_client_does_not_block_concurrent_calls(tmp_path):
+    # A blocking call on the event loop would leave the barrier one party short
+    messages = StubMessages(["Better."], barrier=threading.Barrier(3, timeout=5))
+
+    assert run_concurrently(StubClient(messages), tmp_path, 3) == ["Better."] * 3
+    assert threading.get_ident() not in messages.threads
+
+
+def test_async_client_runs_on_the_event_loop(tmp_path):
+    messages = AsyncStubMessages(["Better."])
+
+    assert run_concurrently(StubClient(messages), tmp_path, 2) == ["Better."] * 2
+    assert messages.threads == {threading.get_ident()}
@@ -0,0 +1,113 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from scripts.executors import SimulatedExecutor
+from scripts.history_format import query_table
+from scripts.live_dashboard import LiveDashboard
+from scripts.run_eval import run_eval
+from scripts.run_loop import history_entry
+
+QUERIES = [
+    {"query": "merge these two pdfs", "should_trigger": True},
+    {"query": "what's the weather tomorrow", "should_trigger": False},
+]
+
+
+@pytest.fixture
+def dashboard():
+    dashboard = LiveDashboard()
+    yield dashboard
+    dashboard.close(drain_timeout=0)
+
+
+def entry(tmp_path, iteration, description):
+    output = run_eval(
+        eval_set=QUERIES,
+        skill_name="pdf",
+        description=description,
+        num_workers=2,
+        timeout=5,
+        project_root=tmp_path,
+        runs_per_query=2,
+        executor=SimulatedExecutor({"merge these two pdfs": 1.0}, speed=0),
+        isolate=False,
+    )
+    return history_entry(iteration, description, output, {q["query"] for q in QUERIES}, with_test=False), output
+
+
+def publish_two_iterations(dashboard, tmp_path):
+    dashboard.start({"skill_name": "pdf"}, query_table(QUERIES, []))
+    first, output = entry(tmp_path, 1, "Work with PDF files.")
+    dashboard.begin(1, first["description"])
+    for result in output["results"]:
+        dashboard.progress(1, result)
+    dashboard.row(first)
+    dashboard.begin(2, "Edit PDFs.")
+    dashboard.progress(2, output["results"][0])
+
+
+def get_json(dashboard, path):
+    with urllib.request.urlopen(dashboard.url + path, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def read_stream(dashboard, last_event_id=None):
+    """Open /events, end the loop, and parse everything the stream sent."""
+    request = urllib.request.Request(dashboard.url + "events")
+    if last_event_id is not None:
+        request.add_header("Last-Event-ID", str(last_event_id))
+    with urllib.request.urlopen(request, timeout=5) as response:
+        assert response.headers["Content-Type"] == "text/event-stream"
+        dashboard.close()
+        body = response.read().decode()
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_row_replaces_the_progress_of_its_iteration(dashboard, tmp_path):
+    publish_two_iterations(dashboard, tmp_path)
+
+    body = get_json(dashboard, "events.json")
+
+    assert [e["event"] for e in body["events"]] == ["start", "row", "begin", "progress"]
+    row = body["events"][1]["data"]
+    assert (row["iteration"], row["train_passed"], row["train_total"]) == (1, 2, 2)
+    assert body["done"] is False
+    # Polling resumes after the last id seen
+    since = body["events"][1]["id"]
+    assert [e["event"] for e in get_json(dashboard, f"events.json?since={since}")["events"]] == ["begin", "progress"]
+
+
+def test_late_stream_replays_the_compacted_log_and_ends_with_the_loop(dashboard, tmp_path):
+    publish_two_iterations(dashboard, tmp_path)
+    dashboard.finish({"best_iteration": 1})
+
+    events = read_stream(dashboard)
+
+    assert [name for _, name, _ in events] == ["start", "row", "begin", "progress", "finish"]
+    assert [i for i, _, _ in events] == sorted(i for i, _, _ in events)
+    assert events[0][2]["queries"][0]["query"] == "merge these two pdfs"
+
+
+def test_reconnect_resumes_after_last_event_id(dashboard, tmp_path):
+    publish_two_iterations(dashboard, tmp_path)
+    seen = get_json(dashboard, "events.json")["events"]
+    dashboard.finish({"best_iteration": 1})
+
+    events = read_stream(dashboard, last_event_id=seen[-1]["id"])
+
+    assert [name for _, name, _ in events] == ["finish"]
+
+
+def test_page_and_unknown_paths(dashboard):
+    with urllib.request.urlopen(dashboard.url, timeout=5) as response:
+        assert b"EventSource" in response.read()
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(dashboard.url + "missing", timeout=5)
+    assert error.value.code == 404
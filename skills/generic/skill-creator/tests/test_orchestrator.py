@@ -0,0 +1,117 @@
+import asyncio
+import os
+import sys
+import textwrap
+
+import pytest
+
+from scripts.executors import ClaudeExecutor
+from scripts.run_eval import detect_trigger, run_eval
+
+# Stands in for `claude -p QUERY ...`: triggers the command in its project's
+# .claude/commands for queries starting with "use", hangs on "hang", and
+# otherwise answers without it. Either way it then lingers, like claude
+# finishing its turn, so only an early stop ends it quickly.
+FAKE_CLAUDE = textwrap.dedent("""\
+    #!{python}
+    import json, os, pathlib, sys, time
+    if sys.argv[1] == "--version":
+        print("fake 1.0")
+        sys.exit()
+    query = sys.argv[sys.argv.index("-p") + 1]
+    pathlib.Path(os.environ["FAKE_CLAUDE_PIDS"], str(os.getpid())).touch()
+    def emit(event):
+        print(json.dumps(event), flush=True)
+    emit({{"type": "system", "subtype": "init"}})
+    if query.startswith("hang"):
+        time.sleep(60)
+    commands = sorted(pathlib.Path(".claude/commands").glob("*-skill-*.md"))
+    if query.startswith("use") and commands:
+        tool_use = {{"type": "tool_use", "name": "Skill", "input": {{"skill": commands[0].stem}}}}
+        emit({{"type": "assistant", "message": {{"content": [tool_use]}}}})
+    else:
+        emit({{"type": "stream_event", "event": {{"type": "message_stop"}}}})
+    time.sleep(60)
+""")
+
+
+@pytest.fixture
+def claude(tmp_path, monkeypatch):
+    script = tmp_path / "claude"
+    script.write_text(FAKE_CLAUDE.format(python=sys.executable))
+    script.chmod(0o755)
+    pids = tmp_path / "pids"
+    pids.mkdir()
+    monkeypatch.setenv("FAKE_CLAUDE_PIDS", str(pids))
+    return script
+
+
+def started_pids(claude):
+    return [int(path.name) for path in (claude.parent / "pids").iterdir()]
+
+
+def assert_reaped(pids):
+    for pid in pids:
+        with pytest.raises(ChildProcessError):
+            os.waitpid(pid, os.WNOHANG)
+
+
+@pytest.mark.parametrize("query, triggered, source", [
+    ("use the skill", True, "assistant"),
+    ("something else", False, "stream_event"),
+])
+def test_run_is_stopped_as_soon_as_the_outcome_is_known(tmp_path, claude, query, triggered, source):
+    commands = tmp_path / ".claude" / "commands"
+    commands.mkdir(parents=True)
+    (commands / "pdf-skill-0123abcd.md").write_text("---\ndescription: PDFs\n---\n")
+    run = {}
+
+    result = asyncio.run(asyncio.wait_for(
+        detect_trigger(
+            ClaudeExecutor(str(claude)), query, "PDFs", "pdf-skill-0123abcd", 30, str(tmp_path), telemetry=run
+        ),
+        timeout=10,
+    ))
+
+    assert result is triggered
+    assert (run["source"], run["exit_reason"]) == (source, "decided")
+    assert run["decision_s"] < 10
+    assert_reaped(started_pids(claude))
+
+
+def test_run_past_its_deadline_is_killed(tmp_path, claude):
+    run = {}
+
+    result = asyncio.run(
+        detect_trigger(ClaudeExecutor(str(claude)), "hang", "PDFs", "pdf-skill-0123abcd", 1, str(tmp_path), telemetry=run)
+    )
+
+    assert result is False
+    assert run["exit_reason"] == "timeout"
+    assert 1 <= run["decision_s"] < 5
+    assert_reaped(started_pids(claude))
+
+
+def test_batch_runs_concurrently_and_cleans_up(tmp_path, claude):
+    eval_set = [
+        {"query": "use it for this pdf", "should_trigger": True},
+        {"query": "unrelated question", "should_trigger": False},
+    ]
+
+    output = run_eval(
+        eval_set=eval_set,
+        skill_name="pdf",
+        description="Work with PDF files.",
+        num_workers=6,
+        timeout=30,
+        project_root=tmp_path,
+        runs_per_query=3,
+        executor=ClaudeExecutor(str(claude)),
+    )
+
+    assert [(r["triggers"], r["runs"], r["pass"]) for r in output["results"]] == [(3, 3, True), (0, 3, True)]
+    assert len(started_pids(claude)) == 6
+    assert_reaped(started_pids(claude))
+    # Every run lingers for a minute unless stopped, so they overlapped and ended early
+    assert output["telemetry"]["wall_s"] < 30
+    assert not (tmp_path / ".claude" / "commands").exists()
@@ -0,0 +1,73 @@
+import pytest
+
+from scripts.executors import Executor
+from scripts.history_format import compact_output, legacy_output
+from scripts.run_eval import run_eval
+from scripts.run_loop import history_entry
+
+
+class RaisingExecutor(Executor):
+    """Every run fails to start, so no run ever completes."""
+
+    async def start(self, query, description, clean_name, project_root, model):
+        raise RuntimeError("spawn failed")
+
+
+def evaluate(tmp_path, eval_set, **kwargs):
+    return run_eval(
+        eval_set=eval_set,
+        skill_name="demo",
+        description="A demo skill.",
+        num_workers=2,
+        timeout=5,
+        project_root=tmp_path,
+        runs_per_query=3,
+        executor=RaisingExecutor(),
+        isolate=False,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("should_trigger", [True, False])
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_query_without_completed_runs_is_undetermined(tmp_path, should_trigger, adaptive):
+    outcomes = []
+    output = evaluate(
+        tmp_path,
+        [{"query": "q", "should_trigger": should_trigger}],
+        adaptive=adaptive,
+        on_outcome=outcomes.append,
+    )
+
+    [result] = output["results"]
+    assert result["runs"] == 0
+    assert result["errors"] > 0
+    assert result["trigger_rate"] is None
+    assert result["pass"] is False
+    assert result["undetermined"] is True
+    assert output["summary"] == {"total": 1, "passed": 0, "failed": 0, "undetermined": 1}
+    assert [o["undetermined"] for o in outcomes] == [True]
+
+
+def test_history_counts_undetermined_apart_from_failures(tmp_path):
+    output = evaluate(
+        tmp_path,
+        [{"query": "train", "should_trigger": True}, {"query": "test", "should_trigger": False}],
+    )
+
+    entry = history_entry(1, "A demo skill.", output, {"train"}, with_test=True)
+
+    assert (entry["train_passed"], entry["train_failed"], entry["train_undetermined"]) == (0, 0, 1)
+    assert (entry["test_passed"], entry["test_failed"], entry["test_undetermined"]) == (0, 0, 1)
+
+
+def test_compact_format_keeps_undetermined(tmp_path):
+    output = evaluate(tmp_path, [{"query": "q", "should_trigger": True}])
+    entry = history_entry(1, "A demo skill.", output, {"q"}, with_test=False)
+    loop_output = {"best_description": "A demo skill.", "history": [entry]}
+
+    [result] = legacy_output(compact_output(loop_output))["history"][0]["train_results"]
+
+    assert result["trigger_rate"] is None
+    assert result["undetermined"] is True
+    assert result["pass"] is False
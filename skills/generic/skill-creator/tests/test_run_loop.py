@@ -0,0 +1,482 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+import scripts.run_loop as run_loop_module
+from scripts.executors import SimulatedExecutor
+from scripts.history_format import legacy_output
+from scripts.run_loop import run_loop, split_eval_set
+
+QUERIES = [{"query": f"{kind} {i}", "should_trigger": kind == "use"} for kind in ("use", "skip") for i in range(4)]
+
+
+class DescriptionExecutor(SimulatedExecutor):
+    """SimulatedExecutor whose trigger rates depend on the description under test."""
+
+    def __init__(self, rates: dict[str, dict[str, float]]):
+        super().__init__({}, median_latency=0.01, speed=0)
+        self.rates = rates
+
+    async def start(self, query, description, clean_name, project_root, model):
+        # transcript() reads the rates before start() first awaits
+        self.trigger_rates = self.rates[description]
+        return await super().start(query, description, clean_name, project_root, model)
+
+
+def rates(train_failures: int, test_failures: int, holdout: float) -> dict[str, float]:
+    """Deterministic rates failing the given numbers of train and test queries."""
+    train, test = split_eval_set(QUERIES, holdout) if holdout else (QUERIES, [])
+    result = {}
+    for split, failures in ((train, train_failures), (test, test_failures)):
+        for i, q in enumerate(split):
+            passes = i >= failures
+            result[q["query"]] = float(q["should_trigger"] == passes)
+    return result
+
+
+@pytest.fixture
+def skill(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_loop_module.anthropic, "Anthropic", lambda: None)
+    path = tmp_path / "demo"
+    path.mkdir()
+    (path / "SKILL.md").write_text("---\nname: demo\ndescription: first\n---\n\nA demo skill.\n")
+    return path
+
+
+def loop(skill, monkeypatch, candidates, holdout, prune, **kwargs):
+    descriptions = ["first", *candidates]
+    monkeypatch.setattr(run_loop_module, "improve_description", lambda **kw: descriptions[kw["iteration"]])
+    return run_loop(
+        eval_set=QUERIES,
+        skill_path=skill,
+        description_override=None,
+        num_workers=4,
+        timeout=5,
+        max_iterations=len(descriptions),
+        runs_per_query=1,
+        trigger_threshold=0.5,
+        holdout=holdout,
+        model=None,
+        verbose=False,
+        executor=DescriptionExecutor(kwargs.pop("rates")),
+        isolate=False,
+        prune=prune,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "holdout, defer_holdout",
+    [(0.5, None), (0.5, 1), (0.5, 2), (0, None)],
+)
+def test_pruning_keeps_best_description(skill, monkeypatch, holdout, defer_holdout):
+    # "first" has the best train score, "second" the best test score
+    table = {
+        "first": rates(1, 4, holdout),
+        "second": rates(3, 0, holdout),
+        "third": rates(2, 2, holdout),
+        "fourth": rates(4, 1, holdout),
+    }
+    outputs = [
+        loop(skill, monkeypatch, ["second", "third", "fourth"], holdout, prune, rates=table, defer_holdout=defer_holdout)
+        for prune in (True, False)
+    ]
+
+    assert outputs[0]["best_description"] == outputs[1]["best_description"]
+    if not holdout:
+        # Without a test split pruning still applies
+        pruned = [row for row in outputs[0]["history"] if row["partial"]]
+        assert pruned
+
+
+def test_speculative_improvements_log_separately(skill, monkeypatch, tmp_path):
+    descriptions = ["first", "second", "third", "fourth"]
+
+    def improve_description(**kw):
+        # Speculative calls run on the loop's improver thread
+        path = kw["log_dir"] / kw["log_name"]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"main": threading.current_thread() is threading.main_thread()}))
+        return descriptions[kw["iteration"]]
+
+    monkeypatch.setattr(run_loop_module, "improve_description", improve_description)
+    log_dir = tmp_path / "logs"
+    checkpoint = tmp_path / "checkpoint.json"
+    table = {d: rates(failures, 0, 0) for d, failures in zip(descriptions, (3, 2, 1, 1))}
+    output = run_loop(
+        eval_set=QUERIES,
+        skill_path=skill,
+        description_override=None,
+        num_workers=2,
+        timeout=5,
+        max_iterations=len(descriptions),
+        runs_per_query=1,
+        trigger_threshold=0.5,
+        holdout=0,
+        model=None,
+        verbose=False,
+        log_dir=log_dir,
+        executor=DescriptionExecutor(table),
+        isolate=False,
+        prune=False,
+        pipeline=0.5,
+        checkpoint_path=checkpoint,
+    )
+
+    assert output["pipeline"]["launched"] > 0
+    logs = {path.name: json.loads(path.read_text())["main"] for path in log_dir.iterdir()}
+    for name, main in logs.items():
+        assert main == ("_spec" not in name), name
+    transcripts = json.loads(checkpoint.read_text())["transcripts"]
+    # One transcript per improvement the loop used: the real call, or a held speculation
+    assert len(transcripts) == len(output["history"]) - 1
+    assert sum("_spec" in t for t in transcripts) == output["pipeline"]["hits"]
+    assert all(Path(t).name in logs for t in transcripts)
+
+
+def test_returns_per_query_results(skill, monkeypatch):
+    output = loop(skill, monkeypatch, ["second"], 0.5, True, rates={"first": rates(1, 1, 0.5), "second": rates(0, 0, 0.5)})
+
+    assert "format" not in output
+    entry = output["history"][0]
+    assert [r["query"] for r in entry["train_results"]] == [r["query"] for r in entry["results"]]
+    assert {r["query"] for r in entry["train_results"] + entry["test_results"]} == {q["query"] for q in QUERIES}
+
+
+@pytest.mark.parametrize("legacy", [False, True])
+def test_main_writes_compact_format_unless_legacy(skill, monkeypatch, tmp_path, legacy):
+    output = loop(skill, monkeypatch, ["second"], 0.5, True, rates={"first": rates(1, 1, 0.5), "second": rates(0, 0, 0.5)})
+    monkeypatch.setattr(run_loop_module, "run_loop", lambda **kwargs: output)
+    eval_set = tmp_path / "evals.json"
+    eval_set.write_text(json.dumps(QUERIES))
+    argv = ["run_loop", "--eval-set", str(eval_set), "--skill-path", str(skill), "--model", "m", "--report", "none", "--results-dir", str(tmp_path / "out")]
+    monkeypatch.setattr(run_loop_module.sys, "argv", argv + ["--legacy-format"] * legacy)
+
+    run_loop_module.main()
+
+    [results] = (tmp_path / "out").glob("*/results.json")
+    written = json.loads(results.read_text())
+    if legacy:
+        assert written == output
+    else:
+        assert written["format"] == 2
+        # Per-run latency and usage are not kept per query in format 2
+        expanded = legacy_output(written)["history"][0]["train_results"]
+        original = output["history"][0]["train_results"]
+        assert expanded == [{key: r[key] for key in e} for e, r in zip(expanded, original)]
+        assert [e["query"] for e in expanded] == [r["query"] for r in original]
+
+
+@pytest.mark.parametrize("flags", [["--defer-holdout", "2"], ["--holdout", "0.25", "--defer-holdout", "1"]])
+def test_resume_rejects_a_different_split(skill, monkeypatch, tmp_path, capsys, flags):
+    checkpoint = tmp_path / "resume" / "checkpoint.json"
+    loop(skill, monkeypatch, ["second"], 0.5, True, rates={"first": rates(2, 2, 0.5), "second": rates(1, 1, 0.5)}, defer_holdout=1, checkpoint_path=checkpoint)
+    eval_set = tmp_path / "evals.json"
+    eval_set.write_text(json.dumps(QUERIES))
+    argv = ["run_loop", "--eval-set", str(eval_set), "--skill-path", str(skill), "--model", "m", "--report", "none", "--resume", str(checkpoint.parent), "--holdout", "0.5"]
+    monkeypatch.setattr(run_loop_module.sys, "argv", argv + flags)
+
+    with pytest.raises(SystemExit) as exit_info:
+        run_loop_module.main()
+
+    assert exit_info.value.code == 1
+    assert "was written with a different --" in capsys.readouterr().err
+
+
+def test_resume_continues_an_interrupted_loop(skill, monkeypatch, tmp_path):
+    descriptions = ["first", "second", "third", "fourth"]
+    table = {d: rates(failures, 0, 0) for d, failures in zip(descriptions, (3, 2, 2, 1))}
+    checkpoint = tmp_path / "checkpoint.json"
+    improved = []
+    interrupted = []
+
+    def improve_description(**kw):
+        if kw["iteration"] == 2 and not interrupted:
+            interrupted.append(True)
+            raise KeyboardInterrupt
+        improved.append(kw["iteration"])
+        return descriptions[kw["iteration"]]
+
+    def run(executor, **kwargs):
+        return run_loop(
+            eval_set=QUERIES,
+            skill_path=skill,
+            description_override=None,
+            num_workers=4,
+            timeout=5,
+            max_iterations=len(descriptions),
+            runs_per_query=1,
+            trigger_threshold=0.5,
+            holdout=0,
+            model=None,
+            verbose=False,
+            executor=executor,
+            isolate=False,
+            prune=False,
+            checkpoint_path=checkpoint,
+            **kwargs,
+        )
+
+    monkeypatch.setattr(run_loop_module, "improve_description", lambda **kw: descriptions[kw["iteration"]])
+    expected = run(DescriptionExecutor(table))
+    checkpoint.unlink()
+
+    monkeypatch.setattr(run_loop_module, "improve_description", improve_description)
+    with pytest.raises(KeyboardInterrupt):
+        run(DescriptionExecutor(table))
+    state = run_loop_module.load_checkpoint(checkpoint)
+    assert (state["phase"], state["next_iteration"], len(state["history"])) == ("improve", 2, 2)
+
+    executor = DescriptionExecutor(table)
+    resumed = run(executor, resume_state=state)
+
+    # The two evaluated iterations are not run again; the missing improvement is redone
+    assert improved == [1, 2, 3]
+    assert len(executor.stats) == 2 * len(QUERIES)
+    assert [h["description"] for h in resumed["history"]] == [h["description"] for h in expected["history"]]
+    assert [h["train_passed"] for h in resumed["history"]] == [h["train_passed"] for h in expected["history"]]
+    assert resumed["best_description"] == expected["best_description"] == "fourth"
+    assert run_loop_module.load_checkpoint(checkpoint)["phase"] == "done"
+
+    # Resuming a finished loop runs nothing and returns the same result
+    executor = DescriptionExecutor(table)
+    again = run(executor, resume_state=run_loop_module.load_checkpoint(checkpoint))
+    assert executor.stats == []
+    assert (again["best_description"], again["exit_reason"]) == (resumed["best_description"], resumed["exit_reason"])
+
+
+class LoggingExecutor(DescriptionExecutor):
+    """DescriptionExecutor that records the (description, query) of every run it starts."""
+
+    def __init__(self, rates: dict[str, dict[str, float]]):
+        super().__init__(rates)
+        self.started: list[tuple[str, str]] = []
+
+    async def start(self, query, description, clean_name, project_root, model):
+        self.started.append((description, query))
+        return await super().start(query, description, clean_name, project_root, model)
+
+
+@pytest.mark.parametrize(
+    "defer_holdout, finalists, best",
+    [(1, ["first"], "first"), (2, ["first", "third"], "third")],
+)
+def test_deferred_holdout_scores_only_the_best_train_candidates(skill, monkeypatch, defer_holdout, finalists, best):
+    table = {"first": rates(1, 4, 0.5), "second": rates(3, 0, 0.5), "third": rates(2, 2, 0.5)}
+    executor = LoggingExecutor(table)
+    descriptions = ["first", "second", "third"]
+    monkeypatch.setattr(run_loop_module, "improve_description", lambda **kw: descriptions[kw["iteration"]])
+    output = run_loop(
+        eval_set=QUERIES,
+        skill_path=skill,
+        description_override=None,
+        num_workers=4,
+        timeout=5,
+        max_iterations=3,
+        runs_per_query=1,
+        trigger_threshold=0.5,
+        holdout=0.5,
+        model=None,
+        verbose=False,
+        executor=executor,
+        isolate=False,
+        prune=False,
+        defer_holdout=defer_holdout,
+    )
+
+    _, test_set = split_eval_set(QUERIES, 0.5)
+    test_queries = {q["query"] for q in test_set}
+    scored = [h["description"] for h in output["history"] if h["test_passed"] is not None]
+    assert scored == finalists
+    # Test queries ran once per finalist, after every train evaluation
+    test_runs = [(d, q) for d, q in executor.started if q in test_queries]
+    assert sorted(test_runs) == sorted((d, q) for d in finalists for q in test_queries)
+    assert executor.started[-len(test_runs):] == test_runs
+    assert output["deferred_holdout"] == defer_holdout
+    # Chosen by test score among the finalists only; "second" had the best test score
+    assert output["best_description"] == best
+
+
+@pytest.mark.parametrize("prune", [True, False])
+def test_minibatch_promotes_only_candidates_that_beat_the_incumbent(skill, monkeypatch, prune):
+    better = {**rates(0, 0, 0), "skip 0": 1.0}
+    table = {"first": rates(4, 0, 0), "worse": rates(4, 0, 0), "better": better}
+    executor = LoggingExecutor(table)
+    descriptions = ["first", "worse", "better"]
+    monkeypatch.setattr(run_loop_module, "improve_description", lambda **kw: descriptions[kw["iteration"]])
+    output = run_loop(
+        eval_set=QUERIES,
+        skill_path=skill,
+        description_override=None,
+        num_workers=4,
+        timeout=5,
+        max_iterations=3,
+        runs_per_query=1,
+        trigger_threshold=0.5,
+        holdout=0,
+        model=None,
+        verbose=False,
+        executor=executor,
+        isolate=False,
+        prune=prune,
+        minibatch=4,
+    )
+
+    first, worse, promoted = output["history"]
+    assert first["minibatch"] is None
+    assert worse["partial"] and not worse["minibatch"]["promoted"]
+    assert (worse["minibatch"]["incumbent_iteration"], worse["minibatch"]["incumbent_passed"]) == (1, 2)
+    assert not promoted["partial"] and promoted["minibatch"]["promoted"]
+    assert (promoted["minibatch"]["passed"], promoted["train_passed"], promoted["train_total"]) == (4, 7, 8)
+    # The unpromoted candidate never ran beyond its mini-batch
+    worse_queries = {q for d, q in executor.started if d == "worse"}
+    assert len(worse_queries) <= 4
+    assert {q for d, q in executor.started if d == "better"} == {q["query"] for q in QUERIES}
+    assert output["best_description"] == "better"
+
+
+def test_beam_search_evaluates_each_round_of_candidates_together(skill, monkeypatch):
+    proposals = {2: "a", 3: "b", 4: "c", 5: "c"}
+    parents = {}
+
+    def improve_description(**kw):
+        parents[kw["iteration"]] = kw["current_description"]
+        return proposals[kw["iteration"]]
+
+    monkeypatch.setattr(run_loop_module, "improve_description", improve_description)
+    table = {d: rates(failures, 0, 0) for d, failures in zip(["first", "a", "b", "c"], (3, 2, 1, 1))}
+    output = run_loop(
+        eval_set=QUERIES,
+        skill_path=skill,
+        description_override=None,
+        num_workers=4,
+        timeout=5,
+        max_iterations=3,
+        runs_per_query=1,
+        trigger_threshold=0.5,
+        holdout=0,
+        model=None,
+        verbose=False,
+        executor=DescriptionExecutor(table),
+        isolate=False,
+        beam=2,
+        beam_width=2,
+    )
+
+    history = output["history"]
+    assert [(h["iteration"], h["description"], h["round"], h["parent"]) for h in history] == [
+        (1, "first", 1, None),
+        (2, "a", 2, 1),
+        (3, "b", 2, 1),
+        # Both round-3 calls proposed "c"; it is evaluated once, credited to the first parent
+        (4, "c", 3, 3),
+    ]
+    # Round 3 improved the two best so far, round-robin
+    assert (parents[4], parents[5]) == ("b", "a")
+    assert output["exit_reason"] == "max_iterations (3)"
+    assert output["best_description"] == "b"
+
+
+class MeteredExecutor(DescriptionExecutor):
+    """DescriptionExecutor whose runs each report 100 input and 5 output tokens."""
+
+    def transcript(self, query, clean_name):
+        data, chunks = super().transcript(query, clean_name)
+        usage = {"input_tokens": 100, "output_tokens": 5}
+        event = {"type": "stream_event", "event": {"type": "message_start", "message": {"id": query, "usage": usage}}}
+        line = json.dumps(event).encode() + b"\n"
+        return line + data, [[0.0, len(line)], *chunks]
+
+
+@pytest.mark.parametrize("max_tokens, iterations", [(1500, 2), (1680, 3), (None, 4)])
+def test_token_budget_stops_the_loop(skill, monkeypatch, max_tokens, iterations):
+    descriptions = ["first", "second", "third", "fourth"]
+    monkeypatch.setattr(run_loop_module, "improve_description", lambda **kw: descriptions[kw["iteration"]])
+    output = run_loop(
+        eval_set=QUERIES,
+        skill_path=skill,
+        description_override=None,
+        num_workers=4,
+        timeout=5,
+        max_iterations=len(descriptions),
+        runs_per_query=1,
+        trigger_threshold=0.5,
+        holdout=0,
+        model=None,
+        verbose=False,
+        executor=MeteredExecutor({d: rates(3, 0, 0) for d in descriptions}),
+        isolate=False,
+        prune=False,
+        max_tokens=max_tokens,
+    )
+
+    # 8 runs of 105 tokens per iteration; the budget is checked after each batch
+    assert output["iterations_run"] == iterations
+    assert [h["usage"]["input_tokens"] for h in output["history"]] == [800] * iterations
+    assert output["usage"]["input_tokens"] + output["usage"]["output_tokens"] == 840 * iterations
+    if max_tokens and iterations < len(descriptions):
+        assert output["exit_reason"] == f"budget ({840 * iterations} tokens > {max_tokens})"
+    else:
+        assert output["exit_reason"] == "max_iterations (4)"
+
+
+class AnyDescription(dict):
+    """Trigger rates table giving every description the same rates."""
+
+    def __init__(self, default: dict[str, float]):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, description):
+        return self.default
+
+
+@pytest.mark.parametrize("fraction", [0.25, 1.0])
+def test_pipeline_proposes_what_the_serial_loop_would(skill, monkeypatch, fraction):
+    def improve_description(**kw):
+        failed = sorted(r["query"] for r in kw["eval_results"]["results"] if not r["pass"])
+        return f"{kw['current_description']} | fixes {', '.join(failed)}"
+
+    monkeypatch.setattr(run_loop_module, "improve_description", improve_description)
+
+    def run(pipeline):
+        return run_loop(
+            eval_set=QUERIES,
+            skill_path=skill,
+            description_override=None,
+            num_workers=2,
+            timeout=5,
+            max_iterations=3,
+            runs_per_query=1,
+            trigger_threshold=0.5,
+            holdout=0,
+            model=None,
+            verbose=False,
+            executor=DescriptionExecutor(AnyDescription(rates(3, 0, 0))),
+            isolate=False,
+            prune=False,
+            pipeline=pipeline,
+        )
+
+    serial, pipelined = run(None), run(fraction)
+
+    # A kept speculation saw every failure, so it proposes the same description
+    assert [h["description"] for h in pipelined["history"]] == [h["description"] for h in serial["history"]]
+    assert pipelined["pipeline"]["launched"] >= pipelined["pipeline"]["hits"]
+    if fraction == 1.0:
+        # Started once every train query was decided: always kept
+        assert pipelined["pipeline"]["hits"] == 2
+    assert serial["pipeline"] is None
+    assert pipelined["stages"]["improve"]["calls"] >= 2
+
+
+def test_stage_summary_reports_overlap():
+    summary = run_loop_module.stage_summary({"eval": [(0, 4), (5, 9)], "improve": [(3, 6), (9, 10)]}, wall=10)
+
+    assert summary["eval"] == {"busy_s": 8, "calls": 2, "utilization": 0.8}
+    assert summary["improve"]["busy_s"] == 4
+    # [3, 4] and [5, 6] ran both stages at once
+    assert summary["overlap_s"] == 2
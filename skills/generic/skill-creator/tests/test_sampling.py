@@ -0,0 +1,66 @@
+import pytest
+
+from scripts.executors import SimulatedExecutor
+from scripts.run_eval import run_eval
+from scripts.sampling import first_wave_size, is_settled, wilson_interval
+
+
+def test_wilson_interval_matches_reference_values():
+    assert wilson_interval(8, 10, 0.95) == pytest.approx((0.4902, 0.9433), abs=1e-4)
+    assert wilson_interval(0, 0, 0.95) == (0.0, 1.0)
+    low, high = wilson_interval(10, 10, 0.95)
+    assert low == pytest.approx(0.7225, abs=1e-4)
+    assert high == 1.0
+
+
+def test_query_is_certain_once_remaining_runs_cannot_flip_it():
+    # 2 of 3 agreeing at threshold 0.5 decides either way
+    assert is_settled(2, 2, 3, 0.5)
+    assert is_settled(0, 2, 3, 0.5)
+    assert not is_settled(1, 2, 3, 0.5)
+    assert is_settled(1, 3, 3, 0.5)
+
+
+def test_confidence_stops_before_certainty():
+    assert not is_settled(4, 4, 10, 0.5)
+    # The Wilson interval of 4/4 lies above 0.5 at 95% but not at 99%
+    assert is_settled(4, 4, 10, 0.5, confidence=0.95)
+    assert not is_settled(4, 4, 10, 0.5, confidence=0.99)
+    assert is_settled(0, 4, 10, 0.5, confidence=0.95)
+    assert not is_settled(3, 4, 10, 0.5, confidence=0.95)
+
+
+def test_first_wave_is_smallest_unanimous_decision():
+    assert first_wave_size(3, 0.5) == 2
+    assert first_wave_size(10, 0.5) == 6
+    assert first_wave_size(10, 0.5, confidence=0.95) == 4
+    assert first_wave_size(1, 0.5) == 1
+
+
+def test_adaptive_sampling_spends_fewer_runs_for_the_same_outcomes(tmp_path):
+    eval_set = [
+        {"query": "merge these two pdfs", "should_trigger": True},
+        {"query": "what's the weather tomorrow", "should_trigger": False},
+    ]
+
+    def evaluate(adaptive):
+        return run_eval(
+            eval_set=eval_set,
+            skill_name="pdf",
+            description="Work with PDF files.",
+            num_workers=4,
+            timeout=10,
+            project_root=tmp_path,
+            runs_per_query=10,
+            adaptive=adaptive,
+            confidence=0.95,
+            executor=SimulatedExecutor({"merge these two pdfs": 1.0}, speed=0),
+            isolate=False,
+        )
+
+    fixed, adaptive = evaluate(False), evaluate(True)
+
+    assert [r["pass"] for r in adaptive["results"]] == [r["pass"] for r in fixed["results"]] == [True, True]
+    assert [r["runs"] for r in adaptive["results"]] == [4, 4]
+    assert adaptive["sampling"]["runs_spent"] == 8
+    assert fixed["sampling"]["runs_spent"] == 20
@@ -0,0 +1,129 @@
+import asyncio
+import os
+from pathlib import Path
+
+from scripts.executors import SimulatedExecutor
+from scripts.run_eval import run_eval
+from scripts.sandbox import Sandbox, SandboxPool, command_file_content
+
+EVAL_SET = [
+    {"query": "merge these two pdfs", "should_trigger": True},
+    {"query": "what's the weather tomorrow", "should_trigger": False},
+]
+
+
+def evaluate(tmp_path, isolate):
+    return run_eval(
+        eval_set=EVAL_SET,
+        skill_name="pdf",
+        description="Work with PDF files.",
+        num_workers=2,
+        timeout=10,
+        project_root=tmp_path,
+        runs_per_query=2,
+        executor=SimulatedExecutor({"merge these two pdfs": 0.9}, speed=0),
+        cache_dir=tmp_path / "cache",
+        isolate=isolate,
+    )
+
+
+def test_cached_runs_are_keyed_by_isolation_mode(tmp_path):
+    assert evaluate(tmp_path, isolate=False)["cache"]["hits"] == 0
+    # A sandboxed run sees different skills, so shared-root results don't count
+    isolated = evaluate(tmp_path, isolate=True)["cache"]
+    assert (isolated["hits"], isolated["launched"]) == (0, 4)
+
+    assert evaluate(tmp_path, isolate=True)["cache"]["hits"] == 4
+    assert evaluate(tmp_path, isolate=False)["cache"]["hits"] == 4
+
+
+def make_project(root):
+    commands = root / ".claude" / "commands"
+    commands.mkdir(parents=True)
+    (commands / "review.md").write_text("# review\n")
+    (commands / "other-skill-0123abcd.md").write_text("# leftover eval command\n")
+    (root / ".claude" / "settings.json").write_text("{}")
+    (root / "CLAUDE.md").write_text("# Project\n")
+    return root
+
+
+def test_sandbox_mirrors_the_project_minus_eval_commands(tmp_path):
+    project = make_project(tmp_path / "project")
+    pool = SandboxPool(project, "pdf", 2, base_dir=tmp_path)
+
+    async def main():
+        sandbox = await pool.acquire()
+        sandbox.prepare("Work with PDF files.")
+        return sandbox
+
+    sandbox = asyncio.run(main())
+    commands = sorted(path.name for path in (sandbox.root / ".claude" / "commands").iterdir())
+    assert commands == sorted(["review.md", sandbox.command_file.name])
+    assert sandbox.command_file.read_text() == command_file_content("pdf", "Work with PDF files.")
+    assert (sandbox.root / ".claude" / "settings.json").resolve() == (project / ".claude" / "settings.json").resolve()
+    assert (sandbox.root / "CLAUDE.md").read_text() == "# Project\n"
+
+    pool.close()
+    assert not pool.base.exists()
+    # The project itself is untouched
+    assert (project / ".claude" / "commands" / "other-skill-0123abcd.md").exists()
+
+
+def test_command_file_is_rewritten_only_when_the_description_changes(tmp_path):
+    sandbox = Sandbox(tmp_path / "worker", make_project(tmp_path / "project"), "pdf")
+    sandbox.prepare("Work with PDF files.")
+    os.utime(sandbox.command_file, ns=(0, 0))
+
+    sandbox.prepare("Work with PDF files.")
+    assert sandbox.command_file.stat().st_mtime_ns == 0
+    sandbox.prepare("Edit PDFs.")
+    assert sandbox.command_file.stat().st_mtime_ns != 0
+    assert "Edit PDFs." in sandbox.command_file.read_text()
+
+
+def test_pool_creates_sandboxes_lazily_and_bounds_them(tmp_path):
+    pool = SandboxPool(tmp_path, "pdf", 2, base_dir=tmp_path)
+
+    async def main():
+        first = await pool.acquire()
+        pool.release(first)
+        again = await pool.acquire()
+        second = await pool.acquire()
+        third = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        blocked = not third.done()
+        pool.release(second)
+        return first, again, second, await third, blocked
+
+    first, again, second, third, blocked = asyncio.run(main())
+    assert again is first
+    assert blocked
+    assert third is second
+    assert {first.index, second.index} == {1, 2}
+    assert first.clean_name != second.clean_name
+    pool.close()
+
+
+def test_concurrent_isolated_runs_each_see_one_eval_command(tmp_path):
+    seen = []
+
+    class ListingExecutor(SimulatedExecutor):
+        async def start(self, query, description, clean_name, project_root, model):
+            commands = Path(project_root, ".claude", "commands")
+            seen.append(sorted(path.stem for path in commands.iterdir()))
+            return await super().start(query, description, clean_name, project_root, model)
+
+    run_eval(
+        eval_set=EVAL_SET,
+        skill_name="pdf",
+        description="Work with PDF files.",
+        num_workers=4,
+        timeout=10,
+        project_root=tmp_path,
+        runs_per_query=4,
+        executor=ListingExecutor({}, median_latency=0.05),
+    )
+
+    assert len(seen) == 8
+    assert all(len(commands) == 1 and commands[0].startswith("pdf-skill-") for commands in seen)
+    assert len({commands[0] for commands in seen}) <= 4
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from scripts.concurrency import ConcurrencyController
+from scripts.eval_cache import TriggerCache, query_key
+from scripts.executors import SimulatedExecutor
+from scripts.run_eval import run_eval
+from scripts.scheduling import QueryStats, RunScheduler, closeness
+
+LATENCIES = {"short 1": 0.02, "short 2": 0.02, "short 3": 0.02, "slow": 0.1}
+
+
+class TimedExecutor(SimulatedExecutor):
+    """SimulatedExecutor with a fixed latency per query, recording the order runs start in."""
+
+    def __init__(self):
+        super().__init__({}, sigma=0)
+        self.started: list[str] = []
+
+    def transcript(self, query, clean_name):
+        self.median_latency = LATENCIES[query]
+        self.started.append(query)
+        return super().transcript(query, clean_name)
+
+
+def scheduler(stats, queries, schedule="makespan", adaptive=False, runs_per_query=1):
+    keys = {q: query_key(q, None) for q in queries}
+    return RunScheduler(schedule, stats, keys, runs_per_query, 0.5, adaptive, wave=1)
+
+
+def test_stats_keep_a_moving_average_and_persist_in_the_run_cache(tmp_path):
+    stats = QueryStats(alpha=0.5)
+    stats.update("q", 2.0, True)
+    stats.update("q", 4.0, False)
+    stats.update("q", None, None)
+    assert stats.get("q") == {"duration_s": 3.0, "trigger_rate": 0.5, "runs": 3}
+
+    cache = TriggerCache(tmp_path)
+    stats.save(cache)
+    loaded = QueryStats()
+    loaded.load(cache, ["q", "unknown"])
+    assert loaded.get("q") == stats.get("q")
+    assert loaded.get("unknown") is None
+
+
+def test_longest_expected_work_goes_first():
+    stats = QueryStats()
+    for query, duration in (("fast", 1.0), ("slow", 9.0), ("medium", 4.0)):
+        stats.update(query_key(query, None), duration, None)
+    queries = ["fast", "new", "slow", "medium", "newer query"]
+
+    # Unknown queries take the median duration, longer prompts first
+    assert scheduler(stats, queries).order(queries) == ["slow", "newer query", "medium", "new", "fast"]
+    assert scheduler(stats, queries, schedule="fifo").order(queries) == queries
+    assert scheduler(stats, queries, schedule="fifo").priority("slow", 0, 0) == 0.0
+
+
+def test_adaptive_chains_favour_queries_near_the_threshold():
+    stats = QueryStats()
+    for query in ("certain", "borderline"):
+        stats.update(query_key(query, None), 2.0, None)
+    runs = scheduler(stats, ["certain", "borderline"], adaptive=True, runs_per_query=5)
+
+    assert closeness(0.5, 0.5) == 1.0
+    assert closeness(1.0, 0.5) == closeness(0.0, 0.5) == 0.0
+    # Same run duration; the undecided query still has a chain of follow-ups
+    assert runs.priority("borderline", 1, 2) < runs.priority("certain", 2, 2) == -2.0
+    assert runs.priority("borderline", 1, 2) == pytest.approx(-2.0 * (1 + 2))
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def main():
+        controller = ConcurrencyController(1)
+        await controller.acquire()
+        served = []
+
+        async def wait(name, priority):
+            await controller.acquire(priority)
+            served.append(name)
+            controller.release({})
+
+        tasks = [
+            asyncio.create_task(wait(name, priority))
+            for name, priority in [("c", 3.0), ("a1", 1.0), ("b", 2.0), ("a2", 1.0)]
+        ]
+        await asyncio.sleep(0)
+        controller.release({})
+        await asyncio.gather(*tasks)
+        return served
+
+    assert asyncio.run(main()) == ["a1", "a2", "b", "c"]
+
+
+@pytest.mark.parametrize("schedule", ["makespan", "fifo"])
+def test_slow_queries_start_first_once_their_durations_are_known(tmp_path, schedule):
+    stats = QueryStats()
+
+    def evaluate():
+        executor = TimedExecutor()
+        output = run_eval(
+            eval_set=[{"query": q, "should_trigger": False} for q in LATENCIES],
+            skill_name="pdf",
+            description="Work with PDF files.",
+            num_workers=1,
+            timeout=5,
+            project_root=tmp_path,
+            isolate=False,
+            executor=executor,
+            schedule=schedule,
+            stats=stats,
+        )
+        return executor.started, output
+
+    first, _ = evaluate()
+    second, output = evaluate()
+
+    # Without history the shortest prompt goes last; once measured, the slowest query goes first
+    assert first == list(LATENCIES)
+    if schedule == "makespan":
+        assert second[0] == "slow"
+    else:
+        assert second == list(LATENCIES)
+    assert output["telemetry"]["makespan_s"] is not None
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from scripts.stream_json import JsonlDecoder, parse_event, type_pattern
+
+EVENTS = [
+    {"type": "system", "subtype": "init"},
+    {"type": "stream_event", "event": {"type": "content_block_delta", "delta": {"text": "line\nbreak \"quoted\""}}},
+    {"type": "assistant", "message": {"content": [{"type": "tool_use", "name": "Skill"}]}},
+    {"type": "result", "subtype": "success"},
+]
+STREAM = b"".join(json.dumps(event).encode() + b"\n" for event in EVENTS)
+
+
+def decode(chunks):
+    decoder = JsonlDecoder()
+    lines = [bytes(line) for chunk in chunks for line in decoder.feed(chunk)]
+    return lines, decoder.flush()
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, len(STREAM)])
+def test_lines_survive_any_chunking(size):
+    chunks = [STREAM[i:i + size] for i in range(0, len(STREAM), size)]
+
+    lines, rest = decode(chunks)
+
+    assert lines == STREAM.splitlines()
+    assert rest == b""
+
+
+def test_unterminated_last_line_is_flushed():
+    lines, rest = decode([STREAM, b'{"type": "result"}'])
+
+    assert len(lines) == len(EVENTS)
+    assert rest == b'{"type": "result"}'
+
+
+def test_stopping_early_keeps_unread_lines():
+    decoder = JsonlDecoder()
+    for line in decoder.feed(STREAM[:-5]):
+        first = bytes(line)
+        break
+    later = [bytes(line) for line in decoder.feed(STREAM[-5:])]
+
+    assert [first, *later] == STREAM.splitlines()
+
+
+def test_pre_filter_skips_other_event_types_without_decoding():
+    pattern = type_pattern({"assistant", "result"})
+    lines = STREAM.splitlines()
+
+    events = [parse_event(line, pattern) for line in lines]
+
+    assert events == [None, None, EVENTS[2], EVENTS[3]]
+    # Whitespace around the colon still matches
+    assert parse_event(b'{"type" :  "result"}', pattern) == {"type": "result"}
+    # A nested block of a wanted type is let through and left to the caller
+    assert parse_event(b'{"type": "user", "content": [{"type": "result"}]}', pattern)["type"] == "user"
+    # Names only match whole values
+    assert parse_event(b'{"type": "result_delta"}', pattern) is None
+
+
+def test_invalid_or_non_object_lines_are_ignored():
+    assert parse_event(b"not json") is None
+    assert parse_event(b'{"type": "result"') is None
+    assert parse_event(b"[1, 2]") is None
+    assert parse_event(b"\xff\xfe") is None
+    assert parse_event(memoryview(b'{"type": "result"}')) == {"type": "result"}
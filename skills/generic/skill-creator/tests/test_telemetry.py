@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from scripts.executors import SimulatedExecutor
+from scripts.run_eval import run_eval
+from scripts.telemetry import format_telemetry, percentiles, summarize_runs, write_chrome_trace
+
+RUNS = [
+    {"query": "a", "worker": 1, "queued_at": 10.0, "started_at": 10.0, "ended_at": 12.0,
+     "spawn_s": 0.1, "first_event_s": 0.5, "decision_s": 1.5, "source": "stream_event", "exit_reason": "decided"},
+    {"query": "b", "worker": 2, "queued_at": 10.0, "started_at": 10.0, "ended_at": 11.0,
+     "spawn_s": 0.1, "decision_s": 0.9, "source": "timeout", "exit_reason": "timeout"},
+    {"query": "c", "worker": 2, "queued_at": 10.0, "started_at": 11.0, "ended_at": 13.0,
+     "spawn_s": 0.2, "first_event_s": 0.4, "decision_s": 1.0, "source": "stream_event", "exit_reason": "decided"},
+    # Queued but cancelled before it got a worker
+    {"query": "d", "queued_at": 10.0},
+]
+
+
+def test_percentiles_use_nearest_rank():
+    assert percentiles(list(range(1, 101))) == {"p50": 50, "p90": 90, "p99": 99, "max": 100, "count": 100}
+    assert percentiles([3.0, 1.0, 2.0]) == {"p50": 2.0, "p90": 3.0, "p99": 3.0, "max": 3.0, "count": 3}
+    assert percentiles([0.12345])["p50"] == 0.123
+    assert percentiles([]) is None
+
+
+def test_summary_reports_utilization_and_makespan():
+    summary = summarize_runs(RUNS, wall=3.0, num_workers=2)
+
+    assert summary["runs_started"] == 3
+    assert summary["runs_per_s"] == 1.0
+    # 5 busy worker-seconds out of 2 workers x 3 seconds
+    assert summary["worker_utilization"] == pytest.approx(5 / 6, abs=1e-4)
+    assert (summary["makespan_s"], summary["makespan_bound_s"]) == (3.0, 2.5)
+    assert (summary["idle_worker_s"], summary["tail_s"]) == (1.0, 2.0)
+    assert summary["queue_s"]["max"] == 1.0
+    assert summary["decision_s"]["p50"] == 1.0
+    assert summary["first_event_s"]["count"] == 2
+    assert summary["sources"] == {"stream_event": 2, "timeout": 1}
+    assert summary["exit_reasons"] == {"decided": 2, "timeout": 1, "cancelled": 1}
+    assert format_telemetry(summary).startswith("Telemetry: 3 runs in 3.0s; 1.0 runs/s")
+
+
+def test_chrome_trace_has_one_span_per_run_and_its_milestones(tmp_path):
+    path = tmp_path / "trace" / "batch.json"
+    write_chrome_trace(path, RUNS, origin=10.0)
+
+    events = json.loads(path.read_text())["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [(e["name"], e["tid"], e["ts"], e["dur"]) for e in spans] == [
+        ("a", 1, 0, 2_000_000), ("b", 2, 0, 1_000_000), ("c", 2, 1_000_000, 2_000_000),
+    ]
+    assert spans[1]["cat"] == "timeout"
+    instants = [(e["name"], e["tid"], e["ts"]) for e in events if e["ph"] == "i"]
+    # Milestones are measured from spawn, not from the worker start
+    assert ("decision", 1, 1_600_000) in instants
+    assert ("first event", 2, 1_600_000) in instants
+    assert len(instants) == 5
+
+
+def test_run_eval_reports_telemetry_and_writes_the_trace(tmp_path):
+    trace = tmp_path / "trace.json"
+    output = run_eval(
+        eval_set=[{"query": "merge these two pdfs", "should_trigger": True}, {"query": "hi", "should_trigger": False}],
+        skill_name="pdf",
+        description="Work with PDF files.",
+        num_workers=2,
+        timeout=10,
+        project_root=tmp_path,
+        runs_per_query=3,
+        executor=SimulatedExecutor({"merge these two pdfs": 1.0}, median_latency=0.02),
+        isolate=False,
+        trace_path=trace,
+    )
+
+    telemetry = output["telemetry"]
+    assert telemetry["runs_started"] == 6
+    assert telemetry["decision_s"]["count"] == 6
+    assert all(r["latency"]["count"] == 3 for r in output["results"])
+    spans = [e for e in json.loads(trace.read_text())["traceEvents"] if e["ph"] == "X"]
+    assert len(spans) == 6
+    assert {e["tid"] for e in spans} <= {1, 2}
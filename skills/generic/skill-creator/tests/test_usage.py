@@ -0,0 +1,91 @@
+from scripts.executors import SimulatedExecutor, _event_line
+from scripts.run_eval import run_eval
+from scripts.usage import UsageMeter, format_usage, run_usage, sum_usage, total_tokens
+
+
+def message_start(message_id, input_tokens, cache_read=0):
+    usage = {"input_tokens": input_tokens, "output_tokens": 1, "cache_read_input_tokens": cache_read}
+    return {"type": "stream_event", "event": {"type": "message_start", "message": {"id": message_id, "usage": usage}}}
+
+
+def message_delta(output_tokens):
+    return {"type": "stream_event", "event": {"type": "message_delta", "usage": {"output_tokens": output_tokens}}}
+
+
+class MeteredExecutor(SimulatedExecutor):
+    """SimulatedExecutor whose runs open with a message_start carrying usage."""
+
+    def transcript(self, query, clean_name):
+        data, chunks = super().transcript(query, clean_name)
+        line = _event_line(message_start(f"msg-{query}", 100, cache_read=1000))
+        return line + data, [[0.0, len(line)], *chunks]
+
+
+def test_meter_counts_each_message_once_from_partial_events():
+    meter = UsageMeter()
+    for event in [
+        message_start("a", 10, cache_read=500),
+        message_delta(5),
+        message_delta(12),
+        # The complete message repeats what the stream already reported
+        {"type": "assistant", "message": {"id": "a", "usage": {"input_tokens": 10, "output_tokens": 12}}},
+        message_start("b", 30),
+        message_delta(4),
+    ]:
+        meter.feed(event)
+    run = {}
+    meter.record(run)
+
+    assert run == {"usage": {
+        "input_tokens": 40, "output_tokens": 16, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 500,
+    }}
+
+
+def test_result_event_totals_and_cost_replace_partial_counts():
+    meter = UsageMeter()
+    meter.feed(message_start("a", 10))
+    meter.feed({"type": "result", "usage": {"input_tokens": 50, "output_tokens": 20}, "total_cost_usd": 0.0125})
+    run = {}
+    meter.record(run)
+
+    assert (run["usage"]["input_tokens"], run["usage"]["output_tokens"], run["cost_usd"]) == (50, 20, 0.0125)
+
+
+def test_summaries_skip_cached_runs_and_count_cost_coverage():
+    runs = [
+        {"usage": {"input_tokens": 10, "output_tokens": 2}, "cost_usd": 0.01},
+        {"usage": {"input_tokens": 20, "output_tokens": 3}},
+        # Served from the cache: nothing was spent
+        {"triggered": True},
+    ]
+
+    summary = run_usage(runs)
+
+    assert (summary["runs"], summary["cost_runs"], summary["cost_usd"]) == (2, 1, 0.01)
+    assert total_tokens(summary) == 35
+    assert sum_usage([summary, None, summary])["input_tokens"] == 60
+    assert format_usage(summary).endswith("; $0.0100 reported by 1 of 2 runs")
+
+
+def test_run_eval_reports_usage_of_stopped_runs(tmp_path):
+    def evaluate():
+        return run_eval(
+            eval_set=[{"query": "merge these two pdfs", "should_trigger": True}, {"query": "hi", "should_trigger": False}],
+            skill_name="pdf",
+            description="Work with PDF files.",
+            num_workers=2,
+            timeout=5,
+            project_root=tmp_path,
+            runs_per_query=3,
+            executor=MeteredExecutor({"merge these two pdfs": 1.0}, speed=0),
+            isolate=False,
+            cache_dir=tmp_path / "cache",
+        )
+
+    output = evaluate()
+
+    # Every run was stopped at its decision, before claude's result event
+    assert (output["usage"]["runs"], output["usage"]["input_tokens"], output["usage"]["cost_runs"]) == (6, 600, 0)
+    assert [r["usage"]["cache_read_input_tokens"] for r in output["results"]] == [3000, 3000]
+    # Replayed from the run cache: no tokens spent
+    assert evaluate()["usage"]["runs"] == 0
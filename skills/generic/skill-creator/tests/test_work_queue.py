@@ -0,0 +1,110 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from scripts.executors import RecordingExecutor, ReplayExecutor, SimulatedExecutor
+from scripts.run_eval import run_eval
+from scripts.work_queue import MAX_ATTEMPTS, WorkQueue
+
+SKILL_ROOT = Path(__file__).resolve().parent.parent
+
+EVAL_SET = [
+    {"query": "turn this table into a pdf", "should_trigger": True},
+    {"query": "merge these two pdfs", "should_trigger": True},
+    {"query": "what's the weather tomorrow", "should_trigger": False},
+    {"query": "fill in this pdf form", "should_trigger": False},
+]
+# Certain outcomes, so every replay of a recording decides the same way
+RATES = {"turn this table into a pdf": 1.0, "merge these two pdfs": 1.0, "fill in this pdf form": 1.0}
+
+
+def evaluate(tmp_path, **kwargs):
+    return run_eval(
+        eval_set=EVAL_SET,
+        skill_name="pdf",
+        description="Work with PDF files.",
+        num_workers=4,
+        timeout=10,
+        project_root=tmp_path,
+        runs_per_query=3,
+        isolate=False,
+        **kwargs,
+    )
+
+
+def outcomes(output):
+    return {
+        r["query"]: (r["triggers"], r["runs"], r["trigger_rate"], r["pass"])
+        for r in output["results"]
+    }
+
+
+def test_expired_lease_is_reclaimed_and_late_result_ignored(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+    job_id = queue.submit({"query": "q"})
+
+    assert queue.claim("stalled", lease_s=0.01) == (job_id, {"query": "q"})
+    assert queue.claim("other") is None
+    time.sleep(0.02)
+    assert queue.claim("other") == (job_id, {"query": "q"})
+    # The stalled worker lost its lease: it can neither renew nor overwrite
+    assert not queue.renew(job_id, "stalled")
+    assert queue.complete(job_id, {"triggered": True, "worker": "other"})
+    assert not queue.complete(job_id, {"triggered": False, "worker": "stalled"})
+    assert queue.finished([job_id]) == {job_id: {"triggered": True, "worker": "other"}}
+
+
+def test_claim_skips_long_runs_of_dead_jobs(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+    dead = [queue.submit({"n": n}) for n in range(2 * sys.getrecursionlimit())]
+    queue._conn.execute("UPDATE jobs SET attempts = ?", (MAX_ATTEMPTS,))
+    live = queue.submit({"n": "live"})
+
+    assert queue.claim("worker") == (live, {"n": "live"})
+    results = queue.finished(dead)
+    assert len(results) == len(dead)
+    assert {r["exit_reason"] for r in results.values()} == {"error"}
+
+
+def test_queue_uses_rollback_journal(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+
+    assert queue._conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+
+
+def test_worker_processes_match_local_run(tmp_path):
+    recordings = tmp_path / "recordings"
+    evaluate(
+        tmp_path,
+        executor=RecordingExecutor(SimulatedExecutor(RATES, median_latency=0.05), recordings),
+    )
+    local = evaluate(tmp_path, executor=ReplayExecutor(recordings, speed=0))
+
+    queue = tmp_path / "queue.db"
+    env = {**os.environ, "PYTHONPATH": str(SKILL_ROOT)}
+    workers = [
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "scripts.run_eval", "worker",
+                "--queue", str(queue), "--replay", str(recordings), "--replay-speed", "0",
+                "--no-isolate", "--num-workers", "2", "--idle-exit", "2",
+            ],
+            cwd=tmp_path, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(3)
+    ]
+    try:
+        remote = evaluate(tmp_path, queue=queue)
+    finally:
+        stats = [json.loads(worker.communicate(timeout=60)[0]) for worker in workers]
+
+    assert outcomes(remote) == outcomes(local)
+    assert remote["summary"] == local["summary"]
+    assert sum(s.get("completed", 0) for s in stats) == sum(r["runs"] for r in remote["results"])
+    assert all(s.get("duplicate", 0) == 0 for s in stats)
+    assert len({s["worker"] for s in stats}) == 3
+    # Every job was read and acknowledged
+    assert WorkQueue(queue).counts() == {}